@@ -0,0 +1,293 @@
+"""
+Local stand-in for the Slack Web API, used by the benchmarks.
+Serves a synthetic workspace computed on the fly (so 100k users and 1M messages cost no memory), with configurable
+latency and per-method 429 injection based on Slack's rate limit tiers.
+"""
+import argparse
+import asyncio
+import math
+import random
+import time
+from collections import Counter
+from typing import Any, Dict, List, Optional, Tuple
+
+from aiohttp import web
+
+from slack_mcp.limiter_backends import TokenBucket
+from slack_mcp.rate_limiter import DEFAULT_TIER, METHOD_TIERS, POST_MESSAGE_WORKSPACE_LIMIT, TIER_LIMITS
+
+BASE_TS = 1_700_000_000
+FIRST_NAMES = ["Alice", "Bob", "Carol", "Dave", "Erin", "Frank", "Grace", "Heidi", "Ivan", "Judy", "Mallory", "Niaj", "Olivia", "Peggy", "Rupert", "Sybil", "Trent", "Victor", "Walter", "Joe"]
+LAST_NAMES = ["Smith", "Jones", "Bloggs", "Taylor", "Brown", "Williams", "Wilson", "Johnson", "Davies", "Robinson", "Wright", "Thompson", "Evans", "Walker", "White", "Roberts", "Green", "Hall", "Wood", "Jackson"]
+WORDS = ["deploy", "release", "incident", "review", "lunch", "budget", "roadmap", "customer", "latency", "migration", "standup", "hotfix", "design", "metrics", "launch", "retro"]
+THREAD_EVERY = 10  # every 10th message is a thread parent
+REPLIES_PER_THREAD = 3
+
+
+class Workspace:
+    """
+    Deterministic synthetic workspace. Objects are generated from their index on each request.
+    """
+    def __init__(self, users: int = 100_000, channels: int = 1_000, messages: int = 1_000_000):
+        self.num_users = users
+        self.num_channels = channels
+        self.messages_per_channel = max(1, messages // channels)
+
+    def user(self, i: int) -> Dict[str, Any]:
+        first, last = FIRST_NAMES[i % len(FIRST_NAMES)], LAST_NAMES[(i // len(FIRST_NAMES)) % len(LAST_NAMES)]
+        return {
+            "id": f"U{i:08d}",
+            "name": f"{first.lower()}.{last.lower()}{i}",
+            "real_name": f"{first} {last}",
+            "deleted": False,
+            "is_bot": False,
+            "tz": "Europe/London",
+            "updated": BASE_TS + i,
+            "profile": {
+                "real_name": f"{first} {last}",
+                "display_name": f"{first.lower()}{i}",
+                "email": f"{first.lower()}.{last.lower()}{i}@example.com",
+                "title": "Engineer",
+                "status_text": "",
+                "status_emoji": "",
+                "image_48": f"https://example.com/{i}_48.png",
+                "image_512": f"https://example.com/{i}_512.png",
+            },
+        }
+
+    def channel(self, i: int) -> Dict[str, Any]:
+        return {
+            "id": f"C{i:08d}",
+            "name": f"channel-{i}",
+            "is_channel": True,
+            "is_private": False,
+            "is_archived": False,
+            "is_member": True,
+            "num_members": 1 + i % 500,
+            "created": BASE_TS,
+            "creator": "U00000000",
+            "updated": BASE_TS + i,
+            "topic": {"value": f"Topic {i}", "creator": "U00000000", "last_set": BASE_TS},
+            "purpose": {"value": f"Purpose {i}", "creator": "U00000000", "last_set": BASE_TS},
+        }
+
+    def channel_index(self, channel_id: str) -> Optional[int]:
+        try:
+            i = int(channel_id[1:])
+        except ValueError:
+            return None
+        return i if 0 <= i < self.num_channels else None
+
+    def message(self, channel: int, j: int) -> Dict[str, Any]:
+        ts = f"{BASE_TS + j}.000000"
+        user = f"U{(channel * 7919 + j * 104729) % self.num_users:08d}"
+        message = {
+            "type": "message",
+            "ts": ts,
+            "user": user,
+            "text": f"{WORDS[j % len(WORDS)]} {WORDS[(j // 7) % len(WORDS)]} update from <@{user}> #{j}",
+        }
+        if j % THREAD_EVERY == 0:
+            message.update({"thread_ts": ts, "reply_count": REPLIES_PER_THREAD, "latest_reply": f"{BASE_TS + j}.{REPLIES_PER_THREAD:06d}"})
+        if j % 5 == 0:
+            message["reactions"] = [{"name": "+1", "count": 2, "users": ["U00000001", "U00000002"]}]
+        return message
+
+    def replies(self, channel: int, j: int) -> List[Dict[str, Any]]:
+        parent = self.message(channel, j)
+        replies = [parent]
+        for k in range(1, REPLIES_PER_THREAD + 1):
+            replies.append({
+                "type": "message",
+                "ts": f"{BASE_TS + j}.{k:06d}",
+                "thread_ts": parent["ts"],
+                "user": f"U{(j + k) % self.num_users:08d}",
+                "text": f"reply {k} to #{j}",
+            })
+        return replies
+
+
+def _page(total: int, cursor: Optional[str], limit: int) -> Tuple[range, str]:
+    start = int(cursor) if cursor else 0
+    end = min(total, start + limit)
+    return range(start, end), (str(end) if end < total else "")
+
+
+class FakeSlack:
+    """
+    aiohttp application answering /api/<method> from a Workspace.
+
+    Args:
+        latency (float): Seconds added to every response, with +-50% jitter.
+        tier_scale (float): Multiplier on Slack's per-minute tier budgets; 0 disables 429 injection.
+    """
+    def __init__(self, workspace: Workspace, latency: float = 0.02, tier_scale: float = 1.0, seed: int = 0):
+        self.workspace = workspace
+        self.latency = latency
+        self.tier_scale = tier_scale
+        self.random = random.Random(seed)
+        self.calls: Counter = Counter()
+        self.ratelimited: Counter = Counter()
+        self.buckets: Dict[str, TokenBucket] = {}
+        self.posted = 0
+
+    def _throttle(self, method: str) -> float:
+        """
+        Returns seconds until ``method`` may be called again, or 0 if the call is within budget.
+        """
+        if not self.tier_scale:
+            return 0.0
+        if method not in self.buckets:
+            if method == "chat_postMessage":
+                rate, capacity = POST_MESSAGE_WORKSPACE_LIMIT
+                rate, capacity = rate * self.tier_scale, capacity * self.tier_scale
+            else:
+                per_minute = TIER_LIMITS[METHOD_TIERS.get(method, DEFAULT_TIER)] * self.tier_scale
+                rate, capacity = per_minute / 60.0, per_minute
+            self.buckets[method] = TokenBucket(rate, capacity)
+        bucket = self.buckets[method]
+        wait = bucket.wait_time(time.time())
+        if wait > 0:
+            return wait
+        bucket.take()
+        return 0.0
+
+    async def handle(self, request: web.Request) -> web.Response:
+        method = request.match_info["method"].replace(".", "_")
+        if request.content_type == "application/json":
+            params = await request.json()
+        else:
+            params = dict(await request.post())
+            params.update(request.query)
+        self.calls[method] += 1
+        if self.latency:
+            await asyncio.sleep(self.latency * (0.5 + self.random.random()))
+        wait = self._throttle(method)
+        if wait:
+            self.ratelimited[method] += 1
+            return web.json_response({"ok": False, "error": "ratelimited"}, status=429, headers={"Retry-After": str(max(1, math.ceil(wait)))})
+        handler = getattr(self, f"api_{method}", None)
+        if handler is None:
+            return web.json_response({"ok": False, "error": "unknown_method"})
+        return web.json_response(handler(params))
+
+    def app(self) -> web.Application:
+        app = web.Application(client_max_size=64 * 1024 * 1024)
+        app.router.add_route("*", "/api/{method}", self.handle)
+        app.router.add_get("/_stats", self.handle_stats)
+        return app
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> Tuple[web.AppRunner, str]:
+        """
+        Starts serving and returns (runner, base URL for AsyncWebClient).
+        """
+        runner = web.AppRunner(self.app(), access_log=None)
+        await runner.setup()
+        site = web.TCPSite(runner, host, port)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        return runner, f"http://{host}:{port}/api/"
+
+    # --- Slack Web API methods ---
+    def api_users_list(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        ids, next_cursor = _page(self.workspace.num_users, params.get("cursor"), min(1000, int(params.get("limit") or 200)))
+        return {"ok": True, "members": [self.workspace.user(i) for i in ids], "response_metadata": {"next_cursor": next_cursor}}
+
+    def api_users_info(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        i = int(params["user"][1:])
+        if not 0 <= i < self.workspace.num_users:
+            return {"ok": False, "error": "user_not_found"}
+        return {"ok": True, "user": self.workspace.user(i)}
+
+    def api_users_profile_get(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        user = self.api_users_info(params)
+        return {"ok": True, "profile": user["user"]["profile"]} if user["ok"] else user
+
+    def api_conversations_list(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        ids, next_cursor = _page(self.workspace.num_channels, params.get("cursor"), min(1000, int(params.get("limit") or 100)))
+        return {"ok": True, "channels": [self.workspace.channel(i) for i in ids], "response_metadata": {"next_cursor": next_cursor}}
+
+    def api_conversations_info(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        i = self.workspace.channel_index(params["channel"])
+        if i is None:
+            return {"ok": False, "error": "channel_not_found"}
+        return {"ok": True, "channel": self.workspace.channel(i)}
+
+    def api_conversations_history(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        i = self.workspace.channel_index(params["channel"])
+        if i is None:
+            return {"ok": False, "error": "channel_not_found"}
+        total = self.workspace.messages_per_channel
+        # Message j has ts BASE_TS + j; bounds are exclusive unless inclusive is set
+        inclusive = str(params.get("inclusive")).lower() in ("1", "true")
+        hi = total - 1
+        if params.get("latest"):
+            latest = float(params["latest"]) - BASE_TS
+            hi = min(hi, math.floor(latest) if inclusive or latest != int(latest) else int(latest) - 1)
+        lo = 0
+        if params.get("oldest"):
+            oldest = float(params["oldest"]) - BASE_TS
+            lo = max(lo, math.ceil(oldest) if inclusive or oldest != int(oldest) else int(oldest) + 1)
+        limit = min(1000, int(params.get("limit") or 100))
+        start = hi - int(params.get("cursor") or 0)
+        js = range(start, max(lo - 1, start - limit), -1)
+        more = start - limit >= lo
+        return {
+            "ok": True,
+            "messages": [self.workspace.message(i, j) for j in js],
+            "has_more": more,
+            "response_metadata": {"next_cursor": str(hi - (start - limit)) if more else ""},
+        }
+
+    def api_conversations_replies(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        i = self.workspace.channel_index(params["channel"])
+        j = int(float(params["ts"])) - BASE_TS
+        if i is None or not 0 <= j < self.workspace.messages_per_channel or j % THREAD_EVERY:
+            return {"ok": False, "error": "thread_not_found"}
+        return {"ok": True, "messages": self.workspace.replies(i, j), "has_more": False}
+
+    def api_chat_postMessage(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        self.posted += 1
+        return {"ok": True, "channel": params["channel"], "ts": f"{BASE_TS * 2 + self.posted}.000000", "message": {"text": params.get("text", "")}}
+
+    def api_search_messages(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        count = int(params.get("count") or 20)
+        word = str(params.get("query", "")).split()[0] if params.get("query") else ""
+        js = [j for j in range(0, 2000) if WORDS[j % len(WORDS)] == word][:count]
+        matches = [{**self.workspace.message(0, j), "channel": {"id": "C00000000", "name": "channel-0"}, "permalink": f"https://example.slack.com/archives/C00000000/p{j}"} for j in js]
+        return {"ok": True, "query": params.get("query"), "messages": {"total": len(matches), "matches": matches}}
+
+    def stats(self) -> Dict[str, Any]:
+        return {"calls": dict(self.calls), "ratelimited": dict(self.ratelimited)}
+
+    async def handle_stats(self, request: web.Request) -> web.Response:
+        return web.json_response(self.stats())
+
+
+async def _serve(args: argparse.Namespace):
+    fake = FakeSlack(Workspace(args.users, args.channels, args.messages), latency=args.latency, tier_scale=args.tier_scale)
+    runner, url = await fake.start(args.host, args.port)
+    print(url, flush=True)  # read by benchmarks/run.py
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await runner.cleanup()
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Serve a synthetic Slack workspace for benchmarks.")
+    parser.add_argument("--users", type=int, default=100_000)
+    parser.add_argument("--channels", type=int, default=1_000)
+    parser.add_argument("--messages", type=int, default=1_000_000, help="Total messages, spread evenly over the channels.")
+    parser.add_argument("--latency", type=float, default=0.02, help="Seconds added to every response.")
+    parser.add_argument("--tier-scale", type=float, default=1.0, help="Multiplier on Slack's tier budgets; 0 disables 429s.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=0)
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    try:
+        asyncio.run(_serve(parse_args()))
+    except KeyboardInterrupt:
+        pass
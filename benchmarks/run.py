@@ -0,0 +1,246 @@
+"""
+Benchmarks the MCP tools against the fake Slack API in benchmarks/fake_slack.py.
+
+Each scenario calls one tool ``--requests`` times from ``--concurrency`` concurrent callers and reports
+p50/p99 latency, tool calls per second, errors, upstream Slack calls (and how many were answered with a 429)
+and the peak RSS of the benchmark process. The fake API runs in its own process so it does not skew either.
+
+    python -m benchmarks.run                                 # 100k users, 1M messages
+    python -m benchmarks.run --json baseline.json            # save results
+    python -m benchmarks.run --compare baseline.json         # exit 1 on a regression
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import resource
+import sys
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from benchmarks.fake_slack import FIRST_NAMES, WORDS, Workspace  # noqa: E402
+from slack_mcp import main  # noqa: E402
+from slack_mcp.rate_limiter import METHOD_TIERS, POST_MESSAGE_WORKSPACE_LIMIT, TIER_LIMITS, RetryPolicy, SlackRateLimiter  # noqa: E402
+
+Scenario = Callable[[random.Random], Awaitable[Dict[str, Any]]]
+
+
+def scenarios(workspace: Workspace) -> Dict[str, Scenario]:
+    """
+    Returns the benchmark scenarios by name. Each takes a seeded Random and makes one tool call.
+    """
+    def user_id(rng: random.Random) -> str:
+        return f"U{rng.randrange(workspace.num_users):08d}"
+
+    def channel_id(rng: random.Random) -> str:
+        return f"C{rng.randrange(workspace.num_channels):08d}"
+
+    return {
+        "get_user_info": lambda rng: main.get_user_info(user_id(rng)),
+        "get_channel_info": lambda rng: main.get_channel_info(channel_id(rng)),
+        "find_users_by_name": lambda rng: main.find_users_by_name(rng.choice(FIRST_NAMES)[:3].lower(), fields=["id"]),
+        "read_channel_messages": lambda rng: main.read_channel_messages(channel_id(rng), limit=100),
+        "read_channel_messages_by_name": lambda rng: main.read_channel_messages(f"#channel-{rng.randrange(workspace.num_channels)}", limit=100),
+        "read_channel_messages_resolve": lambda rng: main.read_channel_messages(channel_id(rng), limit=100, resolve=True),
+        "read_channel_messages_threads": lambda rng: main.read_channel_messages(channel_id(rng), limit=50, expand_threads=True),
+        "resolve_entities": lambda rng: main.resolve_entities(user_ids=[user_id(rng) for _ in range(20)], channel_ids=[channel_id(rng) for _ in range(5)]),
+        "search_messages": lambda rng: main.search_messages(rng.choice(WORDS), count=20),
+        "send_message": lambda rng: main.send_message(channel_id(rng), "benchmark message"),
+    }
+
+
+def percentile(values: List[float], q: float) -> Optional[float]:
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def peak_rss_mb() -> float:
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(rss / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def scaled_limits(scale: float) -> Dict[str, Tuple[float, float]]:
+    """
+    Slack's tier budgets multiplied by ``scale``, as SlackRateLimiter limit overrides.
+    """
+    limits = {}
+    for method, tier in METHOD_TIERS.items():
+        per_minute = TIER_LIMITS[tier] * scale
+        limits[method] = (per_minute / 60.0, per_minute)
+    rate, capacity = POST_MESSAGE_WORKSPACE_LIMIT
+    limits["chat_postMessage"] = (rate * scale, capacity * scale)
+    return limits
+
+
+async def start_fake_slack(args: argparse.Namespace) -> Tuple[asyncio.subprocess.Process, str]:
+    """
+    Starts benchmarks/fake_slack.py in a child process and returns it with its API base URL.
+    """
+    proc = await asyncio.create_subprocess_exec(
+        sys.executable, "-m", "benchmarks.fake_slack",
+        "--users", str(args.users), "--channels", str(args.channels), "--messages", str(args.messages),
+        "--latency", str(args.latency), "--tier-scale", str(args.tier_scale),
+        stdout=asyncio.subprocess.PIPE, cwd=ROOT,
+    )
+    line = await asyncio.wait_for(proc.stdout.readline(), timeout=30)
+    if not line:
+        raise RuntimeError("fake Slack API exited before it started serving")
+    return proc, line.decode().strip()
+
+
+async def upstream_stats(base_url: str) -> Dict[str, Dict[str, int]]:
+    session = main._client().session
+    async with session.get(base_url.replace("/api/", "/_stats")) as resp:
+        return await resp.json()
+
+
+def _delta(after: Dict[str, int], before: Dict[str, int]) -> Dict[str, int]:
+    return {method: n - before.get(method, 0) for method, n in sorted(after.items()) if n - before.get(method, 0)}
+
+
+async def run_scenario(name: str, call: Scenario, requests: int, concurrency: int, base_url: str, seed: int = 0) -> Dict[str, Any]:
+    rng = random.Random(f"{seed}:{name}")
+    latencies: List[float] = []
+    errors: Dict[str, int] = {}
+    pending = iter(range(requests))  # shared by the workers, so each request is made exactly once
+
+    async def worker():
+        for _ in pending:
+            started = time.perf_counter()
+            try:
+                result = await call(rng)
+            except Exception as e:
+                result = {"error": type(e).__name__}
+            latencies.append(time.perf_counter() - started)
+            if not (isinstance(result, dict) and result.get("ok")):
+                error = str(result.get("error") if isinstance(result, dict) else result)[:80]
+                errors[error] = errors.get(error, 0) + 1
+
+    before = await upstream_stats(base_url)
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    after = await upstream_stats(base_url)
+    upstream = _delta(after["calls"], before["calls"])
+    return {
+        "requests": requests,
+        "concurrency": concurrency,
+        "errors": errors,
+        "seconds": round(elapsed, 3),
+        "calls_per_sec": round(requests / elapsed, 1) if elapsed else None,
+        "p50_ms": round(percentile(latencies, 0.5) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 2),
+        "upstream_calls": sum(upstream.values()),
+        "upstream_calls_by_method": upstream,
+        "upstream_ratelimited": sum(_delta(after["ratelimited"], before["ratelimited"]).values()),
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+
+async def run_benchmarks(args: argparse.Namespace) -> Dict[str, Any]:
+    """
+    Points the server module at a fresh fake Slack API and runs the selected scenarios in order.
+    Caches and directories warm up across scenarios, as they would in a long-running server.
+    """
+    from slack_sdk.web.async_client import AsyncWebClient
+    workspace = Workspace(args.users, args.channels, args.messages)
+    selected = scenarios(workspace)
+    names = args.scenarios or list(selected)
+    unknown = [name for name in names if name not in selected]
+    if unknown:
+        raise ValueError(f"Unknown scenarios: {', '.join(unknown)}. Choose from: {', '.join(selected)}")
+
+    proc, base_url = await start_fake_slack(args)
+    main.slack_client = AsyncWebClient(token="xoxb-benchmark", base_url=base_url)
+    main.rate_limiter = SlackRateLimiter(
+        metrics=main.metrics,
+        limits=scaled_limits(args.limiter_scale if args.limiter_scale is not None else args.tier_scale or 1000.0),
+        retry=RetryPolicy(max_wait=args.retry_max_wait),
+    )
+    main.DIRECTORY_SNAPSHOT_PATH = None
+    try:
+        results = {}
+        for name in names:
+            results[name] = await run_scenario(name, selected[name], args.requests, args.concurrency, base_url, args.seed)
+            print(format_row(name, results[name]), file=sys.stderr)
+        return {
+            "config": {key: getattr(args, key) for key in ("users", "channels", "messages", "latency", "tier_scale", "limiter_scale", "requests", "concurrency", "seed")},
+            "scenarios": results,
+        }
+    finally:
+        await main.slack_client.session.close()
+        proc.terminate()
+        await proc.wait()
+
+
+def format_row(name: str, result: Dict[str, Any]) -> str:
+    errors = sum(result["errors"].values())
+    return (f"{name:32} p50 {result['p50_ms']:9.2f} ms  p99 {result['p99_ms']:9.2f} ms  {result['calls_per_sec']:8.1f} calls/s  "
+            f"upstream {result['upstream_calls']:6d} (429: {result['upstream_ratelimited']})  errors {errors:4d}  rss {result['peak_rss_mb']} MB")
+
+
+def compare(results: Dict[str, Any], baseline: Dict[str, Any], tolerance: float) -> List[str]:
+    """
+    Returns a description of every regression beyond ``tolerance`` (a fraction) against a baseline run.
+    """
+    regressions = []
+    for name, result in results["scenarios"].items():
+        base = baseline.get("scenarios", {}).get(name)
+        if not base:
+            continue
+        for key in ("p50_ms", "p99_ms", "upstream_calls", "peak_rss_mb"):
+            if base.get(key) and result[key] > base[key] * (1 + tolerance):
+                regressions.append(f"{name}: {key} {base[key]} -> {result[key]}")
+        if base.get("calls_per_sec") and result["calls_per_sec"] < base["calls_per_sec"] * (1 - tolerance):
+            regressions.append(f"{name}: calls_per_sec {base['calls_per_sec']} -> {result['calls_per_sec']}")
+        if sum(result["errors"].values()) > sum(base.get("errors", {}).values()):
+            regressions.append(f"{name}: errors {base.get('errors', {})} -> {result['errors']}")
+    return regressions
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark the Slack MCP tools against a local fake Slack API.")
+    parser.add_argument("--users", type=int, default=100_000)
+    parser.add_argument("--channels", type=int, default=1_000)
+    parser.add_argument("--messages", type=int, default=1_000_000)
+    parser.add_argument("--latency", type=float, default=0.02, help="Seconds the fake API adds to every response.")
+    parser.add_argument("--tier-scale", type=float, default=100.0, help="Multiplier on the fake API's tier budgets; 0 disables 429s.")
+    parser.add_argument("--limiter-scale", type=float, default=None, help="Multiplier on the server's own limiter budgets (default: --tier-scale). Set above --tier-scale to provoke 429s.")
+    parser.add_argument("--retry-max-wait", type=float, default=30.0)
+    parser.add_argument("--requests", type=int, default=200, help="Tool calls per scenario.")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", help="Write results to this file.")
+    parser.add_argument("--compare", help="Baseline results file; exit 1 if any scenario regressed.")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed regression against --compare, as a fraction.")
+    parser.add_argument("scenarios", nargs="*", help="Scenarios to run (default: all).")
+    return parser.parse_args(argv)
+
+
+def cli(argv: Optional[List[str]] = None) -> int:
+    args = parse_args(argv)
+    results = asyncio.run(run_benchmarks(args))
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+    else:
+        print(json.dumps(results, indent=2, sort_keys=True))
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}", file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(cli())
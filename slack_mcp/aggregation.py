@@ -0,0 +1,85 @@
+import datetime
+from collections import Counter
+from typing import Any, Dict, Optional
+
+# Message fields the aggregation reads; pages are projected to these before they are counted
+AGGREGATE_FIELDS = ["ts", "user", "bot_id", "subtype", "thread_ts", "reply_count", "reply_users_count", "reactions.name", "reactions.count"]
+
+WEEKDAYS = ["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"]
+
+
+class ChannelStats:
+    """
+    Aggregates channel messages in a single pass. Messages are not kept, so memory grows with the number of distinct
+    posters, days and reaction names rather than with the number of messages.
+    """
+    def __init__(self, tz_offset: float = 0.0):
+        """
+        Args:
+            tz_offset (float): Hours added to UTC before bucketing by hour, weekday and day.
+        """
+        self.tz = datetime.timezone(datetime.timedelta(hours=tz_offset))
+        self.messages = 0
+        self.bot_messages = 0
+        self.first_ts: Optional[str] = None
+        self.last_ts: Optional[str] = None
+        self.posters: Counter = Counter()
+        self.by_hour = [0] * 24
+        self.by_weekday = [0] * 7
+        self.by_day: Counter = Counter()
+        self.reactions: Counter = Counter()
+        self.threads = 0
+        self.replies = 0
+        self.max_replies = 0
+        self.max_replies_ts: Optional[str] = None
+
+    def add(self, message: Dict[str, Any]):
+        ts = message.get("ts")
+        if not ts:
+            return
+        self.messages += 1
+        seconds = float(ts)
+        if self.first_ts is None or seconds < float(self.first_ts):
+            self.first_ts = ts
+        if self.last_ts is None or seconds > float(self.last_ts):
+            self.last_ts = ts
+        if message.get("bot_id") or message.get("subtype") == "bot_message":
+            self.bot_messages += 1
+        if message.get("user"):
+            self.posters[message["user"]] += 1
+        when = datetime.datetime.fromtimestamp(seconds, self.tz)
+        self.by_hour[when.hour] += 1
+        self.by_weekday[when.weekday()] += 1
+        self.by_day[when.date().isoformat()] += 1
+        for reaction in message.get("reactions") or []:
+            self.reactions[reaction.get("name")] += reaction.get("count", 0)
+        replies = message.get("reply_count") or 0
+        if replies:
+            self.threads += 1
+            self.replies += replies
+            if replies > self.max_replies:
+                self.max_replies, self.max_replies_ts = replies, ts
+
+    def result(self, top: int = 10) -> Dict[str, Any]:
+        return {
+            "messages": self.messages,
+            "bot_messages": self.bot_messages,
+            "first_ts": self.first_ts,
+            "last_ts": self.last_ts,
+            "posters": len(self.posters),
+            "top_posters": [{"user": user, "messages": n} for user, n in self.posters.most_common(top)],
+            "by_hour": self.by_hour,
+            "by_weekday": dict(zip(WEEKDAYS, self.by_weekday)),
+            "by_day": dict(sorted(self.by_day.items())),
+            "reactions": {
+                "total": sum(self.reactions.values()),
+                "top": [{"name": name, "count": n} for name, n in self.reactions.most_common(top)],
+            },
+            "threads": {
+                "threads": self.threads,
+                "replies": self.replies,
+                "avg_replies": round(self.replies / self.threads, 2) if self.threads else 0.0,
+                "max_replies": self.max_replies,
+                "max_replies_ts": self.max_replies_ts,
+            },
+        }
@@ -0,0 +1,71 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, Optional, Tuple
+
+from .metrics import Metrics
+
+
+class TTLCache:
+    """
+    Bounded LRU cache whose entries expire ``ttl`` seconds after they are stored.
+    Keys are (entity ID, variant) tuples, so every cached variant of an entity can be invalidated at once.
+    """
+    def __init__(self, name: str, max_entries: int = 1000, ttl: float = 300.0, metrics: Optional[Metrics] = None):
+        """
+        Args:
+            name (str): Cache name used in metrics.
+            max_entries (int): Entries kept before the least recently used one is evicted.
+            ttl (float): Seconds an entry stays valid. 0 disables the cache.
+            metrics (Metrics, optional): Records each lookup as a hit or miss.
+        """
+        self.name = name
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.metrics = metrics
+        self.lock = threading.Lock()
+        self.entries: "OrderedDict[Tuple[str, Hashable], Tuple[float, Any]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, entity_id: str, variant: Hashable = None) -> Optional[Any]:
+        """
+        Returns the cached value, or None on a miss or an expired entry.
+        """
+        key = (entity_id, variant)
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None and entry[0] <= time.time():
+                del self.entries[key]
+                entry = None
+            if entry is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+                self.entries.move_to_end(key)
+        if self.metrics:
+            self.metrics.record_cache(self.name, entry is not None)
+        return entry[1] if entry is not None else None
+
+    def set(self, entity_id: str, value: Any, variant: Hashable = None):
+        if self.ttl <= 0:
+            return
+        key = (entity_id, variant)
+        with self.lock:
+            self.entries[key] = (time.time() + self.ttl, value)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+    def invalidate(self, entity_id: str):
+        """
+        Drops every cached variant of an entity.
+        """
+        with self.lock:
+            for key in [key for key in self.entries if key[0] == entity_id]:
+                del self.entries[key]
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.hits = self.misses = 0
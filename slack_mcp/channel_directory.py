@@ -0,0 +1,165 @@
+import asyncio
+import threading
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set, Tuple
+
+
+def normalize_name(name: str) -> str:
+    return name.lstrip("#").strip().lower()
+
+
+class ChannelDirectory:
+    """
+    Cached directory of channels with a name index, filled incrementally from conversations.list.
+    A miss pages through the listing only until the channel is found; the rest of the scan resumes on the next miss.
+    Once ``ttl`` seconds have passed since the last complete scan, hits are still answered while a background rescan runs.
+    A miss on a fresh directory rescans too (at most every ``miss_interval`` seconds), so newly created or renamed
+    channels resolve without waiting for the TTL.
+    asyncio-only: scans are serialized by an asyncio.Lock and their cursor state is unlocked, so use one event loop.
+    """
+    def __init__(self, fetch_page: Callable[[Optional[str]], Awaitable[Dict[str, Any]]], ttl: float = 900.0, on_loaded: Optional[Callable[[], None]] = None, miss_interval: float = 30.0):
+        """
+        Args:
+            fetch_page (Callable): Coroutine function taking a cursor (None for the first page) and returning a conversations.list response.
+            ttl (float): Seconds before a complete directory is rescanned.
+            on_loaded (Callable, optional): Called after each complete scan, e.g. to save a warm-start snapshot.
+            miss_interval (float): Minimum seconds between rescans started by a miss on a fresh directory.
+        """
+        self.fetch_page = fetch_page
+        self.ttl = ttl
+        self.miss_interval = miss_interval
+        self.on_loaded = on_loaded
+        self.lock = threading.Lock()
+        self.by_id: Dict[str, dict] = {}
+        self.by_name: Dict[str, str] = {}
+        self.loaded_at: Optional[float] = None  # start of the last complete scan
+        self.scan_cursor: Optional[str] = None
+        self.scan_started: Optional[float] = None
+        self.scan_seen: Set[str] = set()
+        self.miss_scan_at: Optional[float] = None  # when a miss last started a rescan
+        self.scan_lock: Optional[asyncio.Lock] = None
+        self.refresh_task: Optional[asyncio.Task] = None
+
+    def clear(self):
+        with self.lock:
+            self.by_id, self.by_name = {}, {}
+            self.loaded_at = None
+            self.scan_cursor, self.scan_started, self.scan_seen = None, None, set()
+            self.miss_scan_at = None
+        self.scan_lock, self.refresh_task = None, None
+
+    def merge(self, channels: List[dict]):
+        """
+        Adds or updates channels (e.g. from a conversations.list page), dropping stale names of renamed channels.
+        """
+        with self.lock:
+            for channel in channels:
+                channel_id, name = channel.get("id"), channel.get("name")
+                if not channel_id or not name:
+                    continue
+                previous = self.by_id.get(channel_id)
+                if previous and previous.get("name") != name:
+                    self.by_name.pop(normalize_name(previous["name"]), None)
+                self.by_id[channel_id] = channel
+                self.by_name[normalize_name(name)] = channel_id
+
+    def restore(self, channels: List[dict], loaded_at: float):
+        """
+        Fills the directory from a previous complete scan (e.g. a warm-start snapshot) taken at ``loaded_at``.
+        """
+        self.merge(channels)
+        with self.lock:
+            self.loaded_at = loaded_at
+
+    def channels(self) -> List[dict]:
+        with self.lock:
+            return list(self.by_id.values())
+
+    def remove(self, channel_id: str):
+        with self.lock:
+            channel = self.by_id.pop(channel_id, None)
+            if channel:
+                self.by_name.pop(normalize_name(channel["name"]), None)
+
+    def lookup(self, name: str) -> Optional[str]:
+        """
+        Returns the ID for a channel name from memory only, or None.
+        """
+        with self.lock:
+            return self.by_name.get(normalize_name(name))
+
+    def get(self, channel_id: str) -> Optional[dict]:
+        with self.lock:
+            return self.by_id.get(channel_id)
+
+    @property
+    def stale(self) -> bool:
+        return self.loaded_at is None or time.time() - self.loaded_at >= self.ttl
+
+    async def _scan_page(self) -> Optional[Dict[str, Any]]:
+        """
+        Fetches the next page of the current scan, starting a new scan if none is in progress.
+        Returns an error dict on failure, else None.
+        """
+        if self.scan_started is None:
+            self.scan_started, self.scan_cursor, self.scan_seen = time.time(), None, set()
+        try:
+            res = await self.fetch_page(self.scan_cursor)
+        except Exception as e:
+            res = {"error": str(e)}
+        if not res.get("ok"):
+            return res
+        channels = res.get("channels", [])
+        self.merge(channels)
+        self.scan_seen.update(channel["id"] for channel in channels if channel.get("id"))
+        self.scan_cursor = (res.get("response_metadata") or {}).get("next_cursor") or None
+        if self.scan_cursor is None:
+            with self.lock:
+                for channel_id in set(self.by_id) - self.scan_seen:
+                    self.by_name.pop(normalize_name(self.by_id.pop(channel_id)["name"]), None)
+                self.loaded_at = self.scan_started
+            self.scan_started, self.scan_seen = None, set()
+            if self.on_loaded:
+                self.on_loaded()
+        return None
+
+    async def _scan_until(self, done: Callable[[], bool]) -> Optional[Dict[str, Any]]:
+        if self.scan_lock is None:
+            self.scan_lock = asyncio.Lock()
+        async with self.scan_lock:
+            while not done():
+                error = await self._scan_page()
+                if error:
+                    return error
+                if self.scan_started is None:
+                    break
+        return None
+
+    async def _refresh(self):
+        await self._scan_until(lambda: False)
+
+    def refresh_if_stale(self):
+        """
+        Starts a background rescan if the directory is past its TTL and none is running. Lookups keep answering meanwhile.
+        """
+        if self.stale and self.scan_started is None and (self.refresh_task is None or self.refresh_task.done()):
+            self.refresh_task = asyncio.get_running_loop().create_task(self._refresh())
+
+    async def resolve(self, name: str) -> Tuple[Optional[str], Optional[Dict[str, Any]]]:
+        """
+        Resolves a channel name ("#general" or "general") to its ID.
+
+        Returns:
+            Tuple[Optional[str], Optional[dict]]: (channel ID, None), (None, None) if no such channel exists, or (None, error dict).
+        """
+        channel_id = self.lookup(name)
+        if channel_id:
+            self.refresh_if_stale()
+            return channel_id, None
+        if not self.stale and self.scan_started is None:
+            # The channel may have been created or renamed since the last scan; rescan, but not on every miss
+            if time.time() - max(self.loaded_at, self.miss_scan_at or 0.0) < self.miss_interval:
+                return None, None
+            self.miss_scan_at = time.time()
+        error = await self._scan_until(lambda: self.lookup(name) is not None)
+        return self.lookup(name), error
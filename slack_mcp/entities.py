@@ -0,0 +1,37 @@
+import re
+from typing import Iterable, List, Set, Tuple
+
+# <@U123>, <@U123|name>, <#C123>, <#C123|name> in message text
+MENTION_RE = re.compile(r"<([@#])([A-Z0-9]+)(?:\|[^>]*)?>")
+
+
+def _texts(message: dict) -> Iterable[str]:
+    if message.get("text"):
+        yield message["text"]
+    for attachment in message.get("attachments") or []:
+        for key in ("text", "pretext", "fallback"):
+            if attachment.get(key):
+                yield attachment[key]
+
+
+def collect_entities(messages: List[dict]) -> Tuple[Set[str], Set[str]]:
+    """
+    Collects the user IDs (authors, thread participants, reactors, mentions) and channel IDs (mentions)
+    referenced by a page of messages.
+
+    Returns:
+        Tuple[Set[str], Set[str]]: (user IDs, channel IDs).
+    """
+    users: Set[str] = set()
+    channels: Set[str] = set()
+    for message in messages:
+        for key in ("user", "parent_user_id", "inviter"):
+            if message.get(key):
+                users.add(message[key])
+        users.update(message.get("reply_users") or [])
+        for reaction in message.get("reactions") or []:
+            users.update(reaction.get("users") or [])
+        for text in _texts(message):
+            for sigil, entity_id in MENTION_RE.findall(text):
+                (users if sigil == "@" else channels).add(entity_id)
+    return users, channels
@@ -0,0 +1,238 @@
+import asyncio
+import json
+import logging
+import threading
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from .cache import TTLCache
+from .channel_directory import ChannelDirectory
+from .message_store import HistorySync, ts_key
+from .projection import project_items
+from .rate_limiter import RetryPolicy
+from .user_directory import UserDirectory
+
+# Event fields that are not part of the message objects returned by conversations.history
+EVENT_ONLY_FIELDS = ("channel", "channel_type", "event_ts")
+
+# Reconnect backoff stops growing after this many failed attempts in a row
+MAX_RECONNECT_ATTEMPT = 10
+
+logger = logging.getLogger(__name__)
+
+
+class EventIngestor:
+    """
+    Applies Slack events (from Socket Mode or the Events API) to the in-process directories, entity caches and message store,
+    so reads stay current without polling Slack.
+    asyncio-only: apply() is called from the event loop, and the lock only guards the counters read by snapshot().
+    """
+    def __init__(self, user_directory: UserDirectory, channel_directory: ChannelDirectory, user_info_cache: TTLCache, channel_info_cache: TTLCache,
+                 history_sync: Optional[HistorySync] = None, user_fields: Optional[List[str]] = None, channel_fields: Optional[List[str]] = None):
+        """
+        Args:
+            history_sync (HistorySync, optional): Message store kept current by message events.
+            user_fields (list, optional): Fields kept for users added to the user directory.
+            channel_fields (list, optional): Fields kept for channels added to the channel directory.
+        """
+        self.user_directory = user_directory
+        self.channel_directory = channel_directory
+        self.user_info_cache = user_info_cache
+        self.channel_info_cache = channel_info_cache
+        self.history_sync = history_sync
+        self.user_fields = user_fields
+        self.channel_fields = channel_fields
+        self.lock = threading.Lock()
+        self.connected_at: Optional[float] = None
+        self.counts: Dict[str, int] = {}  # event type -> events applied
+        self.last_event_at: Optional[float] = None
+
+    def connected(self):
+        """
+        Called once the event stream is delivering. Channels synced from now on are kept current by message events.
+        """
+        with self.lock:
+            self.connected_at = time.time()
+        if self.history_sync:
+            self.history_sync.live_since = self.connected_at
+
+    def disconnected(self):
+        """
+        Called when the event stream drops; events may be missed until it is back, so reads poll Slack again.
+        """
+        with self.lock:
+            self.connected_at = None
+        if self.history_sync:
+            self.history_sync.live_since = None
+
+    def apply(self, event: Dict[str, Any]) -> bool:
+        """
+        Applies one event. Returns False for events that do not affect any local state.
+        """
+        kind = event.get("type", "")
+        if kind == "message":
+            handled = self._message(event)
+        elif kind in ("user_change", "team_join"):
+            handled = self._user(event["user"])
+        elif kind.startswith(("channel_", "group_")):
+            handled = self._channel(kind.split("_", 1)[1], event)
+        elif kind in ("member_joined_channel", "member_left_channel"):
+            handled = self._membership(event, 1 if kind == "member_joined_channel" else -1)
+        else:
+            handled = False
+        if handled:
+            with self.lock:
+                self.counts[kind] = self.counts.get(kind, 0) + 1
+                self.last_event_at = time.time()
+        return handled
+
+    def _message(self, event: Dict[str, Any]) -> bool:
+        if not self.history_sync:
+            return False
+        store = self.history_sync.store
+        channel = event.get("channel")
+        state = store.sync_state(channel) if channel else None
+        if state is None:
+            return False  # not stored yet; the first read backfills it
+        subtype = event.get("subtype")
+        if subtype == "message_deleted":
+            store.delete_messages(channel, [event["deleted_ts"]])
+            return True
+        message = event.get("message") if subtype in ("message_changed", "message_replied") else event
+        if not message or not message.get("ts"):
+            return False
+        if message.get("thread_ts", message["ts"]) != message["ts"] and message.get("subtype") != "thread_broadcast":
+            return False  # thread replies are not part of channel history
+        message = {key: value for key, value in message.items() if key not in EVENT_ONLY_FIELDS}
+        latest = state["latest_ts"]
+        if latest and ts_key(message["ts"]) <= ts_key(latest):
+            if state["oldest_ts"] and ts_key(message["ts"]) < ts_key(state["oldest_ts"]):
+                return False  # older than the stored range; backfills fetch it as it is now
+            store.add_messages(channel, [message])  # edit of a message inside the stored range
+            return True
+        live_since = self.history_sync.live_since
+        if live_since is None or state["synced_at"] < live_since:
+            return False  # messages may have been missed since the last sync; the next read fetches them
+        store.add_messages(channel, [message])
+        store.set_sync_state(channel, state["oldest_ts"] or message["ts"], message["ts"], bool(state["complete"]))
+        return True
+
+    def _user(self, user: Dict[str, Any]) -> bool:
+        self.user_info_cache.invalidate(user["id"])
+        self.user_directory.upsert(project_items([user], "user", self.user_fields))
+        return True
+
+    def _channel(self, action: str, event: Dict[str, Any]) -> bool:
+        if action in ("created", "rename"):
+            channel = event["channel"]
+            channel_id = channel["id"]
+            merged = {**(self.channel_directory.get(channel_id) or {}), **project_items([channel], "channel", self.channel_fields)[0]}
+            self.channel_directory.merge([merged])
+        elif action in ("archive", "unarchive"):
+            channel_id = event["channel"]
+            known = self.channel_directory.get(channel_id)
+            if known:
+                self.channel_directory.merge([{**known, "is_archived": action == "archive"}])
+        elif action == "deleted":
+            channel_id = event["channel"]
+            self.channel_directory.remove(channel_id)
+        else:
+            return False
+        self.channel_info_cache.invalidate(channel_id)
+        return True
+
+    def _membership(self, event: Dict[str, Any], delta: int) -> bool:
+        channel_id = event["channel"]
+        self.channel_info_cache.invalidate(channel_id)
+        known = self.channel_directory.get(channel_id)
+        if known and isinstance(known.get("num_members"), int):
+            self.channel_directory.merge([{**known, "num_members": max(0, known["num_members"] + delta)}])
+        return True
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self.lock:
+            return {
+                "connected": self.connected_at is not None,
+                "connected_at": self.connected_at,
+                "last_event_at": self.last_event_at,
+                "applied": dict(sorted(self.counts.items())),
+            }
+
+
+class SocketModeConsumer:
+    """
+    Receives events over Slack Socket Mode and hands them to an EventIngestor.
+    Each envelope is acknowledged before it is applied, as Slack expects within 3 seconds. The socket is reopened
+    with backoff when it drops or Slack asks for a reconnect.
+    """
+    def __init__(self, open_connection: Callable[[], Awaitable[Dict[str, Any]]], ingestor: EventIngestor, retry: Optional[RetryPolicy] = None):
+        """
+        Args:
+            open_connection (Callable): Coroutine function calling apps.connections.open with the app-level token.
+            retry (RetryPolicy, optional): Backoff between reconnect attempts.
+        """
+        self.open_connection = open_connection
+        self.ingestor = ingestor
+        self.retry = retry or RetryPolicy(max_delay=30.0)
+        self.task: Optional[asyncio.Task] = None
+
+    def start(self) -> asyncio.Task:
+        if self.task is None or self.task.done():
+            self.task = asyncio.get_running_loop().create_task(self.run())
+        return self.task
+
+    async def stop(self):
+        if self.task:
+            self.task.cancel()
+            await asyncio.gather(self.task, return_exceptions=True)
+            self.task = None
+
+    async def run(self):
+        import aiohttp  # deferred with the rest of the HTTP stack to keep server startup fast
+        attempt = 0
+        async with aiohttp.ClientSession() as session:
+            while True:
+                try:
+                    res = await self.open_connection()
+                    if res.get("ok"):
+                        async with session.ws_connect(res["url"], heartbeat=30) as ws:
+                            if await self._consume(ws):
+                                attempt = 0
+                    else:
+                        logger.warning("apps.connections.open failed: %s", res.get("error"))
+                except asyncio.CancelledError:
+                    raise
+                except Exception:
+                    # Keep reconnecting whatever went wrong; a dead consumer would silently stop all event updates
+                    logger.warning("Socket Mode connection failed; reconnecting", exc_info=True)
+                finally:
+                    self.ingestor.disconnected()
+                await asyncio.sleep(self.retry.backoff(attempt))
+                attempt = min(attempt + 1, MAX_RECONNECT_ATTEMPT)
+
+    async def _consume(self, ws: Any) -> bool:
+        """
+        Reads envelopes until the socket closes or Slack asks for a reconnect. Returns True if the connection was established.
+        """
+        import aiohttp
+        established = False
+        async for msg in ws:
+            if msg.type != aiohttp.WSMsgType.TEXT:
+                break
+            envelope = json.loads(msg.data)
+            kind = envelope.get("type")
+            if kind == "hello":
+                established = True
+                self.ingestor.connected()
+            elif kind == "disconnect":
+                break
+            if envelope.get("envelope_id"):
+                await ws.send_str(json.dumps({"envelope_id": envelope["envelope_id"]}))
+            if kind == "events_api":
+                event = (envelope.get("payload") or {}).get("event")
+                if event:
+                    try:
+                        self.ingestor.apply(event)
+                    except Exception:
+                        logger.warning("Could not apply %s event", event.get("type"), exc_info=True)
+        return established
@@ -0,0 +1,158 @@
+import gzip
+import json
+import os
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+# Scalar message fields written as Parquet columns; the whole message is kept as JSON in the "json" column
+PARQUET_COLUMNS = ["ts", "thread_ts", "user", "bot_id", "subtype", "type", "text", "reply_count", "parent_ts"]
+PARQUET_BATCH_SIZE = 10_000
+
+
+class ChannelExport:
+    """
+    Streams the history of one channel (optionally with thread replies) into a gzipped JSONL file, one message per line.
+
+    Memory is bounded by one page of history: each page is written as its own gzip member and a checkpoint next to the
+    file records the cursor and file size after it. If the export stops (e.g. ratelimited beyond the retry budget),
+    running it again with the same arguments truncates the file to the checkpointed size and carries on from the cursor.
+    The checkpoint is removed once the export is complete.
+    """
+    def __init__(self, channel: str, path: str, fetch_page: Callable[[Optional[str]], Awaitable[Dict[str, Any]]],
+                 fetch_threads: Optional[Callable[[List[dict]], Awaitable[Dict[str, Any]]]] = None, params: Optional[Dict[str, Any]] = None):
+        """
+        Args:
+            path (str): Output file, conventionally ending in .jsonl.gz.
+            fetch_page (Callable): Coroutine function taking a cursor (None for the first page) and returning a
+                conversations.history style response with raw messages.
+            fetch_threads (Callable, optional): Coroutine function taking a page of messages and returning
+                {parent ts: replies or error dict}. Replies are written after their parent with a "parent_ts" field.
+            params (dict, optional): Arguments that define the export (e.g. oldest/latest); a checkpoint written with
+                different params is discarded and the export starts over.
+        """
+        self.channel = channel
+        self.path = path
+        self.checkpoint_path = f"{path}.checkpoint.json"
+        self.fetch_page = fetch_page
+        self.fetch_threads = fetch_threads
+        self.params = {"channel": channel, "replies": fetch_threads is not None, **(params or {})}
+
+    def _load_checkpoint(self) -> Optional[Dict[str, Any]]:
+        try:
+            with open(self.checkpoint_path, encoding="utf-8") as f:
+                checkpoint = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if not isinstance(checkpoint, dict) or checkpoint.get("params") != self.params:
+            return None
+        if not os.path.exists(self.path) or os.path.getsize(self.path) < checkpoint.get("size", 0):
+            return None
+        return checkpoint
+
+    def _save_checkpoint(self, checkpoint: Dict[str, Any]):
+        tmp = f"{self.checkpoint_path}.{os.getpid()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(checkpoint, f)
+        os.replace(tmp, self.checkpoint_path)
+
+    async def run(self) -> Dict[str, Any]:
+        """
+        Runs (or resumes) the export.
+
+        Returns:
+            Dict[str, Any]: {"ok": True, "channel", "path", "messages", "replies", "threads", "thread_errors", "bytes",
+            "first_ts", "last_ts", "resumed", "seconds"} once complete, or the Slack error dict with "checkpoint" and the
+            stats so far under "partial". Nothing is written (and "path" is None) if the first request fails.
+        """
+        started = time.time()
+        checkpoint = self._load_checkpoint()
+        resumed = checkpoint is not None
+        if checkpoint is None:
+            checkpoint = {"params": self.params, "cursor": None, "size": 0, "messages": 0, "replies": 0, "threads": 0,
+                          "thread_errors": 0, "first_ts": None, "last_ts": None}
+        f = None  # opened once Slack has answered, so a failing first request leaves no file behind
+        try:
+            while True:
+                res = await self.fetch_page(checkpoint["cursor"])
+                if not res.get("ok"):
+                    if f is None and not resumed:
+                        return {**res, "channel": self.channel, "path": None, "partial": self._stats(checkpoint)}
+                    self._save_checkpoint(checkpoint)
+                    return {**res, "channel": self.channel, "path": self.path, "checkpoint": self.checkpoint_path, "partial": self._stats(checkpoint)}
+                if f is None:
+                    os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+                    f = open(self.path, "ab")
+                    f.truncate(checkpoint["size"])  # drop anything written after the last checkpoint
+                messages = res.get("messages", [])
+                threads = await self.fetch_threads(messages) if self.fetch_threads and messages else {}
+                lines = []
+                for message in messages:
+                    lines.append(json.dumps(message, ensure_ascii=False, separators=(",", ":")))
+                    ts = message.get("ts")
+                    if ts:
+                        # History pages run newest first, so the first message written is the latest
+                        checkpoint["last_ts"] = checkpoint["last_ts"] or ts
+                        checkpoint["first_ts"] = ts
+                    thread = threads.get(ts)
+                    if isinstance(thread, list):
+                        checkpoint["threads"] += 1
+                        checkpoint["replies"] += len(thread)
+                        lines.extend(json.dumps({**reply, "parent_ts": ts}, ensure_ascii=False, separators=(",", ":")) for reply in thread)
+                    elif thread is not None:
+                        checkpoint["thread_errors"] += 1
+                checkpoint["messages"] += len(messages)
+                if lines:
+                    f.write(gzip.compress(("\n".join(lines) + "\n").encode("utf-8")))
+                    f.flush()
+                    checkpoint["size"] = f.tell()
+                checkpoint["cursor"] = (res.get("response_metadata") or {}).get("next_cursor") or None
+                if checkpoint["cursor"] is None:
+                    break
+                self._save_checkpoint(checkpoint)
+        finally:
+            if f is not None:
+                f.close()
+        try:
+            os.remove(self.checkpoint_path)
+        except OSError:
+            pass
+        return {"ok": True, "channel": self.channel, "path": self.path, **self._stats(checkpoint), "resumed": resumed, "seconds": round(time.time() - started, 3)}
+
+    def _stats(self, checkpoint: Dict[str, Any]) -> Dict[str, Any]:
+        stats = {key: checkpoint[key] for key in ("messages", "replies", "threads", "thread_errors", "first_ts", "last_ts")}
+        stats["bytes"] = checkpoint["size"]
+        return stats
+
+
+def jsonl_to_parquet(source: str, path: str, batch_size: int = PARQUET_BATCH_SIZE) -> int:
+    """
+    Converts a (gzipped) JSONL export to Parquet, one row group per ``batch_size`` messages, so memory stays bounded.
+    Columns are PARQUET_COLUMNS plus "json" holding the whole message. Returns the number of rows written.
+    Requires pyarrow.
+    """
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError as e:
+        raise RuntimeError("The pyarrow package is required for Parquet exports (pip install pyarrow).") from e
+    schema = pa.schema([(name, pa.int64() if name == "reply_count" else pa.string()) for name in PARQUET_COLUMNS] + [("json", pa.string())])
+    rows = 0
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with gzip.open(source, "rt", encoding="utf-8") as lines, pq.ParquetWriter(tmp, schema, compression="zstd") as writer:
+        batch: List[str] = []
+        def flush():
+            messages = [json.loads(line) for line in batch]
+            columns = {name: [message.get(name) for message in messages] for name in PARQUET_COLUMNS}
+            columns["json"] = batch
+            writer.write_table(pa.Table.from_pydict(columns, schema=schema))
+        for line in lines:
+            batch.append(line.rstrip("\n"))
+            if len(batch) >= batch_size:
+                flush()
+                rows += len(batch)
+                batch = []
+        if batch:
+            flush()
+            rows += len(batch)
+    os.replace(tmp, path)
+    return rows
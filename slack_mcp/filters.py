@@ -0,0 +1,100 @@
+import re
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# Cursor for resuming a filtered scan part-way through a page: "filter:<items to skip>:<Slack cursor of that page>"
+FILTER_CURSOR_PREFIX = "filter:"
+
+_MISSING = object()
+
+
+def _lookup(item: Any, path: List[str]) -> Any:
+    for key in path:
+        if not isinstance(item, dict) or key not in item:
+            return _MISSING
+        item = item[key]
+    return item
+
+
+def _compare(op: str, expected: Any) -> Callable[[Any], bool]:
+    if op == "eq":
+        return lambda value: value == expected
+    if op == "ne":
+        return lambda value: value != expected
+    if op in ("gt", "gte", "lt", "lte"):
+        test = {"gt": lambda a, b: a > b, "gte": lambda a, b: a >= b, "lt": lambda a, b: a < b, "lte": lambda a, b: a <= b}[op]
+        def ordered(value: Any) -> bool:
+            try:
+                return value is not None and test(float(value), float(expected))
+            except (TypeError, ValueError):
+                return False
+        return ordered
+    if op in ("in", "nin"):
+        if not isinstance(expected, list):
+            raise ValueError(f"Filter operator {op!r} needs a list.")
+        options = set(map(str, expected))
+        return (lambda value: str(value) in options) if op == "in" else (lambda value: str(value) not in options)
+    if op in ("contains", "icontains", "startswith", "endswith"):
+        needle = str(expected).lower() if op == "icontains" else str(expected)
+        if op == "contains":
+            return lambda value: isinstance(value, str) and needle in value
+        if op == "icontains":
+            return lambda value: isinstance(value, str) and needle in value.lower()
+        if op == "startswith":
+            return lambda value: isinstance(value, str) and value.startswith(needle)
+        return lambda value: isinstance(value, str) and value.endswith(needle)
+    if op == "regex":
+        try:
+            pattern = re.compile(str(expected))
+        except re.error as e:
+            raise ValueError(f"Invalid regex {expected!r}: {e}") from e
+        return lambda value: isinstance(value, str) and pattern.search(value) is not None
+    raise ValueError(f"Unknown filter operator {op!r}. Use one of eq, ne, gt, gte, lt, lte, in, nin, contains, icontains, startswith, endswith, regex, exists.")
+
+
+def compile_filter(filters: Dict[str, Any]) -> Callable[[dict], bool]:
+    """
+    Compiles a filter spec into a predicate over Slack objects. Every condition must hold.
+
+    The spec maps dotted field paths to a value (equality) or to a dict of operators, e.g.
+    {"is_bot": False, "tz": {"startswith": "Europe/"}, "num_members": {"gt": 50}, "profile.title": {"icontains": "eng"}}.
+    Conditions on a missing field fail, except {"exists": False} and "ne"/"nin".
+    Raises ValueError for an unknown operator or malformed value.
+    """
+    if not isinstance(filters, dict):
+        raise ValueError("filters must be an object mapping field paths to conditions.")
+    conditions: List[Tuple[List[str], Callable[[Any], bool], bool]] = []  # (path, test, result when missing)
+    for field, condition in filters.items():
+        path = field.split(".")
+        if not isinstance(condition, dict):
+            conditions.append((path, _compare("eq", condition), False))
+            continue
+        for op, expected in condition.items():
+            if op == "exists":
+                conditions.append((path, lambda value, present=bool(expected): present, not expected))
+            else:
+                conditions.append((path, _compare(op, expected), op in ("ne", "nin")))
+
+    def predicate(item: dict) -> bool:
+        for path, test, when_missing in conditions:
+            value = _lookup(item, path)
+            if not (when_missing if value is _MISSING else test(value)):
+                return False
+        return True
+    return predicate
+
+
+def parse_filter_cursor(cursor: Optional[str]) -> Tuple[Optional[str], int]:
+    """
+    Splits a cursor from a filtered scan into (Slack cursor of the page, items to skip on it).
+    Plain Slack cursors resume at the start of their page. Raises ValueError for a malformed filter cursor.
+    """
+    if not cursor or not cursor.startswith(FILTER_CURSOR_PREFIX):
+        return cursor, 0
+    skip, _, page_cursor = cursor[len(FILTER_CURSOR_PREFIX):].partition(":")
+    if not skip.isdigit():
+        raise ValueError(f"Malformed filter cursor {cursor!r}.")
+    return page_cursor or None, int(skip)
+
+
+def filter_cursor(page_cursor: Optional[str], skip: int) -> str:
+    return f"{FILTER_CURSOR_PREFIX}{skip}:{page_cursor or ''}"
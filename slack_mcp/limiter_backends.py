@@ -0,0 +1,242 @@
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import Dict, List, Optional, Tuple
+
+# (bucket name, tokens per second, burst capacity)
+BucketSpec = Tuple[str, float, float]
+
+
+class TokenBucket:
+    """
+    Token bucket refilled continuously at ``rate`` tokens per second up to ``capacity``.
+    Not thread-safe on its own; LocalBackend guards it with its lock.
+    """
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.time()
+
+    def wait_time(self, now: float) -> float:
+        """
+        Refills the bucket up to ``now`` and returns seconds until a token is available.
+        Tokens go negative while callers are queued, so later callers wait longer.
+        """
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        return max(0.0, (1.0 - self.tokens) / self.rate)
+
+    def take(self):
+        self.tokens -= 1.0
+
+
+class LimiterBackend(ABC):
+    """
+    Storage for SlackRateLimiter state: token buckets and Retry-After deadlines.
+    Shared backends let several server processes using the same bot token draw from one budget.
+    """
+    # Whether calls do I/O that may block (e.g. on a lock held by another process); async callers then run them in a worker thread
+    blocking = True
+
+    @abstractmethod
+    def reserve(self, specs: List[BucketSpec], max_wait: Optional[float], deadline: Optional[str] = None) -> Tuple[bool, float]:
+        """
+        Atomically refills the given buckets and takes one token from each, unless the wait exceeds ``max_wait``.
+        The wait is the longest of the buckets' waits and, if ``deadline`` names a method, what is left of its Retry-After deadline.
+        Returns (granted, seconds to wait).
+        """
+
+    @abstractmethod
+    def get_deadline(self, method: str) -> Optional[float]:
+        """
+        Returns the unix time before which ``method`` must not be called, or None.
+        """
+
+    @abstractmethod
+    def set_deadline(self, method: str, until: float):
+        """
+        Sets the unix time before which ``method`` must not be called.
+        """
+
+
+class LocalBackend(LimiterBackend):
+    """
+    In-process state, guarded by a lock.
+    """
+    blocking = False
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.buckets: Dict[str, TokenBucket] = {}
+        self.next_allowed: Dict[str, float] = {}  # method -> unix timestamp
+
+    def reserve(self, specs: List[BucketSpec], max_wait: Optional[float], deadline: Optional[str] = None) -> Tuple[bool, float]:
+        with self.lock:
+            now = time.time()
+            buckets = []
+            for name, rate, capacity in specs:
+                if name not in self.buckets:
+                    self.buckets[name] = TokenBucket(rate, capacity)
+                buckets.append(self.buckets[name])
+            # Buckets keep refilling during a Retry-After penalty, so the caller waits for whichever ends last
+            penalty = self.next_allowed.get(deadline, now) - now if deadline else 0.0
+            wait = max([penalty] + [bucket.wait_time(now) for bucket in buckets])
+            if max_wait is not None and wait > max_wait:
+                return False, wait
+            for bucket in buckets:
+                bucket.take()
+            return True, wait
+
+    def get_deadline(self, method: str) -> Optional[float]:
+        with self.lock:
+            return self.next_allowed.get(method)
+
+    def set_deadline(self, method: str, until: float):
+        with self.lock:
+            self.next_allowed[method] = until
+
+
+class SQLiteBackend(LimiterBackend):
+    """
+    State kept in a SQLite file shared by every process on the host (or on a shared volume).
+    Each reservation runs in an IMMEDIATE transaction, so processes never double-spend a token.
+    """
+    SCHEMA = """
+    CREATE TABLE IF NOT EXISTS buckets (name TEXT PRIMARY KEY, tokens REAL NOT NULL, updated REAL NOT NULL);
+    CREATE TABLE IF NOT EXISTS deadlines (method TEXT PRIMARY KEY, until REAL NOT NULL);
+    """
+
+    def __init__(self, path: str, namespace: str = ""):
+        """
+        Args:
+            path (str): SQLite database file.
+            namespace (str): Prefix for every key, so processes using different tokens do not share budgets.
+        """
+        self.lock = threading.Lock()
+        self.namespace = namespace
+        self.conn = sqlite3.connect(path, timeout=30.0, isolation_level=None, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript(self.SCHEMA)
+
+    def reserve(self, specs: List[BucketSpec], max_wait: Optional[float], deadline: Optional[str] = None) -> Tuple[bool, float]:
+        with self.lock:
+            self.conn.execute("BEGIN IMMEDIATE")
+            try:
+                now = time.time()
+                penalty = 0.0
+                if deadline:
+                    row = self.conn.execute("SELECT until FROM deadlines WHERE method = ?", (self.namespace + deadline,)).fetchone()
+                    penalty = row[0] - now if row else 0.0
+                states = []
+                for name, rate, capacity in specs:
+                    row = self.conn.execute("SELECT tokens, updated FROM buckets WHERE name = ?", (self.namespace + name,)).fetchone()
+                    tokens, updated = row if row else (capacity, now)
+                    states.append((name, rate, min(capacity, tokens + max(0.0, now - updated) * rate)))
+                wait = max([penalty] + [max(0.0, (1.0 - tokens) / rate) for _, rate, tokens in states])
+                granted = max_wait is None or wait <= max_wait
+                self.conn.executemany(
+                    "INSERT INTO buckets (name, tokens, updated) VALUES (?, ?, ?) "
+                    "ON CONFLICT(name) DO UPDATE SET tokens = excluded.tokens, updated = excluded.updated",
+                    [(self.namespace + name, tokens - 1.0 if granted else tokens, now) for name, _, tokens in states],
+                )
+                self.conn.execute("COMMIT")
+            except BaseException:
+                self.conn.execute("ROLLBACK")
+                raise
+            return granted, wait
+
+    def get_deadline(self, method: str) -> Optional[float]:
+        with self.lock:
+            row = self.conn.execute("SELECT until FROM deadlines WHERE method = ?", (self.namespace + method,)).fetchone()
+            return row[0] if row else None
+
+    def set_deadline(self, method: str, until: float):
+        with self.lock:
+            self.conn.execute(
+                "INSERT INTO deadlines (method, until) VALUES (?, ?) ON CONFLICT(method) DO UPDATE SET until = excluded.until",
+                (self.namespace + method, until),
+            )
+
+
+# Refills and charges every bucket in KEYS[2..] in one atomic step, waiting out the Retry-After deadline in KEYS[1] too.
+# ARGV: now, max_wait (negative for none), then rate and capacity for each bucket.
+RESERVE_SCRIPT = """
+local now = tonumber(ARGV[1])
+local max_wait = tonumber(ARGV[2])
+local wait = math.max(0, (tonumber(redis.call('GET', KEYS[1])) or now) - now)
+local tokens = {}
+for i = 2, #KEYS do
+  local rate = tonumber(ARGV[2 * i - 1])
+  local capacity = tonumber(ARGV[2 * i])
+  local state = redis.call('HMGET', KEYS[i], 'tokens', 'updated')
+  local t = tonumber(state[1]) or capacity
+  local updated = tonumber(state[2]) or now
+  t = math.min(capacity, t + math.max(0, now - updated) * rate)
+  tokens[i] = t
+  wait = math.max(wait, math.max(0, (1 - t) / rate))
+end
+local granted = max_wait < 0 or wait <= max_wait
+for i = 2, #KEYS do
+  local t = tokens[i]
+  if granted then t = t - 1 end
+  redis.call('HSET', KEYS[i], 'tokens', tostring(t), 'updated', tostring(now))
+  redis.call('EXPIRE', KEYS[i], 3600)
+end
+if granted then return {1, tostring(wait)} end
+return {0, tostring(wait)}
+"""
+
+
+class RedisBackend(LimiterBackend):
+    """
+    State kept in Redis (or any server speaking the Redis protocol), shared by replicas on any host.
+    Requires the optional ``redis`` package. Replicas should have roughly synchronized clocks.
+    """
+    def __init__(self, url: str, namespace: str = "", client=None):
+        """
+        Args:
+            url (str): Redis URL, e.g. redis://localhost:6379/0.
+            namespace (str): Prefix for every key, so processes using different tokens do not share budgets.
+            client (optional): Existing redis client to use instead of connecting to ``url``.
+        """
+        if client is None:
+            try:
+                import redis
+            except ImportError as e:
+                raise RuntimeError("The redis package is required for a redis:// rate limit backend (pip install redis).") from e
+            client = redis.Redis.from_url(url)
+        self.client = client
+        self.prefix = f"slack_mcp:ratelimit:{namespace}"
+        self.reserve_script = client.register_script(RESERVE_SCRIPT)
+
+    def reserve(self, specs: List[BucketSpec], max_wait: Optional[float], deadline: Optional[str] = None) -> Tuple[bool, float]:
+        args: List[float] = [time.time(), -1.0 if max_wait is None else max_wait]
+        for _, rate, capacity in specs:
+            args.extend([rate, capacity])
+        # Without a deadline to check, KEYS[1] names a key that is never set
+        keys = [f"{self.prefix}deadline:{deadline}" if deadline else f"{self.prefix}nodeadline"]
+        granted, wait = self.reserve_script(keys=keys + [f"{self.prefix}bucket:{name}" for name, _, _ in specs], args=args)
+        return bool(int(granted)), float(wait)
+
+    def get_deadline(self, method: str) -> Optional[float]:
+        value = self.client.get(f"{self.prefix}deadline:{method}")
+        return float(value) if value is not None else None
+
+    def set_deadline(self, method: str, until: float):
+        ttl_ms = max(1, int((until - time.time()) * 1000))
+        self.client.set(f"{self.prefix}deadline:{method}", str(until), px=ttl_ms)
+
+
+def make_backend(url: Optional[str], namespace: str = "") -> LimiterBackend:
+    """
+    Builds a backend from a URL: empty or "local" for in-process state, "sqlite:///path/to/file.db", or "redis://..." / "rediss://...".
+    """
+    if not url or url == "local":
+        return LocalBackend()
+    if url.startswith("sqlite://"):
+        return SQLiteBackend(url[len("sqlite://"):], namespace=namespace)
+    if url.startswith(("redis://", "rediss://", "unix://")):
+        return RedisBackend(url, namespace=namespace)
+    raise ValueError(f"Unsupported rate limit backend: {url}")
@@ -0,0 +1,158 @@
+import math
+import re
+import shlex
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, List, Optional
+
+from .message_store import MessageStore
+
+# Slack search modifiers handled locally: in:#channel, from:@user, after:/before:/on:YYYY-MM-DD.
+# Other Slack modifiers (during:, has:, is:, ...) and relative dates are left to Slack.
+MODIFIER_RE = re.compile(r"^(in|from|to|with|after|before|on|during|has|is):(.+)$", re.IGNORECASE)
+LOCAL_MODIFIERS = ("in", "from", "after", "before", "on")
+MENTION_RE = re.compile(r"^<[#@]([A-Z0-9]+)(?:\|[^>]*)?>$")
+USER_ID_RE = re.compile(r"^[UW][A-Z0-9]+$")
+
+
+def _day_ts(value: str, days: int = 0) -> int:
+    day = datetime.strptime(value, "%Y-%m-%d").replace(tzinfo=timezone.utc) + timedelta(days=days)
+    return int(day.timestamp())
+
+
+def _just_before(seconds: int) -> str:
+    # Exclusive lower bound that still admits a message posted exactly at ``seconds``
+    return f"{seconds - 1}.999999"
+
+
+def _entity_id(value: str) -> str:
+    """
+    Strips Slack mention markup (<#C123|name>, <@U123>) and a leading # or @.
+    """
+    match = MENTION_RE.match(value)
+    if match:
+        return match.group(1)
+    return value.lstrip("#@")
+
+
+def parse_query(query: str) -> Dict[str, Any]:
+    """
+    Splits a Slack search query into free-text terms and modifier filters.
+
+    Returns:
+        Dict[str, Any]: {"terms": [...], "channels": [...], "users": [...], "after": ts or None, "before": ts or None,
+        "unsupported": [...]}. Dates are converted to exclusive Slack timestamp bounds (UTC days). Modifiers that cannot
+        be evaluated locally, including dates other than YYYY-MM-DD, are listed under "unsupported".
+    """
+    parsed: Dict[str, Any] = {"terms": [], "channels": [], "users": [], "after": None, "before": None, "unsupported": []}
+    try:
+        tokens = shlex.split(query)
+    except ValueError:
+        tokens = query.split()
+    for token in tokens:
+        match = MODIFIER_RE.match(token)
+        if not match:
+            parsed["terms"].append(token)
+            continue
+        name, value = match.group(1).lower(), match.group(2)
+        if name not in LOCAL_MODIFIERS:
+            parsed["unsupported"].append(token)
+            continue
+        if name in ("after", "before", "on"):
+            try:
+                _day_ts(value)
+            except ValueError:
+                parsed["unsupported"].append(token)
+                continue
+        if name == "in":
+            parsed["channels"].append(_entity_id(value))
+        elif name == "from":
+            parsed["users"].append(_entity_id(value))
+        elif name == "after":
+            parsed["after"] = _just_before(_day_ts(value, 1))
+        elif name == "before":
+            parsed["before"] = str(_day_ts(value))
+        else:
+            parsed["after"] = _just_before(_day_ts(value))
+            parsed["before"] = str(_day_ts(value, 1))
+    return parsed
+
+
+def fts_match(terms: List[str]) -> Optional[str]:
+    """
+    Builds an FTS5 MATCH expression requiring every term; each term is quoted so user input is never parsed as FTS syntax.
+    """
+    phrases = ['"' + term.replace('"', '""') + '"' for term in terms if term.strip()]
+    return " AND ".join(phrases) or None
+
+
+def search_local(store: MessageStore, query: str, sort: Optional[str] = None, sort_dir: Optional[str] = None, count: Optional[int] = None, page: Optional[int] = None, resolve_channel: Optional[Callable[[str], Optional[str]]] = None, resolve_user: Optional[Callable[[str], Optional[str]]] = None) -> Optional[Dict[str, Any]]:
+    """
+    Answers a search.messages query from the local full-text index, in search.messages' response shape.
+    Only channels whose whole history is in the store can be searched locally. Thread replies are not stored, so
+    answers cover channel history only, which the response states under "scope".
+    Returns None, so the caller can fall back to Slack, when the query has no in: modifier, targets a channel that is
+    not completely synced (or a name that cannot be resolved), or uses a modifier that is not supported locally.
+
+    Args:
+        resolve_channel (Callable, optional): Maps a channel name to its ID for in:#name modifiers.
+        resolve_user (Callable, optional): Maps a username to its ID for from:@name modifiers.
+    """
+    parsed = parse_query(query)
+    # Without in: the query spans channels the store has never seen, which only Slack can answer
+    if parsed["unsupported"] or not parsed["channels"]:
+        return None
+    complete = set(store.complete_channels())
+    channels = []
+    for channel in parsed["channels"]:
+        channel_id = channel if channel in complete else (resolve_channel(channel) if resolve_channel else None)
+        if channel_id not in complete:
+            return None
+        channels.append(channel_id)
+    users = []
+    for user in parsed["users"]:
+        user_id = user if USER_ID_RE.match(user) else (resolve_user(user) if resolve_user else None)
+        if not user_id:
+            return None
+        users.append(user_id)
+    count = count or 20
+    page = page or 1
+    total, rows = store.search(
+        fts_match(parsed["terms"]),
+        channels=channels,
+        users=users,
+        after=parsed["after"],
+        before=parsed["before"],
+        sort=sort or "score",
+        sort_dir=sort_dir or "desc",
+        limit=count,
+        offset=(page - 1) * count,
+    )
+    matches = []
+    for row in rows:
+        message = row["message"]
+        matches.append({
+            **message,
+            "type": message.get("type", "message"),
+            "channel": {"id": row["channel"]},
+            "highlights": [row["highlight"]],
+        })
+    pages = max(1, math.ceil(total / count))
+    return {
+        "ok": True,
+        "query": query,
+        "messages": {
+            "total": total,
+            "matches": matches,
+            "paging": {"count": count, "total": total, "page": page, "pages": pages},
+            "pagination": {
+                "total_count": total,
+                "page": page,
+                "per_page": count,
+                "page_count": pages,
+                "first": (page - 1) * count + 1 if matches else 0,
+                "last": (page - 1) * count + len(matches),
+            },
+        },
+        "source": "local",
+        "scope": {"channels": channels, "thread_replies": False},
+    }
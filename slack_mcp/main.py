@@ -1,206 +1,734 @@
 """
-Slack MCP Server entrypoint using FastMCP and stdio transport.
+Slack MCP Server entrypoint using FastMCP, over stdio or (SLACK_MCP_TRANSPORT=http|sse) a shared HTTP transport.
 Implements Slack workspace tools as described in project planning and task.
 """
+import asyncio
+import hashlib
+import importlib.util
+from contextlib import asynccontextmanager
 import os
+import re
+import sys
 from fastmcp.server import FastMCP
-from slack_sdk import WebClient
-from slack_sdk.errors import SlackApiError
-from typing import Any, Dict, Optional, List
-from .rate_limiter import SlackRateLimiter
+from typing import Any, Dict, Optional, List, Set, Tuple
+from .aggregation import AGGREGATE_FIELDS, ChannelStats
+from .cache import TTLCache
+from .channel_directory import ChannelDirectory
+from .entities import collect_entities
+from .filters import compile_filter, filter_cursor, parse_filter_cursor
+from .events import EventIngestor, SocketModeConsumer
+from .export import ChannelExport, jsonl_to_parquet
+from .limiter_backends import make_backend
+from .local_search import search_local
+from .message_store import HistorySync, MessageStore, STORE_CURSOR_PREFIX
+from .message_stream import MessageStream, StreamRegistry
+from .metrics import Metrics, serve_metrics
+from .projection import COMPACT_FIELDS, project_items, project_response
+from .rate_limiter import RetryPolicy, SlackRateLimiter
+from .sessions import SessionConcurrencyMiddleware, SessionLimiter
+from .single_flight import SingleFlight, request_key
+from .snapshot import load_snapshot, save_snapshot
+from .uploads import base64_chunks, file_chunks, normalize_base64, post_upload, source_length
+from .user_directory import UserDirectory
 
-rate_limiter = SlackRateLimiter()
+metrics = Metrics()
+METRICS_PORT = os.getenv("SLACK_METRICS_PORT")
+METRICS_HOST = os.getenv("SLACK_METRICS_HOST", "127.0.0.1")
 
 SUPABASE_URL = os.getenv("SUPABASE_URL")
 SUPABASE_SERVICE_ROLE_KEY = os.getenv("SUPABASE_SERVICE_ROLE_KEY")
 
 SLACK_BOT_TOKEN = os.getenv("SLACK_BOT_TOKEN")
 
-if not SLACK_BOT_TOKEN:
-    raise RuntimeError("SLACK_BOT_TOKEN environment variable is required.")
+# Overridable so the server can be pointed at a stand-in API, e.g. benchmarks/fake_slack.py
+SLACK_API_BASE_URL = os.getenv("SLACK_API_BASE_URL", "https://slack.com/api/")
 
-slack_client = WebClient(token=SLACK_BOT_TOKEN)
+# Filtered scans fetch pages of this size and give up (returning a cursor to continue) after scanning FILTER_MAX_SCAN items
+FILTER_PAGE_SIZE = int(os.getenv("SLACK_FILTER_PAGE_SIZE", "200"))
+FILTER_MAX_SCAN = int(os.getenv("SLACK_FILTER_MAX_SCAN", "20000"))
+FILTER_DEFAULT_LIMIT = 100
+
+# History is paged STREAM_PAGE_SIZE messages at a time by streams, exports and aggregations; a stream buffers at most STREAM_BUFFER_SIZE
+STREAM_PAGE_SIZE = 200
+STREAM_BUFFER_SIZE = int(os.getenv("SLACK_STREAM_BUFFER_SIZE", "2000"))
+
+# Concurrent Slack lookups for expand_threads and for resolving entities
+THREAD_FETCH_CONCURRENCY = int(os.getenv("SLACK_THREAD_FETCH_CONCURRENCY", "8"))
+ENTITY_FETCH_CONCURRENCY = int(os.getenv("SLACK_ENTITY_FETCH_CONCURRENCY", "10"))
+# More user misses than this load the whole user directory (a few users.list pages) instead of one users.info each
+ENTITY_DIRECTORY_LOAD_MISSES = 5
+
+SEARCH_BACKEND = os.getenv("SLACK_SEARCH_BACKEND", "slack")
+
+# Only files under this directory may be uploaded by path, so a tool call cannot send arbitrary server files
+# (e.g. the .env holding the bot token) to Slack; path uploads are refused when it is unset
+UPLOAD_DIR = os.getenv("SLACK_UPLOAD_DIR")
+
+EXPORT_DIR = os.getenv("SLACK_EXPORT_DIR", "exports")
+EXPORT_CONCURRENCY = int(os.getenv("SLACK_EXPORT_CONCURRENCY", "4"))
+# Export file names are built from these, so anything else is refused before a path is formed
+CHANNEL_ID_PATTERN = re.compile(r"^[CGD][A-Z0-9]+$")
+SLACK_TS_PATTERN = re.compile(r"^\d+(\.\d+)?$")
+
+# Built on first use by _client(), so importing the server and listing tools needs neither a token nor slack_sdk/aiohttp
+slack_client = None
+
+# Replicas sharing a backend share budgets per bot token, keyed by a hash so the token itself is never stored
+RATE_LIMIT_NAMESPACE = hashlib.sha256(SLACK_BOT_TOKEN.encode()).hexdigest()[:16] + ":" if SLACK_BOT_TOKEN else ""
+# Ratelimited and transient failures are retried in the server for up to SLACK_RETRY_MAX_WAIT seconds (0 disables)
+RETRY_MAX_WAIT = float(os.getenv("SLACK_RETRY_MAX_WAIT", "30"))
+rate_limiter = SlackRateLimiter(
+    max_queue_wait=float(os.getenv("SLACK_RATE_LIMIT_MAX_QUEUE_WAIT", "60")),
+    metrics=metrics,
+    backend=make_backend(os.getenv("SLACK_RATE_LIMIT_BACKEND"), namespace=RATE_LIMIT_NAMESPACE),
+    retry=RetryPolicy(max_wait=RETRY_MAX_WAIT, max_attempts=int(os.getenv("SLACK_RETRY_MAX_ATTEMPTS", "5"))) if RETRY_MAX_WAIT > 0 else None,
+)
+
+SLACK_HTTP_POOL_SIZE = int(os.getenv("SLACK_HTTP_POOL_SIZE", "32"))
+_session_loop: Optional[asyncio.AbstractEventLoop] = None
+_session_closing: Optional[asyncio.Task] = None  # close of the pool replaced by the current one
+
+def _is_sdk_client(client: Any) -> bool:
+    # Checked through sys.modules so slack_sdk is only imported once a client is actually built
+    module = sys.modules.get("slack_sdk.web.async_client")
+    return module is not None and isinstance(client, module.AsyncWebClient)
+
+def _client():
+    """
+    Returns the shared Slack client, building it on first use and attaching one keep-alive aiohttp connection pool per event loop.
+    The pool of a previous event loop is closed when it is replaced.
+    """
+    global slack_client, _session_loop, _session_closing
+    if slack_client is None:
+        if not SLACK_BOT_TOKEN:
+            raise RuntimeError("SLACK_BOT_TOKEN environment variable is required.")
+        from slack_sdk.web.async_client import AsyncWebClient
+        slack_client = AsyncWebClient(token=SLACK_BOT_TOKEN, base_url=SLACK_API_BASE_URL)
+    if _is_sdk_client(slack_client):
+        import aiohttp
+        loop = asyncio.get_running_loop()
+        if slack_client.session is None or slack_client.session.closed or _session_loop is not loop:
+            if slack_client.session is not None and not slack_client.session.closed:
+                _session_closing = loop.create_task(slack_client.session.close())
+            connector = aiohttp.TCPConnector(limit=SLACK_HTTP_POOL_SIZE, keepalive_timeout=60)
+            slack_client.session = aiohttp.ClientSession(connector=connector)
+            _session_loop = loop
+    return slack_client
+
+def _error_response(e: Exception) -> Dict[str, Any]:
+    """
+    Converts an exception from a Slack call into an error dict, with Slack's response attached for SlackApiError.
+    """
+    errors = sys.modules.get("slack_sdk.errors")
+    if errors is not None and isinstance(e, errors.SlackApiError):
+        return {"error": str(e), "details": getattr(e, "response", None)}
+    return {"error": str(e)}
+
+single_flight = SingleFlight(metrics=metrics)
+
+# Read-through caches for per-entity lookups; writes made by this server invalidate the affected entries
+CACHE_MAX_ENTRIES = int(os.getenv("SLACK_CACHE_MAX_ENTRIES", "5000"))
+user_info_cache = TTLCache("user_info", max_entries=CACHE_MAX_ENTRIES, ttl=float(os.getenv("SLACK_USER_INFO_TTL", "300")), metrics=metrics)
+channel_info_cache = TTLCache("channel_info", max_entries=CACHE_MAX_ENTRIES, ttl=float(os.getenv("SLACK_CHANNEL_INFO_TTL", "300")), metrics=metrics)
+
+async def _shared_read(method: str, params: Dict[str, Any], slack_call) -> Dict[str, Any]:
+    """
+    Makes a rate-limited read through the single-flight layer, so identical concurrent reads share one Slack call.
+    """
+    return await single_flight.do(request_key(method, params), lambda: rate_limiter.wrap_async(method, slack_call))
 
 # --- FastMCP Server Setup ---
-server = FastMCP(name="Slack MCP Server")
+@asynccontextmanager
+async def _lifespan(server: FastMCP):
+    # The Socket Mode consumer runs on the server's event loop for as long as the server does
+    if socket_consumer:
+        socket_consumer.start()
+    # Directories restored from a snapshot answer at once; stale ones are delta-refreshed in the background from here
+    if user_directory.loaded_at is not None:
+        await user_directory.ensure_loaded()
+    if channel_directory.loaded_at is not None:
+        channel_directory.refresh_if_stale()
+    try:
+        yield {}
+    finally:
+        if socket_consumer:
+            await socket_consumer.stop()
+        if _is_sdk_client(slack_client) and slack_client.session is not None:
+            await slack_client.session.close()
+
+server = FastMCP(name="Slack MCP Server", lifespan=_lifespan)
+
+# With the HTTP transport one process serves many clients, all sharing the Slack client, caches and rate limiter;
+# each client session may only run SLACK_SESSION_MAX_CONCURRENCY tool calls at once (0 disables the limit)
+MCP_TRANSPORT = os.getenv("SLACK_MCP_TRANSPORT", "stdio")
+MCP_HOST = os.getenv("SLACK_MCP_HOST", "127.0.0.1")
+MCP_PORT = int(os.getenv("SLACK_MCP_PORT", "8000"))
+session_limiter = SessionLimiter(
+    max_concurrency=int(os.getenv("SLACK_SESSION_MAX_CONCURRENCY", "4")),
+    max_queue_wait=float(os.getenv("SLACK_SESSION_MAX_QUEUE_WAIT", "60")),
+    metrics=metrics,
+)
+if MCP_TRANSPORT != "stdio":
+    # Over stdio the process serves a single client, whose tool calls should all overlap
+    server.add_middleware(SessionConcurrencyMiddleware(session_limiter))
 
 # --- Tool Implementations ---
 @server.tool(
     name="send_message",
     description="Sends a message to a specified Slack channel or direct message. Can be used to post new messages or reply to threads. Supports both plain text and rich formatting with blocks."
 )
-def send_message(channel: str, text: str, thread_ts: Optional[str] = None, blocks: Optional[List[dict]] = None) -> Dict[str, Any]:
+async def send_message(channel: str, text: str, thread_ts: Optional[str] = None, blocks: Optional[List[dict]] = None) -> Dict[str, Any]:
     """
     Sends a message to a specified Slack channel or direct message. Can be used to post new messages or reply to threads. Supports both plain text and rich formatting with blocks.
     """
-    def slack_call():
-        return slack_client.chat_postMessage(
+    channel, error = await _resolve_channel(channel)
+    if error:
+        return error
+    async def slack_call():
+        return await _client().chat_postMessage(
             channel=channel,
             text=text,
             thread_ts=thread_ts,
             blocks=blocks
-        ).data
-    result = rate_limiter.wrap("chat_postMessage", slack_call)
+        )
+    result = await rate_limiter.wrap_async("chat_postMessage", slack_call, key=channel)
     return result
 
+@server.tool(
+    name="send_messages_bulk",
+    description="Sends many messages in one call. Each item has channel, text, and optional thread_ts and blocks. Channels are posted to concurrently, messages within a channel in order, paced by Slack's per-channel limit. Returns a result (ts or error) per item."
+)
+async def send_messages_bulk(messages: List[dict], max_concurrency: int = 10) -> Dict[str, Any]:
+    """
+    Sends many messages in one call. Each item has channel, text, and optional thread_ts and blocks. Channels are posted to concurrently, messages within a channel in order, paced by Slack's per-channel limit. Returns a result (ts or error) per item.
+
+    Args:
+        messages (List[dict]): Items of {"channel", "text", "thread_ts"?, "blocks"?}.
+        max_concurrency (int): Maximum number of channels posted to at the same time.
+
+    Returns:
+        Dict[str, Any]: {"ok": True, "results": [{"index", "channel", "ok", "ts" or "error"}, ...], "sent": n, "failed": n}.
+    """
+    results: List[Optional[Dict[str, Any]]] = [None] * len(messages)
+    valid: List[int] = []
+    for index, item in enumerate(messages):
+        if not item.get("channel") or item.get("text") is None:
+            results[index] = {"index": index, "channel": item.get("channel"), "ok": False, "error": "channel and text are required"}
+        else:
+            valid.append(index)
+    # "#general" and its ID must share one group, or their messages would be posted concurrently and out of order
+    names = list(dict.fromkeys(messages[index]["channel"] for index in valid))
+    resolved = dict(zip(names, await asyncio.gather(*(_resolve_channel(name) for name in names))))
+    by_channel: Dict[str, List[int]] = {}
+    for index in valid:
+        channel, error = resolved[messages[index]["channel"]]
+        if error:
+            results[index] = {"index": index, "channel": channel, "ok": False, "error": error.get("error", error)}
+            continue
+        by_channel.setdefault(channel, []).append(index)
+    semaphore = asyncio.Semaphore(max(1, max_concurrency))
+
+    async def send_channel(channel: str, indexes: List[int]):
+        async with semaphore:
+            for index in indexes:
+                item = messages[index]
+                try:
+                    res = await send_message(channel=channel, text=item["text"], thread_ts=item.get("thread_ts"), blocks=item.get("blocks"))
+                except Exception as e:
+                    res = {"error": str(e)}
+                if res.get("ok"):
+                    results[index] = {"index": index, "channel": channel, "ok": True, "ts": res.get("ts")}
+                else:
+                    results[index] = {"index": index, "channel": channel, "ok": False, "error": res.get("error", res)}
+                    if res.get("retry_after") is not None:
+                        results[index]["retry_after"] = res["retry_after"]
+
+    await asyncio.gather(*(send_channel(channel, indexes) for channel, indexes in by_channel.items()))
+    sent = sum(1 for result in results if result["ok"])
+    return {"ok": True, "results": results, "sent": sent, "failed": len(results) - sent}
+
+async def _filtered_scan(fetch_page, items_key: str, kind: str, filters: Dict[str, Any], limit: int, cursor: Optional[str]) -> Dict[str, Any]:
+    """
+    Pages through a Slack list with fetch_page(cursor), keeping the raw items that match ``filters`` until ``limit`` of them
+    are found, the list ends, or FILTER_MAX_SCAN items have been scanned. Matches are left unprojected for the caller.
+
+    The returned next_cursor resumes the scan after the last match, part-way through a page if need be ("filter:<skip>:<cursor>").
+    On an error part-way through, the error dict is returned with the matches so far (compact view) under "partial".
+    """
+    try:
+        predicate = compile_filter(filters)
+    except ValueError as e:
+        return {"error": "invalid_filters", "message": str(e)}
+    try:
+        page_cursor, skip = parse_filter_cursor(cursor)
+    except ValueError as e:
+        return {"error": "invalid_cursor", "message": str(e)}
+    matches: List[dict] = []
+    scanned = 0
+    while True:
+        res = await fetch_page(page_cursor)
+        if not res.get("ok"):
+            return {**res, "partial": project_items(matches, kind, None)} if matches else res
+        items = res.get(items_key, [])
+        next_cursor = (res.get("response_metadata") or {}).get("next_cursor") or None
+        resume = next_cursor
+        for index in range(skip, len(items)):
+            scanned += 1
+            if predicate(items[index]):
+                matches.append(items[index])
+                if len(matches) >= limit:
+                    resume = filter_cursor(page_cursor, index + 1) if index + 1 < len(items) else next_cursor
+                    break
+        skip = 0
+        if len(matches) >= limit or not next_cursor or scanned >= FILTER_MAX_SCAN:
+            return {"ok": True, items_key: matches, "scanned": scanned, "has_more": bool(resume), "response_metadata": {"next_cursor": resume or ""}}
+        page_cursor = next_cursor
+
 @server.tool(
     name="get_channels",
     description="Retrieves a list of channels from the Slack workspace. Supports pagination for handling large workspaces. Returns channel IDs, names, topics, purposes, and member counts."
 )
-def get_channels(types: Optional[str] = None, exclude_archived: bool = True, limit: Optional[int] = None, cursor: Optional[str] = None) -> Dict[str, Any]:
+async def get_channels(types: Optional[str] = None, exclude_archived: bool = True, limit: Optional[int] = None, cursor: Optional[str] = None, fields: Optional[List[str]] = None, filters: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
     """
     Retrieves a list of channels from the Slack workspace. Supports pagination for handling large workspaces. Returns channel IDs, names, topics, purposes, and member counts.
+
+    fields selects the returned channel fields as dotted paths (e.g. ["id", "profile.email"]); ["*"] returns Slack's raw objects.
+    By default a compact view is returned.
+
+    filters keeps only channels matching every condition, evaluated on the server while it pages through the list
+    (e.g. {"is_private": False, "num_members": {"gte": 50}, "name": {"startswith": "eng-"}}).
+    Operators: eq, ne, gt, gte, lt, lte, in, nin, contains, icontains, startswith, endswith, regex, exists.
+    With filters, limit is the number of matches wanted (default 100); the response carries "scanned" and a cursor to continue.
     """
-    def slack_call():
-        params = {"exclude_archived": exclude_archived}
-        if types:
-            params["types"] = types
-        if limit:
-            params["limit"] = limit
-        if cursor:
-            params["cursor"] = cursor
-        return slack_client.conversations_list(**params).data
-    result = rate_limiter.wrap("conversations_list", slack_call)
-    return result
+    if filters:
+        async def fetch_page(page_cursor: Optional[str]) -> Dict[str, Any]:
+            return await get_channels(types, exclude_archived, limit=FILTER_PAGE_SIZE, cursor=page_cursor, fields=["*"])
+        result = await _filtered_scan(fetch_page, "channels", "channel", filters, limit or FILTER_DEFAULT_LIMIT, cursor)
+        return project_response(result, "channels", "channel", fields)
+    params = {"exclude_archived": exclude_archived}
+    if types:
+        params["types"] = types
+    if limit:
+        params["limit"] = limit
+    if cursor:
+        params["cursor"] = cursor
+    async def slack_call():
+        return await _client().conversations_list(**params)
+    result = await _shared_read("conversations_list", params, slack_call)
+    if result.get("ok"):
+        channel_directory.merge(project_items(result.get("channels", []), "channel", DIRECTORY_CHANNEL_FIELDS))
+    return project_response(result, "channels", "channel", fields)
+
+async def _fetch_channel_page(cursor: Optional[str]) -> Dict[str, Any]:
+    """
+    Fetches one page of conversations.list for the channel directory.
+    """
+    return await get_channels(types="public_channel,private_channel", limit=1000, cursor=cursor, fields=DIRECTORY_CHANNEL_FIELDS)
+
+DIRECTORY_CHANNEL_FIELDS = COMPACT_FIELDS["channel"]
+channel_directory = ChannelDirectory(_fetch_channel_page, ttl=float(os.getenv("SLACK_CHANNEL_DIRECTORY_TTL", "900")), miss_interval=float(os.getenv("SLACK_CHANNEL_DIRECTORY_MISS_INTERVAL", "30")))
+
+async def _resolve_channel(channel: str) -> Tuple[str, Optional[Dict[str, Any]]]:
+    """
+    Resolves a "#name" channel argument to its ID through the channel directory; IDs pass through unchanged.
+
+    Returns:
+        Tuple[str, Optional[dict]]: (channel ID, None), or (channel, error dict) if the name cannot be resolved.
+    """
+    if not channel.startswith("#"):
+        return channel, None
+    metrics.record_cache("channel_directory", channel_directory.lookup(channel) is not None)
+    channel_id, error = await channel_directory.resolve(channel)
+    if error:
+        return channel, error
+    if channel_id is None:
+        return channel, {"error": "channel_not_found", "message": f"No channel named {channel}."}
+    return channel_id, None
 
 @server.tool(
     name="get_users",
     description="Retrieves a list of users from the Slack workspace. Handles pagination automatically for workspaces with many users. Returns user IDs, names, real names, display names, emails (if available), and status."
 )
-def get_users(limit: Optional[int] = None, cursor: Optional[str] = None, include_locale: Optional[bool] = None) -> Dict[str, Any]:
+async def get_users(limit: Optional[int] = None, cursor: Optional[str] = None, include_locale: Optional[bool] = None, fields: Optional[List[str]] = None, filters: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
     """
     Retrieves a list of users from the Slack workspace. Handles pagination automatically for workspaces with many users. Returns user IDs, names, real names, display names, emails (if available), and status.
+
+    fields selects the returned user fields as dotted paths (e.g. ["id", "profile.email"]); ["*"] returns Slack's raw objects.
+    By default a compact view is returned.
+
+    filters keeps only users matching every condition, evaluated on the server while it pages through the list
+    (e.g. {"is_bot": False, "deleted": False, "tz": {"startswith": "Europe/"}, "profile.title": {"icontains": "engineer"}}).
+    Operators: eq, ne, gt, gte, lt, lte, in, nin, contains, icontains, startswith, endswith, regex, exists.
+    With filters, limit is the number of matches wanted (default 100); the response carries "scanned" and a cursor to continue.
     """
-    def slack_call():
-        params = {}
-        if limit:
-            params["limit"] = limit
-        if cursor:
-            params["cursor"] = cursor
-        if include_locale is not None:
-            params["include_locale"] = include_locale
-        return slack_client.users_list(**params).data
-    result = rate_limiter.wrap("users_list", slack_call)
-    return result
+    if filters:
+        async def fetch_page(page_cursor: Optional[str]) -> Dict[str, Any]:
+            return await get_users(limit=FILTER_PAGE_SIZE, cursor=page_cursor, include_locale=include_locale, fields=["*"])
+        result = await _filtered_scan(fetch_page, "members", "user", filters, limit or FILTER_DEFAULT_LIMIT, cursor)
+        return project_response(result, "members", "user", fields)
+    params = {}
+    if limit:
+        params["limit"] = limit
+    if cursor:
+        params["cursor"] = cursor
+    if include_locale is not None:
+        params["include_locale"] = include_locale
+    async def slack_call():
+        return await _client().users_list(**params)
+    result = await _shared_read("users_list", params, slack_call)
+    return project_response(result, "members", "user", fields)
 
 @server.tool(
     name="find_users_by_name",
     description="Finds all Slack users whose real_name, display_name, or username contains the given substring (case-insensitive). Returns a list of matching user dicts."
 )
-def find_users_by_name(substring: str) -> Dict[str, Any]:
+async def find_users_by_name(substring: str, fields: Optional[List[str]] = None) -> Dict[str, Any]:
     """
     Finds all Slack users whose real_name, display_name, or username contains the given substring (case-insensitive).
+    Answered from the in-process user directory, which is loaded on first use and refreshed in the background.
 
     Args:
         substring (str): Substring to search for in user names.
+        fields (List[str], optional): Dotted user fields to return; defaults to a compact view. The directory only holds DIRECTORY_USER_FIELDS, so ["*"] returns those.
 
     Returns:
         Dict[str, Any]: {"ok": True, "matches": [user, ...]} on success, or {"error": ...} on failure.
     """
+    metrics.record_cache("user_directory", user_directory.loaded_at is not None)
+    error = await user_directory.ensure_loaded()
+    if error:
+        if error.get("error") == "ratelimited":
+            return error  # propagate rate limit info
+        return {"error": error.get("error", error)}
+    return {"ok": True, "matches": project_items(user_directory.search(substring), "user", fields)}
+
+async def _load_all_users() -> Dict[str, Any]:
+    """
+    Walks the full users.list cursor chain. Used to (re)load the user directory.
+    """
     users = []
     cursor = None
     while True:
-        res = get_users(cursor=cursor)
-        if res.get("error") == "ratelimited":
-            return res  # propagate rate limit info
+        res = await get_users(cursor=cursor, fields=DIRECTORY_USER_FIELDS)
         if not res.get("ok"):
-            return {"error": res.get("error", res)}
+            return res
         users.extend(res.get("members", []))
         cursor = res.get("response_metadata", {}).get("next_cursor")
         if not cursor:
             break
-    query = substring.lower()
-    matches = [
-        user for user in users
-        if any(query in (user.get(field, "") or "").lower() for field in ("real_name", "display_name", "name"))
-    ]
-    return {"ok": True, "matches": matches}
+    return {"ok": True, "members": users}
+
+# The directory keeps the compact user view plus anything later lookups may ask for
+DIRECTORY_USER_FIELDS = COMPACT_FIELDS["user"] + ["is_admin", "is_restricted", "profile.image_48"]
+user_directory = UserDirectory(_load_all_users, ttl=float(os.getenv("SLACK_USER_DIRECTORY_TTL", "900")))
+
+# Optional warm start: both directories are restored from this file at startup and saved back after each load.
+# Restored data older than the directory TTLs is served while a background refresh runs; users are refreshed as a delta on `updated`.
+DIRECTORY_SNAPSHOT_PATH = os.getenv("SLACK_DIRECTORY_SNAPSHOT_PATH")
+
+def _save_directory_snapshot():
+    if not DIRECTORY_SNAPSHOT_PATH:
+        return
+    try:
+        save_snapshot(DIRECTORY_SNAPSHOT_PATH, user_directory.users, user_directory.loaded_at, channel_directory.channels(), channel_directory.loaded_at)
+    except OSError:
+        pass  # a missing snapshot only costs a cold start
+
+def _restore_directory_snapshot():
+    snapshot = load_snapshot(DIRECTORY_SNAPSHOT_PATH) if DIRECTORY_SNAPSHOT_PATH else None
+    if not snapshot:
+        return
+    if snapshot.get("users_loaded_at"):
+        user_directory.restore(snapshot.get("users", []), snapshot["users_loaded_at"])
+    if snapshot.get("channels"):
+        channel_directory.restore(snapshot["channels"], snapshot.get("channels_loaded_at"))
+
+user_directory.on_loaded = channel_directory.on_loaded = _save_directory_snapshot
+_restore_directory_snapshot()
 
 @server.tool(
     name="read_channel_messages",
     description="Retrieves message history from a specified channel. Can retrieve entire channel history or specific threads. Supports time-based filtering and pagination for handling large message volumes."
 )
-def read_channel_messages(channel: str, limit: int = 100, oldest: Optional[str] = None, latest: Optional[str] = None, inclusive: Optional[bool] = None, thread_ts: Optional[str] = None) -> Dict[str, Any]:
+async def read_channel_messages(channel: str, limit: int = 100, oldest: Optional[str] = None, latest: Optional[str] = None, inclusive: Optional[bool] = None, thread_ts: Optional[str] = None, cursor: Optional[str] = None, stream: bool = False, chunk_size: int = 200, continuation_token: Optional[str] = None, fields: Optional[List[str]] = None, resolve: bool = False, expand_threads: bool = False, filters: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
     """
     Retrieves message history from a specified channel. Can retrieve entire channel history or specific threads. Supports time-based filtering and pagination for handling large message volumes.
+
+    With stream=True, the server pages through the whole history (or thread) in the background and returns the first
+    chunk_size messages (at most SLACK_STREAM_BUFFER_SIZE) with a continuation_token. Pass that token back to get the next chunk; other arguments are ignored then.
+    Streamed responses include progress metadata (messages fetched, oldest ts reached) and has_more.
+
+    When the local message store is enabled, channel history (not threads) is served from it after an incremental sync.
+
+    fields selects the returned message fields as dotted paths (e.g. ["ts", "text", "reactions.name"]); ["*"] returns Slack's raw messages.
+    By default a compact view is returned. Streams use the fields given when they are started.
+
+    With resolve=True (not for streams), the response also carries "users" and "channels" maps resolving every author,
+    participant, reactor and mention on the page, as resolve_entities would.
+
+    With expand_threads=True (not for streams), every thread parent on the page (reply_count > 0) gets a "replies" list
+    holding its whole thread, fetched concurrently. A thread that cannot be fetched gets "replies_error" instead.
+
+    filters keeps only messages matching every condition, evaluated on the server while it pages through the history
+    (e.g. {"user": "U123", "reply_count": {"gt": 0}, "text": {"icontains": "deploy"}}). limit is then the number of matches
+    wanted; the response carries "scanned" and a cursor to continue. Streams apply the filters to every chunk.
     """
-    def slack_call():
-        params = {"channel": channel, "limit": limit}
-        if oldest:
-            params["oldest"] = oldest
-        if latest:
-            params["latest"] = latest
-        if inclusive is not None:
-            params["inclusive"] = inclusive
+    if continuation_token:
+        return await _next_stream_chunk(continuation_token, chunk_size)
+    channel, error = await _resolve_channel(channel)
+    if error:
+        return error
+    if stream:
+        async def fetch_page(page_cursor: Optional[str]) -> Dict[str, Any]:
+            return await read_channel_messages(channel, limit=STREAM_PAGE_SIZE, oldest=oldest, latest=latest, inclusive=inclusive, thread_ts=thread_ts, cursor=page_cursor, fields=fields, filters=filters)
+        message_stream = MessageStream(fetch_page, buffer_size=STREAM_BUFFER_SIZE)
+        message_stream.start()
+        return await _next_stream_chunk(message_streams.add(message_stream), chunk_size)
+    if filters:
+        async def fetch_filter_page(page_cursor: Optional[str]) -> Dict[str, Any]:
+            return await read_channel_messages(channel, limit=FILTER_PAGE_SIZE, oldest=oldest, latest=latest, inclusive=inclusive, thread_ts=thread_ts, cursor=page_cursor, fields=["*"])
+        result = await _filtered_scan(fetch_filter_page, "messages", "message", filters, limit, cursor)
+        return await _message_page(result, channel, fields, resolve, expand_threads and not thread_ts)
+    if history_sync and not thread_ts and (not cursor or cursor.startswith(STORE_CURSOR_PREFIX)):
+        result = await history_sync.read(channel, limit=limit, oldest=oldest, latest=latest, inclusive=inclusive, cursor=cursor)
+        return await _message_page(result, channel, fields, resolve, expand_threads and not thread_ts)
+    params = {"channel": channel, "limit": limit}
+    if oldest:
+        params["oldest"] = oldest
+    if latest:
+        params["latest"] = latest
+    if inclusive is not None:
+        params["inclusive"] = inclusive
+    if cursor:
+        params["cursor"] = cursor
+    if thread_ts:
+        params["ts"] = thread_ts
+    async def slack_call():
         if thread_ts:
-            params["ts"] = thread_ts
-            return slack_client.conversations_replies(**params).data
+            return await _client().conversations_replies(**params)
         else:
-            return slack_client.conversations_history(**params).data
-    result = rate_limiter.wrap("conversations_history", slack_call)
+            return await _client().conversations_history(**params)
+    method = "conversations_replies" if thread_ts else "conversations_history"
+    result = await _shared_read(method, params, slack_call)
+    return await _message_page(result, channel, fields, resolve, expand_threads and not thread_ts)
+
+async def _message_page(result: Dict[str, Any], channel: str, fields: Optional[List[str]], resolve: bool, expand_threads: bool) -> Dict[str, Any]:
+    """
+    Projects a page of messages, first expanding threads and resolving the entities it references when asked to.
+    """
+    if not result.get("ok"):
+        return result
+    messages = result.get("messages", [])
+    threads = await _expand_threads(channel, messages) if expand_threads else {}
+    if resolve:
+        replies = [reply for thread in threads.values() if isinstance(thread, list) for reply in thread]
+        result.update(await _resolve_entities(*collect_entities(messages + replies)))
+    project_response(result, "messages", "message", fields)
+    for message, projected in zip(messages, result.get("messages", [])):
+        thread = threads.get(message.get("ts"))
+        if isinstance(thread, list):
+            projected["replies"] = project_items(thread, "message", fields)
+        elif thread is not None:
+            projected["replies_error"] = thread
     return result
 
+async def _fetch_thread(channel: str, thread_ts: str) -> Any:
+    """
+    Walks the conversations.replies cursor chain of one thread. Returns the replies (without the parent), or the error dict.
+    """
+    replies: List[dict] = []
+    cursor = None
+    while True:
+        params = {"channel": channel, "ts": thread_ts, "limit": STREAM_PAGE_SIZE}
+        if cursor:
+            params["cursor"] = cursor
+        async def slack_call():
+            return await _client().conversations_replies(**params)
+        res = await _shared_read("conversations_replies", params, slack_call)
+        if not res.get("ok"):
+            return res
+        replies.extend(reply for reply in res.get("messages", []) if reply.get("ts") != thread_ts)
+        cursor = (res.get("response_metadata") or {}).get("next_cursor")
+        if not cursor:
+            return replies
+
+async def _expand_threads(channel: str, messages: List[dict]) -> Dict[str, Any]:
+    """
+    Fetches the threads of every parent among ``messages``, THREAD_FETCH_CONCURRENCY at a time.
+    Returns {parent ts: replies or error dict}.
+    """
+    parents = [message["ts"] for message in messages if message.get("reply_count") and message.get("ts") and message.get("thread_ts", message["ts"]) == message["ts"]]
+    semaphore = asyncio.Semaphore(THREAD_FETCH_CONCURRENCY)
+    async def fetch(thread_ts: str) -> Any:
+        async with semaphore:
+            try:
+                return await _fetch_thread(channel, thread_ts)
+            except Exception as e:
+                return {"error": str(e)}
+    return dict(zip(parents, await asyncio.gather(*(fetch(thread_ts) for thread_ts in parents))))
+
+async def _fetch_history(params: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Calls conversations.history directly, bypassing the message store. Used to sync the store.
+    """
+    async def slack_call():
+        return await _client().conversations_history(**params)
+    return await _shared_read("conversations_history", params, slack_call)
+
+MESSAGE_STORE_PATH = os.getenv("SLACK_MESSAGE_STORE_PATH")
+message_store = MessageStore(MESSAGE_STORE_PATH) if MESSAGE_STORE_PATH else None
+history_sync = HistorySync(message_store, _fetch_history, min_interval=float(os.getenv("SLACK_MESSAGE_STORE_SYNC_INTERVAL", "10"))) if message_store else None
+
+# Optional Socket Mode event stream (needs an app-level xapp- token with connections:write): events are applied to the
+# directories, entity caches and message store as they happen, so reads stop polling Slack for changes
+SLACK_APP_TOKEN = os.getenv("SLACK_APP_TOKEN")
+app_client = None
+event_ingestor = EventIngestor(user_directory, channel_directory, user_info_cache, channel_info_cache, history_sync, DIRECTORY_USER_FIELDS, DIRECTORY_CHANNEL_FIELDS)
+
+async def _open_socket_connection() -> Dict[str, Any]:
+    """
+    Calls apps.connections.open with the app-level token, returning the Socket Mode URL or an error dict.
+    """
+    global app_client
+    if app_client is None:
+        from slack_sdk.web.async_client import AsyncWebClient
+        app_client = AsyncWebClient(base_url=SLACK_API_BASE_URL)
+    async def slack_call():
+        return await app_client.apps_connections_open(app_token=SLACK_APP_TOKEN)
+    try:
+        return await rate_limiter.wrap_async("apps_connections_open", slack_call)
+    except Exception as e:
+        return _error_response(e)
+
+socket_consumer = SocketModeConsumer(_open_socket_connection, event_ingestor) if SLACK_APP_TOKEN else None
+
+message_streams = StreamRegistry(ttl=float(os.getenv("SLACK_STREAM_TTL", "300")))
+
+async def _next_stream_chunk(token: str, chunk_size: int) -> Dict[str, Any]:
+    """
+    Returns the next chunk of a message stream, dropping the stream once it is exhausted.
+    """
+    message_stream = message_streams.get(token)
+    if message_stream is None:
+        return {"error": "invalid_continuation_token", "message": "Unknown or expired continuation token."}
+    messages = await message_stream.next_chunk(max(1, chunk_size))
+    if message_stream.exhausted:
+        message_streams.remove(token)
+        token = None
+        if message_stream.error and not messages:
+            return {**message_stream.error, "progress": message_stream.progress()}
+    return {
+        "ok": True,
+        "messages": messages,
+        "has_more": token is not None,
+        "continuation_token": token,
+        "progress": message_stream.progress(),
+    }
+
 @server.tool(
     name="search_messages",
     description="Searches for messages across all accessible channels using Slack's search functionality. Returns matching messages with channel context and highlights. Supports pagination for large result sets."
 )
-def search_messages(query: str, sort: Optional[str] = None, sort_dir: Optional[str] = None, count: Optional[int] = None, page: Optional[int] = None) -> Dict[str, Any]:
+async def search_messages(query: str, sort: Optional[str] = None, sort_dir: Optional[str] = None, count: Optional[int] = None, page: Optional[int] = None, backend: Optional[str] = None, fields: Optional[List[str]] = None) -> Dict[str, Any]:
     """
     Searches for messages across all accessible channels using Slack's search functionality. Returns matching messages with channel context and highlights. Supports pagination for large result sets.
+
+    backend="local" (or SLACK_SEARCH_BACKEND=local) answers from the full-text index over the local message store,
+    supporting in:, from:, after:, before: and on: modifiers. Only queries with in: on channels whose whole history is stored
+    are answered locally, without thread replies; everything else falls back to Slack.
+
+    fields selects the returned match fields as dotted paths; ["*"] returns Slack's raw matches. By default a compact view is returned.
     """
-    def slack_call():
-        params = {"query": query}
-        if sort:
-            params["sort"] = sort
-        if sort_dir:
-            params["sort_dir"] = sort_dir
-        if count:
-            params["count"] = count
-        if page:
-            params["page"] = page
-        return slack_client.search_messages(**params).data
-    result = rate_limiter.wrap("search_messages", slack_call)
-    return result
+    backend = backend or SEARCH_BACKEND
+    if backend == "local" and message_store:
+        result = search_local(message_store, query, sort=sort, sort_dir=sort_dir, count=count, page=page, resolve_channel=channel_directory.lookup, resolve_user=_user_id_for_name)
+        if result is not None:
+            return project_response(result, "messages.matches", "search_match", fields)
+    params = {"query": query}
+    if sort:
+        params["sort"] = sort
+    if sort_dir:
+        params["sort_dir"] = sort_dir
+    if count:
+        params["count"] = count
+    if page:
+        params["page"] = page
+    async def slack_call():
+        return await _client().search_messages(**params)
+    result = await _shared_read("search_messages", params, slack_call)
+    return project_response(result, "messages.matches", "search_match", fields)
+
+def _user_id_for_name(name: str) -> Optional[str]:
+    """
+    Resolves a username to a user ID from the loaded user directory, without calling Slack.
+    """
+    for user in user_directory.search(name):
+        if user.get("name") == name:
+            return user["id"]
+    return None
 
 @server.tool(
     name="create_channel",
     description="Creates a new channel in the Slack workspace. Channel names must be lowercase, without spaces or periods, and cannot be longer than 80 characters."
 )
-def create_channel(name: str, is_private: Optional[bool] = None, team_id: Optional[str] = None) -> Dict[str, Any]:
+async def create_channel(name: str, is_private: Optional[bool] = None, team_id: Optional[str] = None) -> Dict[str, Any]:
     """
     Creates a new channel in the Slack workspace. Channel names must be lowercase, without spaces or periods, and cannot be longer than 80 characters.
     """
-    def slack_call():
+    async def slack_call():
         params = {"name": name}
         if is_private is not None:
             params["is_private"] = is_private
         if team_id:
             params["team_id"] = team_id
-        return slack_client.conversations_create(**params).data
-    result = rate_limiter.wrap("conversations_create", slack_call)
+        return await _client().conversations_create(**params)
+    result = await rate_limiter.wrap_async("conversations_create", slack_call)
+    if result.get("ok") and result.get("channel"):
+        channel_directory.merge([result["channel"]])
+        channel_info_cache.invalidate(result["channel"]["id"])
     return result
 
 @server.tool(
     name="invite_to_channel",
     description="Invites multiple users to a channel. The users must be valid members of the workspace, and the channel must exist."
 )
-def invite_to_channel(channel: str, users: str) -> Dict[str, Any]:
+async def invite_to_channel(channel: str, users: str) -> Dict[str, Any]:
     """
     Invites multiple users to a channel. The users must be valid members of the workspace, and the channel must exist.
     """
-    def slack_call():
-        return slack_client.conversations_invite(channel=channel, users=users).data
-    result = rate_limiter.wrap("conversations_invite", slack_call)
+    channel, error = await _resolve_channel(channel)
+    if error:
+        return error
+    async def slack_call():
+        return await _client().conversations_invite(channel=channel, users=users)
+    result = await rate_limiter.wrap_async("conversations_invite", slack_call)
+    if result.get("ok"):
+        channel_info_cache.invalidate(channel)  # member count changed
     return result
 
 @server.tool(
     name="upload_file",
-    description="Uploads a file to one or more Slack channels. Supports text files, images, PDFs, and other file types. Can be attached to threads and include an initial comment."
+    description="Uploads a file to one or more Slack channels. Supports text files, images, PDFs, and other file types. Can be attached to threads and include an initial comment. Pass small text inline as content, or large and binary files as a local path or content_base64."
 )
-def upload_file(channels: str, content: str, filename: str, filetype: Optional[str] = None, initial_comment: Optional[str] = None, thread_ts: Optional[str] = None) -> Dict[str, Any]:
+async def upload_file(channels: str, content: Optional[str] = None, filename: Optional[str] = None, filetype: Optional[str] = None, initial_comment: Optional[str] = None, thread_ts: Optional[str] = None, path: Optional[str] = None, content_base64: Optional[str] = None, title: Optional[str] = None) -> Dict[str, Any]:
     """
-    Uploads a file to one or more Slack channels. Supports text files, images, PDFs, and other file types. Can be attached to threads and include an initial comment.
+    Uploads a file to one or more Slack channels. Supports text files, images, PDFs, and other file types. Can be attached to threads and include an initial comment. Pass small text inline as content, or large and binary files as a local path or content_base64.
+
+    path and content_base64 use Slack's external upload API: the body is streamed in chunks (from disk for path), uploaded once,
+    and shared to every channel in a single completion call. filename defaults to the path's basename; filetype is detected by Slack.
+    path must lie inside SLACK_UPLOAD_DIR; path uploads are refused when it is not set.
     """
+    resolved = []
+    for channel in channels.split(","):
+        channel, error = await _resolve_channel(channel.strip())
+        if error:
+            return error
+        resolved.append(channel)
+    if path or content_base64:
+        return await _upload_external(list(dict.fromkeys(resolved)), path, content_base64, filename or os.path.basename(path or ""), title, initial_comment, thread_ts)
+    if content is None or not filename:
+        return {"error": "invalid_arguments", "message": "Provide content and filename, or a path or content_base64."}
+    channels = ",".join(resolved)
     try:
         params = {
             "channels": channels,
@@ -213,84 +741,352 @@ def upload_file(channels: str, content: str, filename: str, filetype: Optional[s
             params["initial_comment"] = initial_comment
         if thread_ts:
             params["thread_ts"] = thread_ts
-        def slack_call():
-            return slack_client.files_upload(**params).data
-        result = rate_limiter.wrap("files_upload", slack_call)
+        async def slack_call():
+            return await _client().files_upload(**params)
+        result = await rate_limiter.wrap_async("files_upload", slack_call)
         return result
-    except SlackApiError as e:
-        return {"error": str(e), "details": getattr(e, "response", None)}
     except Exception as e:
-        return {"error": str(e)}
+        return _error_response(e)
+
+async def _upload_external(channels: List[str], path: Optional[str], content_base64: Optional[str], filename: str, title: Optional[str], initial_comment: Optional[str], thread_ts: Optional[str]) -> Dict[str, Any]:
+    """
+    Uploads through files.getUploadURLExternal / files.completeUploadExternal, streaming the body with bounded memory.
+    """
+    if not filename:
+        return {"error": "invalid_arguments", "message": "filename is required with content_base64."}
+    if path:
+        if not UPLOAD_DIR:
+            return {"error": "path_uploads_disabled", "message": "Set SLACK_UPLOAD_DIR to allow uploads from a local path."}
+        upload_root = os.path.realpath(UPLOAD_DIR)
+        path = os.path.realpath(path)
+        if os.path.commonpath([upload_root, path]) != upload_root:
+            return {"error": "invalid_path", "message": "path must be inside SLACK_UPLOAD_DIR."}
+    try:
+        if path:
+            length = source_length(path, None)
+        else:
+            content_base64 = normalize_base64(content_base64)
+            length = source_length(None, content_base64)
+    except (OSError, ValueError) as e:
+        return {"error": "invalid_file", "message": str(e)}
+    try:
+        async def get_url():
+            return await _client().files_getUploadURLExternal(filename=filename, length=length)
+        ticket = await rate_limiter.wrap_async("files_getUploadURLExternal", get_url)
+        if not ticket.get("ok"):
+            return ticket
+        chunks = file_chunks(path) if path else base64_chunks(content_base64)
+        session = _client().session if _is_sdk_client(slack_client) else None
+        error = await post_upload(ticket["upload_url"], chunks, length, session=session)
+        if error:
+            return {"error": "upload_failed", "message": error, "file_id": ticket["file_id"]}
+        params = {"files": [{"id": ticket["file_id"], "title": title or filename}], "channels": channels}
+        if initial_comment:
+            params["initial_comment"] = initial_comment
+        if thread_ts:
+            params["thread_ts"] = thread_ts
+        async def complete():
+            return await _client().files_completeUploadExternal(**params)
+        return await rate_limiter.wrap_async("files_completeUploadExternal", complete)
+    except Exception as e:
+        return _error_response(e)
 
 @server.tool(
     name="get_channel_info",
     description="Retrieves detailed information about a specific channel, including its name, topic, purpose, creation date, creator, and optionally the number of members."
 )
-def get_channel_info(channel: str, include_num_members: Optional[bool] = None) -> Dict[str, Any]:
+async def get_channel_info(channel: str, include_num_members: Optional[bool] = None) -> Dict[str, Any]:
     """
     Retrieves detailed information about a specific channel, including its name, topic, purpose, creation date, creator, and optionally the number of members.
+    Answered from a short-lived cache when the channel was looked up recently.
     """
+    channel, error = await _resolve_channel(channel)
+    if error:
+        return error
+    cached = channel_info_cache.get(channel, include_num_members)
+    if cached is not None:
+        return cached
     try:
         params = {"channel": channel}
         if include_num_members is not None:
             params["include_num_members"] = include_num_members
-        def slack_call():
-            return slack_client.conversations_info(**params).data
-        result = rate_limiter.wrap("conversations_info", slack_call)
+        async def slack_call():
+            return await _client().conversations_info(**params)
+        result = await _shared_read("conversations_info", params, slack_call)
+        if result.get("ok"):
+            channel_info_cache.set(channel, result, include_num_members)
         return result
-    except SlackApiError as e:
-        return {"error": str(e), "details": getattr(e, "response", None)}
     except Exception as e:
-        return {"error": str(e)}
+        return _error_response(e)
 
 @server.tool(
     name="update_message",
     description="Updates the content of a previously sent message. Can only update messages that were sent by the same bot. Supports both text updates and block updates."
 )
-def update_message(channel: str, ts: str, text: str, blocks: Optional[List[dict]] = None) -> Dict[str, Any]:
+async def update_message(channel: str, ts: str, text: str, blocks: Optional[List[dict]] = None) -> Dict[str, Any]:
     """
     Updates the content of a previously sent message. Can only update messages that were sent by the same bot. Supports both text updates and block updates.
     """
+    channel, error = await _resolve_channel(channel)
+    if error:
+        return error
     try:
         params = {"channel": channel, "ts": ts, "text": text}
         if blocks:
             params["blocks"] = blocks
-        def slack_call():
-            return slack_client.chat_update(**params).data
-        result = rate_limiter.wrap("chat_update", slack_call)
+        async def slack_call():
+            return await _client().chat_update(**params)
+        result = await rate_limiter.wrap_async("chat_update", slack_call)
         return result
-    except SlackApiError as e:
-        return {"error": str(e), "details": getattr(e, "response", None)}
     except Exception as e:
-        return {"error": str(e)}
+        return _error_response(e)
 
 @server.tool(
     name="delete_message",
     description="Permanently deletes a message from a channel. Can only delete messages that were sent by the same bot."
 )
-def delete_message(channel: str, ts: str) -> Dict[str, Any]:
+async def delete_message(channel: str, ts: str) -> Dict[str, Any]:
     """
     Permanently deletes a message from a channel. Can only delete messages that were sent by the same bot.
     """
-    def slack_call():
-        return slack_client.chat_delete(channel=channel, ts=ts).data
-    result = rate_limiter.wrap("chat_delete", slack_call)
+    channel, error = await _resolve_channel(channel)
+    if error:
+        return error
+    async def slack_call():
+        return await _client().chat_delete(channel=channel, ts=ts)
+    result = await rate_limiter.wrap_async("chat_delete", slack_call)
     return result
 
 @server.tool(
     name="get_user_info",
     description="Retrieves detailed profile information about a specific user, including their name, title, phone, email, status, and other profile fields."
 )
-def get_user_info(user: str) -> Dict[str, Any]:
+async def get_user_info(user: str) -> Dict[str, Any]:
     """
     Retrieves detailed profile information about a specific user, including their name, title, phone, email, status, and other profile fields.
+    Answered from a short-lived cache when the user was looked up recently.
     """
-    def slack_call():
-        return slack_client.users_profile_get(user=user).data
-    result = rate_limiter.wrap("users_profile_get", slack_call)
+    cached = user_info_cache.get(user)
+    if cached is not None:
+        return cached
+    async def slack_call():
+        return await _client().users_profile_get(user=user)
+    result = await _shared_read("users_profile_get", {"user": user}, slack_call)
+    if result.get("ok"):
+        user_info_cache.set(user, result)
     return result
 
+@server.tool(
+    name="resolve_entities",
+    description="Resolves user and channel IDs to compact user and channel objects in one call. Pass IDs directly and/or a page of messages (e.g. from read_channel_messages) to resolve every author, participant, reactor and mention. Answered from the cached directories; only misses are fetched from Slack, concurrently."
+)
+async def resolve_entities(user_ids: Optional[List[str]] = None, channel_ids: Optional[List[str]] = None, messages: Optional[List[dict]] = None, user_fields: Optional[List[str]] = None, channel_fields: Optional[List[str]] = None) -> Dict[str, Any]:
+    """
+    Resolves user and channel IDs to compact user and channel objects in one call. Pass IDs directly and/or a page of messages (e.g. from read_channel_messages) to resolve every author, participant, reactor and mention. Answered from the cached directories; only misses are fetched from Slack, concurrently.
+
+    Returns:
+        Dict[str, Any]: {"ok": True, "users": {id: user}, "channels": {id: channel}, "unresolved": {"users": [...], "channels": [...]}}.
+    """
+    users, channels = collect_entities(messages or [])
+    users.update(user_ids or [])
+    channels.update(channel_ids or [])
+    return {"ok": True, **await _resolve_entities(users, channels, user_fields, channel_fields)}
+
+async def _fetch_user(user_id: str) -> Optional[dict]:
+    cached = user_info_cache.get(user_id, "user")
+    if cached is not None:
+        return cached
+    async def slack_call():
+        return await _client().users_info(user=user_id)
+    result = await _shared_read("users_info", {"user": user_id}, slack_call)
+    if not result.get("ok"):
+        return None
+    user_info_cache.set(user_id, result["user"], "user")
+    return result["user"]
+
+async def _fetch_channel(channel_id: str) -> Optional[dict]:
+    result = await get_channel_info(channel_id)
+    return result.get("channel") if result.get("ok") else None
+
+async def _resolve_entities(user_ids: Set[str], channel_ids: Set[str], user_fields: Optional[List[str]] = None, channel_fields: Optional[List[str]] = None) -> Dict[str, Any]:
+    """
+    Looks IDs up in the user and channel directories and fetches only the misses, ENTITY_FETCH_CONCURRENCY at a time.
+    With more than ENTITY_DIRECTORY_LOAD_MISSES user misses, the user directory is loaded (or refreshed) first.
+    """
+    users = {user_id: user_directory.get(user_id) for user_id in user_ids}
+    missing = [user_id for user_id, user in users.items() if user is None]
+    if len(missing) > ENTITY_DIRECTORY_LOAD_MISSES:
+        # On a cold server this is one shared load rather than a users.info call per author; if it fails, misses are fetched one by one
+        await user_directory.ensure_loaded()
+        users.update({user_id: user_directory.get(user_id) for user_id in missing})
+    channels = {channel_id: channel_directory.get(channel_id) for channel_id in channel_ids}
+    semaphore = asyncio.Semaphore(ENTITY_FETCH_CONCURRENCY)
+    async def fetch(found: Dict[str, Optional[dict]], entity_id: str, fetcher):
+        async with semaphore:
+            try:
+                found[entity_id] = await fetcher(entity_id)
+            except Exception:
+                found[entity_id] = None
+    await asyncio.gather(
+        *(fetch(users, user_id, _fetch_user) for user_id, user in users.items() if user is None),
+        *(fetch(channels, channel_id, _fetch_channel) for channel_id, channel in channels.items() if channel is None),
+    )
+    def project(found: Dict[str, Optional[dict]], kind: str, fields: Optional[List[str]]) -> Dict[str, dict]:
+        ids = sorted(entity_id for entity_id, entity in found.items() if entity is not None)
+        return dict(zip(ids, project_items([found[entity_id] for entity_id in ids], kind, fields)))
+    return {
+        "users": project(users, "user", user_fields),
+        "channels": project(channels, "channel", channel_fields),
+        "unresolved": {
+            "users": sorted(user_id for user_id, user in users.items() if user is None),
+            "channels": sorted(channel_id for channel_id, channel in channels.items() if channel is None),
+        },
+    }
+
+@server.tool(
+    name="aggregate_channel_messages",
+    description="Computes statistics over a channel's history on the server and returns only the summary: message counts, top posters, per-hour, per-weekday and per-day activity, reaction totals and thread stats. Use instead of reading every page to answer questions like who posted most in a channel this month."
+)
+async def aggregate_channel_messages(channel: str, oldest: Optional[str] = None, latest: Optional[str] = None, top: int = 10, tz_offset: float = 0.0, max_messages: Optional[int] = None, resolve: bool = False) -> Dict[str, Any]:
+    """
+    Computes statistics over a channel's history on the server and returns only the summary: message counts, top posters, per-hour, per-weekday and per-day activity, reaction totals and thread stats.
+    History is paged through once (from the local message store when enabled) and each page is discarded after it is counted.
+
+    Args:
+        oldest / latest (str, optional): Time window as Slack timestamps.
+        top (int): Entries returned in the top posters and top reactions lists.
+        tz_offset (float): Hours from UTC used for the hour, weekday and day buckets.
+        max_messages (int, optional): Stop after this many messages (newest first); "truncated" is then set.
+        resolve (bool): Also return a "users" map resolving the top posters.
+
+    Returns:
+        Dict[str, Any]: {"ok": True, "channel": id, "truncated": bool, "messages": n, "top_posters": [...], "by_hour": [...], ...}.
+        On a Slack error part-way through, the error is returned with the statistics so far under "partial".
+    """
+    channel, error = await _resolve_channel(channel)
+    if error:
+        return error
+    stats = ChannelStats(tz_offset)
+    cursor = None
+    truncated = False
+    while True:
+        page = await read_channel_messages(channel, limit=STREAM_PAGE_SIZE, oldest=oldest, latest=latest, cursor=cursor, fields=AGGREGATE_FIELDS)
+        if not page.get("ok"):
+            return {**page, "partial": stats.result(top)}
+        for message in page.get("messages", []):
+            if max_messages is not None and stats.messages >= max_messages:
+                truncated = True
+                break
+            stats.add(message)
+        cursor = (page.get("response_metadata") or {}).get("next_cursor")
+        if truncated or not cursor:
+            break
+    result = {"ok": True, "channel": channel, "truncated": truncated, **stats.result(top)}
+    if resolve:
+        resolved = await _resolve_entities({entry["user"] for entry in result["top_posters"]}, set())
+        result["users"] = resolved["users"]
+    return result
+
+exports_in_progress: Set[str] = set()  # output paths being written; a second export of the same file is refused
+
+@server.tool(
+    name="export_channel",
+    description="Exports the full history of one or more channels (optionally with thread replies) to compressed JSONL or Parquet files on the server, and returns only the file paths and summary stats. Use to archive or analyze a channel without reading every page. An export stopped by rate limits resumes from its checkpoint when called again with the same arguments."
+)
+async def export_channel(channels: List[str], format: str = "jsonl", include_replies: bool = False, oldest: Optional[str] = None, latest: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Exports the full history of one or more channels (optionally with thread replies) to compressed JSONL or Parquet files on the server, and returns only the file paths and summary stats.
+    Channels are exported EXPORT_CONCURRENCY at a time into SLACK_EXPORT_DIR, one file per channel and time window.
+    History is streamed a page at a time (from the local message store when enabled), so memory does not grow with the channel.
+
+    Args:
+        channels (List[str]): Channel IDs or "#names".
+        format (str): "jsonl" (gzipped, one raw Slack message per line) or "parquet" (requires pyarrow).
+        include_replies (bool): Also write every thread's replies after their parent, with a "parent_ts" field.
+        oldest / latest (str, optional): Time window as Slack timestamps.
+
+    Returns:
+        Dict[str, Any]: {"ok": True, "exports": [{"ok": True, "channel", "path", "messages", "replies", "bytes", ...} or error dict, ...],
+        "completed": n, "failed": n}. A failed export carries its "checkpoint" and the stats so far under "partial";
+        calling again with the same arguments resumes it.
+    """
+    if format not in ("jsonl", "parquet"):
+        return {"error": "invalid_format", "message": "format must be 'jsonl' or 'parquet'."}
+    if format == "parquet" and importlib.util.find_spec("pyarrow") is None:
+        return {"error": "missing_dependency", "message": "Parquet exports need the pyarrow package (pip install pyarrow)."}
+    for ts in (oldest, latest):
+        if ts is not None and not SLACK_TS_PATTERN.match(ts):
+            return {"error": "invalid_ts", "message": f"{ts!r} is not a Slack timestamp."}
+    if isinstance(channels, str):
+        channels = [channels]
+    results: List[Dict[str, Any]] = []
+    channel_ids: List[str] = []
+    for channel, (channel_id, error) in zip(channels, await asyncio.gather(*(_resolve_channel(channel) for channel in channels))):
+        if error:
+            results.append({**error, "channel": channel})
+        elif not CHANNEL_ID_PATTERN.match(channel_id):
+            results.append({"error": "invalid_channel", "message": f"{channel_id!r} is not a channel ID.", "channel": channel})
+        elif channel_id not in channel_ids:
+            channel_ids.append(channel_id)  # "#general" and its ID must not write the same file twice
+    export_root = os.path.realpath(EXPORT_DIR)
+    semaphore = asyncio.Semaphore(EXPORT_CONCURRENCY)
+
+    async def export(channel_id: str) -> Dict[str, Any]:
+        window = f"_{oldest or ''}-{latest or ''}" if oldest or latest else ""
+        path = os.path.join(export_root, f"{channel_id}{window}.jsonl.gz")
+        if os.path.commonpath([export_root, os.path.realpath(path)]) != export_root:
+            return {"error": "invalid_path", "message": "Export path escapes SLACK_EXPORT_DIR.", "channel": channel_id}
+        if path in exports_in_progress:
+            return {"error": "export_in_progress", "message": "This channel and time window is already being exported.", "channel": channel_id}
+        exports_in_progress.add(path)
+        try:
+            async with semaphore:
+                async def fetch_page(cursor: Optional[str]) -> Dict[str, Any]:
+                    return await read_channel_messages(channel_id, limit=STREAM_PAGE_SIZE, oldest=oldest, latest=latest, cursor=cursor, fields=["*"])
+                async def fetch_threads(messages: List[dict]) -> Dict[str, Any]:
+                    return await _expand_threads(channel_id, messages)
+                exporter = ChannelExport(channel_id, path, fetch_page, fetch_threads if include_replies else None, {"oldest": oldest, "latest": latest})
+                result = await exporter.run()
+                if result.get("ok") and format == "parquet":
+                    parquet_path = path[:-len(".jsonl.gz")] + ".parquet"
+                    await asyncio.to_thread(jsonl_to_parquet, path, parquet_path)
+                    os.remove(path)
+                    result["path"] = parquet_path
+                    result["bytes"] = os.path.getsize(parquet_path)
+                return result
+        except Exception as e:
+            return {"error": str(e), "channel": channel_id}
+        finally:
+            exports_in_progress.discard(path)
+
+    results += await asyncio.gather(*(export(channel_id) for channel_id in channel_ids))
+    completed = sum(1 for result in results if result.get("ok"))
+    return {"ok": True, "exports": results, "completed": completed, "failed": len(results) - completed}
+
+@server.tool(
+    name="get_server_stats",
+    description="Returns server instrumentation: per Slack API method call counts, latency percentiles, time spent queued by the rate limiter, ratelimited responses, retry_after totals and payload sizes, plus cache hit rates."
+)
+async def get_server_stats() -> Dict[str, Any]:
+    """
+    Returns server instrumentation: per Slack API method call counts, latency percentiles, time spent queued by the rate limiter, ratelimited responses, retry_after totals and payload sizes, plus cache hit rates.
+    The same data is served in the Prometheus text format on SLACK_METRICS_PORT when set.
+    """
+    directories = {
+        "users": len(user_directory.users),
+        "users_loaded_at": user_directory.loaded_at,
+        "users_last_delta": user_directory.last_delta,
+        "channels": len(channel_directory.channels()),
+        "channels_loaded_at": channel_directory.loaded_at,
+    }
+    return {"ok": True, **metrics.snapshot(), "sessions": session_limiter.snapshot(), "events": event_ingestor.snapshot(), "directories": directories}
+
 
-# --- FastMCP stdio run entrypoint ---
+# --- FastMCP run entrypoint ---
 if __name__ == "__main__":
-    server.run()
+    if METRICS_PORT:
+        serve_metrics(metrics, int(METRICS_PORT), METRICS_HOST)
+    if MCP_TRANSPORT == "stdio":
+        server.run()
+    else:
+        server.run(transport=MCP_TRANSPORT, host=MCP_HOST, port=MCP_PORT)
@@ -0,0 +1,310 @@
+import json
+import sqlite3
+import threading
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+PAGE_SIZE = 200
+STORE_CURSOR_PREFIX = "store:"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS messages (
+    channel TEXT NOT NULL,
+    ts TEXT NOT NULL,
+    ts_key TEXT NOT NULL,
+    thread_ts TEXT,
+    user TEXT,
+    text TEXT,
+    data TEXT NOT NULL,
+    UNIQUE (channel, ts)
+);
+CREATE INDEX IF NOT EXISTS messages_channel_ts_key ON messages (channel, ts_key);
+CREATE VIRTUAL TABLE IF NOT EXISTS messages_fts USING fts5(text, content='messages', content_rowid='rowid');
+CREATE TRIGGER IF NOT EXISTS messages_fts_insert AFTER INSERT ON messages BEGIN
+    INSERT INTO messages_fts (rowid, text) VALUES (new.rowid, new.text);
+END;
+CREATE TRIGGER IF NOT EXISTS messages_fts_delete AFTER DELETE ON messages BEGIN
+    INSERT INTO messages_fts (messages_fts, rowid, text) VALUES ('delete', old.rowid, old.text);
+END;
+CREATE TRIGGER IF NOT EXISTS messages_fts_update AFTER UPDATE ON messages BEGIN
+    INSERT INTO messages_fts (messages_fts, rowid, text) VALUES ('delete', old.rowid, old.text);
+    INSERT INTO messages_fts (rowid, text) VALUES (new.rowid, new.text);
+END;
+CREATE TABLE IF NOT EXISTS sync_state (
+    channel TEXT PRIMARY KEY,
+    oldest_ts TEXT,
+    latest_ts TEXT,
+    complete INTEGER NOT NULL DEFAULT 0,
+    synced_at REAL NOT NULL
+);
+"""
+
+
+def ts_key(ts: str) -> str:
+    """
+    Normalizes a Slack timestamp ("1714000000.000100", "1714000000") to a fixed-width string that sorts chronologically.
+    """
+    seconds, _, fraction = str(ts).partition(".")
+    return f"{seconds.zfill(10)}.{fraction[:6].ljust(6, '0')}"
+
+
+class MessageStore:
+    """
+    On-disk SQLite store of channel messages keyed by (channel, ts), with per-channel sync state.
+    The sync state records the contiguous range [oldest_ts, latest_ts] held for a channel and whether it reaches the start of history.
+    One connection is shared by all threads, with every statement run under a lock.
+    """
+    def __init__(self, path: str = ":memory:"):
+        self.path = path
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        with self.lock:
+            self.conn.executescript(SCHEMA)
+
+    def sync_state(self, channel: str) -> Optional[Dict[str, Any]]:
+        with self.lock:
+            row = self.conn.execute("SELECT * FROM sync_state WHERE channel = ?", (channel,)).fetchone()
+        return dict(row) if row else None
+
+    def set_sync_state(self, channel: str, oldest_ts: Optional[str], latest_ts: Optional[str], complete: bool):
+        with self.lock, self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO sync_state (channel, oldest_ts, latest_ts, complete, synced_at) VALUES (?, ?, ?, ?, ?)",
+                (channel, oldest_ts, latest_ts, int(complete), time.time()),
+            )
+
+    def add_messages(self, channel: str, messages: List[dict]):
+        rows = [
+            (channel, m["ts"], ts_key(m["ts"]), m.get("thread_ts"), m.get("user"), m.get("text") or "", json.dumps(m))
+            for m in messages if m.get("ts")
+        ]
+        with self.lock, self.conn:
+            # Upsert rather than REPLACE so the FTS update trigger fires for re-fetched messages
+            self.conn.executemany(
+                "INSERT INTO messages (channel, ts, ts_key, thread_ts, user, text, data) VALUES (?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT (channel, ts) DO UPDATE SET thread_ts = excluded.thread_ts, user = excluded.user, text = excluded.text, data = excluded.data",
+                rows,
+            )
+
+    def delete_messages(self, channel: str, timestamps: List[str]):
+        with self.lock, self.conn:
+            self.conn.executemany("DELETE FROM messages WHERE channel = ? AND ts = ?", [(channel, ts) for ts in timestamps])
+
+    def _window(self, channel: str, oldest: Optional[str], latest: Optional[str], oldest_inclusive: bool, latest_inclusive: bool) -> Tuple[str, list]:
+        clauses, params = ["channel = ?"], [channel]
+        if oldest:
+            clauses.append("ts_key >= ?" if oldest_inclusive else "ts_key > ?")
+            params.append(ts_key(oldest))
+        if latest:
+            clauses.append("ts_key <= ?" if latest_inclusive else "ts_key < ?")
+            params.append(ts_key(latest))
+        return " AND ".join(clauses), params
+
+    def query(self, channel: str, oldest: Optional[str] = None, latest: Optional[str] = None, limit: int = 100, oldest_inclusive: bool = False, latest_inclusive: bool = False) -> List[dict]:
+        """
+        Returns up to ``limit`` stored messages in the window, newest first (like conversations.history).
+        """
+        where, params = self._window(channel, oldest, latest, oldest_inclusive, latest_inclusive)
+        with self.lock:
+            rows = self.conn.execute(f"SELECT data FROM messages WHERE {where} ORDER BY ts_key DESC LIMIT ?", params + [limit]).fetchall()
+        return [json.loads(row["data"]) for row in rows]
+
+    def count(self, channel: str, oldest: Optional[str] = None, latest: Optional[str] = None, oldest_inclusive: bool = False, latest_inclusive: bool = False) -> int:
+        where, params = self._window(channel, oldest, latest, oldest_inclusive, latest_inclusive)
+        with self.lock:
+            return self.conn.execute(f"SELECT COUNT(*) FROM messages WHERE {where}", params).fetchone()[0]
+
+    def indexed_channels(self) -> List[str]:
+        """
+        Returns channels that have been synced into the store.
+        """
+        with self.lock:
+            return [row[0] for row in self.conn.execute("SELECT channel FROM sync_state")]
+
+    def complete_channels(self) -> List[str]:
+        """
+        Returns channels whose whole history has been synced into the store, back to the first message.
+        """
+        with self.lock:
+            return [row[0] for row in self.conn.execute("SELECT channel FROM sync_state WHERE complete")]
+
+    def search(self, match: Optional[str], channels: Optional[List[str]] = None, users: Optional[List[str]] = None, after: Optional[str] = None, before: Optional[str] = None, sort: str = "score", sort_dir: str = "desc", limit: int = 20, offset: int = 0) -> Tuple[int, List[Dict[str, Any]]]:
+        """
+        Full-text search over stored messages.
+
+        Args:
+            match (str, optional): FTS5 MATCH expression; None matches every message in the filters.
+            channels, users (list, optional): Restrict to these channel / user IDs.
+            after, before (str, optional): Exclusive Slack timestamp bounds.
+            sort (str): "score" (bm25 rank) or "timestamp".
+            sort_dir (str): "desc" or "asc".
+
+        Returns:
+            Tuple[int, List[dict]]: Total matches, and the requested page of {"channel", "message", "highlight"} rows.
+        """
+        clauses, params = [], []
+        if match:
+            clauses.append("messages_fts MATCH ?")
+            params.append(match)
+        for column, values in (("m.channel", channels), ("m.user", users)):
+            if values:
+                clauses.append(f"{column} IN ({', '.join('?' * len(values))})")
+                params.extend(values)
+        if after:
+            clauses.append("m.ts_key > ?")
+            params.append(ts_key(after))
+        if before:
+            clauses.append("m.ts_key < ?")
+            params.append(ts_key(before))
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        if match:
+            source = "messages_fts JOIN messages m ON m.rowid = messages_fts.rowid"
+            highlight = "highlight(messages_fts, 0, char(57344), char(57345))"
+            rank = "bm25(messages_fts)"
+        else:
+            source, highlight, rank = "messages m", "m.text", "0"
+        direction = "ASC" if sort_dir == "asc" else "DESC"
+        if sort == "timestamp":
+            order = f"m.ts_key {direction}"
+        else:
+            # bm25 is lower for better matches
+            order = f"{rank} {'DESC' if direction == 'ASC' else 'ASC'}, m.ts_key DESC"
+        with self.lock:
+            total = self.conn.execute(f"SELECT COUNT(*) FROM {source} {where}", params).fetchone()[0]
+            rows = self.conn.execute(
+                f"SELECT m.channel, m.data, {highlight} AS highlight FROM {source} {where} ORDER BY {order} LIMIT ? OFFSET ?",
+                params + [limit, offset],
+            ).fetchall()
+        return total, [{"channel": row["channel"], "message": json.loads(row["data"]), "highlight": row["highlight"]} for row in rows]
+
+
+class HistorySync:
+    """
+    Serves conversations.history reads from a MessageStore, syncing incrementally from Slack.
+    New messages are fetched with oldest= set to the stored high-water mark; older messages are backfilled only when a read needs them.
+    """
+    def __init__(self, store: MessageStore, fetch_history: Callable[[Dict[str, Any]], Awaitable[Dict[str, Any]]], min_interval: float = 10.0):
+        """
+        Args:
+            store (MessageStore): Where messages and sync state are kept.
+            fetch_history (Callable): Coroutine function calling conversations.history with the given params.
+            min_interval (float): Seconds after a sync during which reads are served without asking Slack for new messages.
+        """
+        self.store = store
+        self.fetch_history = fetch_history
+        self.min_interval = min_interval
+        # Set while a live event stream (see events.py) delivers every new message; channels synced since then are kept
+        # current by the stream and are not polled
+        self.live_since: Optional[float] = None
+
+    async def _fetch(self, channel: str, params: Dict[str, Any], enough: Optional[Callable[[List[dict]], bool]] = None) -> Tuple[List[dict], bool, Optional[Dict[str, Any]]]:
+        """
+        Pages conversations.history. Returns (messages, reached end of history range, error).
+        """
+        messages: List[dict] = []
+        cursor = None
+        while True:
+            page_params = {"channel": channel, "limit": PAGE_SIZE, **params}
+            if cursor:
+                page_params["cursor"] = cursor
+            try:
+                res = await self.fetch_history(page_params)
+            except Exception as e:
+                res = {"error": str(e)}
+            if not res.get("ok"):
+                return messages, False, res
+            messages.extend(res.get("messages", []))
+            cursor = (res.get("response_metadata") or {}).get("next_cursor")
+            if not cursor:
+                return messages, True, None
+            if enough and enough(messages):
+                return messages, False, None
+
+    async def _forward(self, channel: str, state: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        params = {"oldest": state["latest_ts"]} if state["latest_ts"] else {}
+        messages, _, error = await self._fetch(channel, params)
+        if error:
+            return error
+        self.store.add_messages(channel, messages)
+        latest = max([m["ts"] for m in messages if m.get("ts")] + ([state["latest_ts"]] if state["latest_ts"] else []), key=ts_key, default=None)
+        oldest = state["oldest_ts"] or min((m["ts"] for m in messages if m.get("ts")), key=ts_key, default=None)
+        self.store.set_sync_state(channel, oldest, latest, bool(state["complete"]))
+        return None
+
+    async def _backfill(self, channel: str, state: Optional[Dict[str, Any]], oldest: Optional[str], latest: Optional[str], inclusive: bool, limit: int) -> Optional[Dict[str, Any]]:
+        params: Dict[str, Any] = {}
+        if state and state["oldest_ts"]:
+            params["latest"] = state["oldest_ts"]
+        if oldest:
+            params["oldest"] = oldest
+            params["inclusive"] = True
+        def enough(messages: List[dict]) -> bool:
+            if oldest:
+                return False
+            stored = self.store.count(channel, None, latest, False, inclusive) if state else 0
+            in_window = [m for m in messages if not latest or ts_key(m["ts"]) < ts_key(latest) or (inclusive and ts_key(m["ts"]) == ts_key(latest))]
+            return stored + len(in_window) > limit
+        messages, exhausted, error = await self._fetch(channel, params, enough)
+        if error:
+            return error
+        self.store.add_messages(channel, messages)
+        stamps = [m["ts"] for m in messages if m.get("ts")]
+        if state:
+            stamps += [ts for ts in (state["oldest_ts"], state["latest_ts"]) if ts]
+        new_oldest = min(stamps, key=ts_key, default=None)
+        if exhausted and oldest and (new_oldest is None or ts_key(oldest) < ts_key(new_oldest)):
+            new_oldest = oldest
+        complete = exhausted and not oldest
+        self.store.set_sync_state(channel, new_oldest, max(stamps, key=ts_key, default=None), complete)
+        return None
+
+    def _needs_backfill(self, channel: str, state: Dict[str, Any], oldest: Optional[str], latest: Optional[str], inclusive: bool, limit: int) -> bool:
+        if state["complete"]:
+            return False
+        if state["oldest_ts"] is None:
+            return True
+        if oldest:
+            return ts_key(oldest) < ts_key(state["oldest_ts"])
+        return self.store.count(channel, state["oldest_ts"], latest, True, inclusive) <= limit
+
+    async def read(self, channel: str, limit: int = 100, oldest: Optional[str] = None, latest: Optional[str] = None, inclusive: Optional[bool] = None, cursor: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Returns a conversations.history-shaped response served from the store, syncing first if needed.
+        Pages are continued with a "store:<ts>" cursor in response_metadata.next_cursor.
+        """
+        inclusive = bool(inclusive)
+        latest_inclusive = inclusive
+        if cursor and cursor.startswith(STORE_CURSOR_PREFIX):
+            latest, latest_inclusive = cursor[len(STORE_CURSOR_PREFIX):], False
+        state = self.store.sync_state(channel)
+        if state is None:
+            error = await self._backfill(channel, None, oldest, latest, latest_inclusive, limit)
+            if error:
+                return error
+        else:
+            live = self.live_since is not None and state["synced_at"] >= self.live_since
+            fresh = live or time.time() - state["synced_at"] < self.min_interval
+            past_window = latest and state["latest_ts"] and ts_key(latest) < ts_key(state["latest_ts"])
+            if not fresh and not past_window:
+                error = await self._forward(channel, state)
+                if error and error.get("error") != "ratelimited":
+                    return error
+            state = self.store.sync_state(channel)
+            if self._needs_backfill(channel, state, oldest, latest, latest_inclusive, limit):
+                error = await self._backfill(channel, state, oldest, latest, latest_inclusive, limit)
+                if error and error.get("error") != "ratelimited":
+                    return error
+        state = self.store.sync_state(channel)
+        messages = self.store.query(channel, oldest, latest, limit + 1, inclusive, latest_inclusive)
+        has_more = len(messages) > limit
+        messages = messages[:limit]
+        if not has_more and not state["complete"] and state["oldest_ts"] and (not oldest or ts_key(oldest) < ts_key(state["oldest_ts"])):
+            has_more = bool(messages)
+        return {
+            "ok": True,
+            "messages": messages,
+            "has_more": has_more,
+            "response_metadata": {"next_cursor": f"{STORE_CURSOR_PREFIX}{messages[-1]['ts']}" if has_more else ""},
+            "source": "store",
+        }
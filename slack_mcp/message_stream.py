@@ -0,0 +1,145 @@
+import asyncio
+import secrets
+import threading
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional
+
+
+class MessageStream:
+    """
+    Prefetches pages of conversations.history or conversations.replies in a background task into a bounded buffer.
+    Consumers take fixed-size chunks; the producer pauses while the buffer is full and sleeps through rate limits.
+    """
+    def __init__(self, fetch_page: Callable[[Optional[str]], Awaitable[Dict[str, Any]]], buffer_size: int = 2000):
+        """
+        Args:
+            fetch_page (Callable): Coroutine function taking a cursor (None for the first page) and returning a Slack response dict.
+            buffer_size (int): Messages to buffer before prefetching pauses.
+        """
+        self.fetch_page = fetch_page
+        self.buffer_size = buffer_size
+        self.buffer: Deque[dict] = deque()
+        self.cond = asyncio.Condition()
+        self.messages_fetched = 0
+        self.pages_fetched = 0
+        self.oldest_ts: Optional[str] = None
+        self.done = False
+        self.error: Optional[Dict[str, Any]] = None
+        self.task: Optional[asyncio.Task] = None
+
+    def start(self):
+        self.task = asyncio.get_running_loop().create_task(self._produce())
+
+    def cancel(self):
+        if self.task and not self.task.done():
+            self.task.cancel()
+
+    async def _produce(self):
+        cursor = None
+        try:
+            while True:
+                async with self.cond:
+                    await self.cond.wait_for(lambda: len(self.buffer) < self.buffer_size)
+                try:
+                    res = await self.fetch_page(cursor)
+                except Exception as e:
+                    res = {"error": str(e)}
+                if res.get("error") == "ratelimited":
+                    await asyncio.sleep(max(1.0, float(res.get("retry_after") or 1)))
+                    continue
+                if not res.get("ok"):
+                    self.error = res
+                    break
+                messages = res.get("messages", [])
+                async with self.cond:
+                    self.buffer.extend(messages)
+                    self.pages_fetched += 1
+                    self.messages_fetched += len(messages)
+                    for message in messages:
+                        ts = message.get("ts")
+                        if ts and (self.oldest_ts is None or float(ts) < float(self.oldest_ts)):
+                            self.oldest_ts = ts
+                    self.cond.notify_all()
+                cursor = (res.get("response_metadata") or {}).get("next_cursor")
+                if not cursor:
+                    break
+        finally:
+            async with self.cond:
+                self.done = True
+                self.cond.notify_all()
+
+    async def next_chunk(self, size: int) -> List[dict]:
+        """
+        Waits until ``size`` messages are buffered (or the stream has ended) and returns up to ``size`` of them.
+        ``size`` is capped at buffer_size, since the producer pauses once that many messages are buffered.
+        """
+        size = min(size, self.buffer_size)
+        async with self.cond:
+            await self.cond.wait_for(lambda: len(self.buffer) >= size or self.done)
+            chunk = [self.buffer.popleft() for _ in range(min(size, len(self.buffer)))]
+            self.cond.notify_all()
+        return chunk
+
+    @property
+    def exhausted(self) -> bool:
+        return self.done and not self.buffer
+
+    def progress(self) -> Dict[str, Any]:
+        return {
+            "messages_fetched": self.messages_fetched,
+            "pages_fetched": self.pages_fetched,
+            "oldest_ts": self.oldest_ts,
+            "buffered": len(self.buffer),
+            "done": self.done,
+            "error": self.error.get("error") if self.error else None,
+        }
+
+
+class StreamRegistry:
+    """
+    Maps opaque continuation tokens to open message streams.
+    Streams idle for longer than ``ttl`` seconds, or beyond ``max_streams``, are cancelled and dropped.
+    asyncio-only: the streams are tasks on the event loop that serves the tools.
+    """
+    def __init__(self, ttl: float = 300.0, max_streams: int = 32):
+        self.ttl = ttl
+        self.max_streams = max_streams
+        self.lock = threading.Lock()
+        self.streams: Dict[str, MessageStream] = {}
+        self.last_used: Dict[str, float] = {}
+
+    def _prune(self, now: float, reserve: int = 0):
+        expired = [token for token, used in self.last_used.items() if now - used > self.ttl]
+        overflow = len(self.streams) - len(expired) + reserve - self.max_streams
+        if overflow > 0:
+            live = sorted((used, token) for token, used in self.last_used.items() if token not in expired)
+            expired += [token for _, token in live[:overflow]]
+        for token in expired:
+            self.streams.pop(token).cancel()
+            del self.last_used[token]
+
+    def add(self, stream: MessageStream) -> str:
+        token = secrets.token_urlsafe(16)
+        with self.lock:
+            now = time.time()
+            self._prune(now, reserve=1)
+            self.streams[token] = stream
+            self.last_used[token] = now
+        return token
+
+    def get(self, token: str) -> Optional[MessageStream]:
+        with self.lock:
+            now = time.time()
+            self._prune(now)
+            stream = self.streams.get(token)
+            if stream:
+                self.last_used[token] = now
+            return stream
+
+    def remove(self, token: str):
+        with self.lock:
+            stream = self.streams.pop(token, None)
+            self.last_used.pop(token, None)
+        if stream:
+            stream.cancel()
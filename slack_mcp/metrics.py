@@ -0,0 +1,213 @@
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+
+# Upper bounds (seconds) of the latency and queue-wait histogram buckets
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+class Histogram:
+    """
+    Cumulative-bucket histogram in the Prometheus style. Not thread-safe on its own; Metrics guards it with its lock.
+    """
+    def __init__(self, buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float):
+        self.count += 1
+        self.sum += value
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+
+    def cumulative(self) -> List[int]:
+        total, out = 0, []
+        for count in self.counts:
+            total += count
+            out.append(total)
+        return out
+
+    def quantile(self, q: float) -> Optional[float]:
+        """
+        Returns the upper bound of the bucket holding the q-quantile, or None if nothing was observed
+        (or the quantile lies beyond the last bucket).
+        """
+        if not self.count:
+            return None
+        rank = q * self.count
+        for bound, total in zip(self.buckets, self.cumulative()):
+            if total >= rank:
+                return bound
+        return None
+
+
+class Metrics:
+    """
+    In-process counters and histograms for Slack API calls, rate limiting and caches.
+    Updates take a lock, so the Prometheus endpoint can read them from its own server thread.
+    """
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.started = time.time()
+        self.calls: Dict[Tuple[str, str], int] = {}  # (method, outcome) -> count
+        self.latency: Dict[str, Histogram] = {}
+        self.queue_wait: Dict[str, Histogram] = {}
+        self.ratelimited: Dict[Tuple[str, str], int] = {}  # (method, source) -> count
+        self.retry_after_seconds: Dict[str, float] = {}
+        self.retries: Dict[str, int] = {}
+        self.retry_wait_seconds: Dict[str, float] = {}
+        self.payload_bytes: Dict[str, int] = {}
+        self.cache: Dict[Tuple[str, str], int] = {}  # (cache, "hit" | "miss") -> count
+
+    def reset(self):
+        self.__init__()
+
+    def record_call(self, method: str, outcome: str, latency: float, payload_bytes: int = 0):
+        """
+        Records one Slack API call. ``outcome`` is "ok", "error" (Slack returned ok=false), "ratelimited" or "exception".
+        """
+        with self.lock:
+            self.calls[(method, outcome)] = self.calls.get((method, outcome), 0) + 1
+            self.latency.setdefault(method, Histogram()).observe(latency)
+            self.payload_bytes[method] = self.payload_bytes.get(method, 0) + payload_bytes
+
+    def record_queue_wait(self, method: str, wait: float):
+        with self.lock:
+            self.queue_wait.setdefault(method, Histogram()).observe(wait)
+
+    def record_ratelimited(self, method: str, retry_after: float, source: str):
+        """
+        Records a ratelimited response. ``source`` is "slack" for a 429 from Slack, "local" when the limiter refused the call itself.
+        """
+        with self.lock:
+            self.ratelimited[(method, source)] = self.ratelimited.get((method, source), 0) + 1
+            self.retry_after_seconds[method] = self.retry_after_seconds.get(method, 0.0) + float(retry_after)
+
+    def record_retry(self, method: str, delay: float):
+        with self.lock:
+            self.retries[method] = self.retries.get(method, 0) + 1
+            self.retry_wait_seconds[method] = self.retry_wait_seconds.get(method, 0.0) + delay
+
+    def record_cache(self, name: str, hit: bool):
+        key = (name, "hit" if hit else "miss")
+        with self.lock:
+            self.cache[key] = self.cache.get(key, 0) + 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Returns a JSON-serializable summary: per-method calls, latency percentiles, queue waits, rate limits and payload sizes, plus cache hit rates.
+        """
+        with self.lock:
+            methods: Dict[str, Dict[str, Any]] = {}
+            names = {m for m, _ in self.calls} | {m for m, _ in self.ratelimited} | set(self.queue_wait) | set(self.retries)
+            for method in sorted(names):
+                latency = self.latency.get(method)
+                wait = self.queue_wait.get(method)
+                methods[method] = {
+                    "calls": {outcome: n for (m, outcome), n in sorted(self.calls.items()) if m == method},
+                    "latency_seconds": {
+                        "count": latency.count if latency else 0,
+                        "avg": round(latency.sum / latency.count, 4) if latency and latency.count else None,
+                        "p50": latency.quantile(0.5) if latency else None,
+                        "p95": latency.quantile(0.95) if latency else None,
+                        "p99": latency.quantile(0.99) if latency else None,
+                    },
+                    "queue_wait_seconds_total": round(wait.sum, 4) if wait else 0.0,
+                    "ratelimited": {source: n for (m, source), n in sorted(self.ratelimited.items()) if m == method},
+                    "retry_after_seconds_total": self.retry_after_seconds.get(method, 0.0),
+                    "retries": self.retries.get(method, 0),
+                    "retry_wait_seconds_total": round(self.retry_wait_seconds.get(method, 0.0), 4),
+                    "payload_bytes_total": self.payload_bytes.get(method, 0),
+                }
+            caches: Dict[str, Dict[str, Any]] = {}
+            for name in sorted({name for name, _ in self.cache}):
+                hits, misses = self.cache.get((name, "hit"), 0), self.cache.get((name, "miss"), 0)
+                caches[name] = {"hits": hits, "misses": misses, "hit_rate": round(hits / (hits + misses), 4)}
+            return {"uptime_seconds": round(time.time() - self.started, 1), "methods": methods, "caches": caches}
+
+    def render_prometheus(self) -> str:
+        """
+        Renders all metrics in the Prometheus text exposition format.
+        """
+        lines: List[str] = []
+
+        def family(name: str, kind: str, help_text: str):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+
+        def histogram(name: str, help_text: str, histograms: Dict[str, Histogram]):
+            family(name, "histogram", help_text)
+            for method, hist in sorted(histograms.items()):
+                for bound, total in zip(hist.buckets, hist.cumulative()):
+                    lines.append(f'{name}_bucket{{method="{method}",le="{bound}"}} {total}')
+                lines.append(f'{name}_bucket{{method="{method}",le="+Inf"}} {hist.count}')
+                lines.append(f'{name}_sum{{method="{method}"}} {hist.sum}')
+                lines.append(f'{name}_count{{method="{method}"}} {hist.count}')
+
+        with self.lock:
+            family("slack_api_calls_total", "counter", "Slack API calls by method and outcome.")
+            for (method, outcome), n in sorted(self.calls.items()):
+                lines.append(f'slack_api_calls_total{{method="{method}",outcome="{outcome}"}} {n}')
+            histogram("slack_api_latency_seconds", "Slack API call latency.", self.latency)
+            histogram("slack_rate_limit_queue_wait_seconds", "Time callers spent queued by the rate limiter.", self.queue_wait)
+            family("slack_ratelimited_total", "counter", "Ratelimited responses by method and source (slack or local).")
+            for (method, source), n in sorted(self.ratelimited.items()):
+                lines.append(f'slack_ratelimited_total{{method="{method}",source="{source}"}} {n}')
+            family("slack_retry_after_seconds_total", "counter", "Sum of retry_after seconds reported to callers.")
+            for method, total in sorted(self.retry_after_seconds.items()):
+                lines.append(f'slack_retry_after_seconds_total{{method="{method}"}} {total}')
+            family("slack_retries_total", "counter", "Calls retried inside the server.")
+            for method, n in sorted(self.retries.items()):
+                lines.append(f'slack_retries_total{{method="{method}"}} {n}')
+            family("slack_retry_wait_seconds_total", "counter", "Time spent waiting between retries.")
+            for method, total in sorted(self.retry_wait_seconds.items()):
+                lines.append(f'slack_retry_wait_seconds_total{{method="{method}"}} {total}')
+            family("slack_api_payload_bytes_total", "counter", "Size of Slack API response bodies, from Content-Length.")
+            for method, total in sorted(self.payload_bytes.items()):
+                lines.append(f'slack_api_payload_bytes_total{{method="{method}"}} {total}')
+            family("slack_cache_requests_total", "counter", "Cache lookups by cache and result (hit or miss).")
+            for (name, result), n in sorted(self.cache.items()):
+                lines.append(f'slack_cache_requests_total{{cache="{name}",result="{result}"}} {n}')
+        return "\n".join(lines) + "\n"
+
+
+def response_size(response: Any) -> int:
+    """
+    Returns the HTTP body size of a slack_sdk response from its Content-Length header, or 0 when it is unknown.
+    Read from the header rather than by re-encoding the parsed body, which would cost as much as the response itself.
+    """
+    headers = getattr(response, "headers", None) or {}
+    length = headers.get("Content-Length") or headers.get("content-length")
+    try:
+        return int(length) if length else 0
+    except (TypeError, ValueError):
+        return 0
+
+
+def serve_metrics(metrics: Metrics, port: int, host: str = "127.0.0.1") -> ThreadingHTTPServer:
+    """
+    Serves ``/metrics`` in the Prometheus text format from a daemon thread. Returns the running server.
+    """
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?")[0] != "/metrics":
+                self.send_error(404)
+                return
+            body = metrics.render_prometheus().encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass  # stdout belongs to the MCP stdio transport
+
+    httpd = ThreadingHTTPServer((host, port), Handler)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    return httpd
@@ -0,0 +1,77 @@
+from typing import Any, Dict, List, Optional
+
+# Fields kept by default for each kind of object. Dotted paths select nested fields and apply to every element of a list.
+COMPACT_FIELDS: Dict[str, List[str]] = {
+    "user": [
+        "id", "name", "real_name", "deleted", "is_bot", "tz", "updated",
+        "profile.display_name", "profile.real_name", "profile.email", "profile.title",
+        "profile.status_text", "profile.status_emoji",
+    ],
+    "channel": [
+        "id", "name", "is_channel", "is_private", "is_archived", "is_member", "num_members",
+        "created", "creator", "updated", "topic.value", "purpose.value",
+    ],
+    "message": [
+        "type", "subtype", "ts", "user", "bot_id", "text", "thread_ts", "reply_count", "latest_reply",
+        "edited.ts", "reactions.name", "reactions.count", "files.id", "files.name",
+    ],
+    "search_match": [
+        "type", "ts", "user", "username", "text", "permalink", "channel.id", "channel.name", "highlights",
+    ],
+}
+
+ALL_FIELDS = "*"
+
+
+def _field_tree(fields: List[str]) -> Dict[str, Any]:
+    tree: Dict[str, Any] = {}
+    for field in fields:
+        node = tree
+        parts = field.split(".")
+        for part in parts[:-1]:
+            child = node.setdefault(part, {})
+            if child is None:  # a shorter path already selects the whole value
+                break
+            node = child
+        else:
+            node[parts[-1]] = None
+    return tree
+
+
+def _apply(value: Any, tree: Optional[Dict[str, Any]]) -> Any:
+    if tree is None:
+        return value
+    if isinstance(value, list):
+        return [_apply(item, tree) for item in value]
+    if isinstance(value, dict):
+        return {key: _apply(value[key], subtree) for key, subtree in tree.items() if key in value}
+    return value
+
+
+def project_items(items: List[dict], kind: str, fields: Optional[List[str]] = None) -> List[dict]:
+    """
+    Keeps only the requested fields of each item.
+
+    Args:
+        items (list): Slack objects (users, channels, messages, search matches).
+        kind (str): Key of COMPACT_FIELDS used when ``fields`` is None.
+        fields (list, optional): Dotted field paths to keep, or ["*"] for the raw objects.
+    """
+    if fields and ALL_FIELDS in fields:
+        return items
+    tree = _field_tree(fields or COMPACT_FIELDS[kind])
+    return [_apply(item, tree) for item in items]
+
+
+def project_response(response: Dict[str, Any], path: str, kind: str, fields: Optional[List[str]] = None) -> Dict[str, Any]:
+    """
+    Projects the list found at dotted ``path`` (e.g. "members", "messages.matches") of a Slack response in place.
+    Error responses and responses without the list are returned unchanged.
+    """
+    *parents, key = path.split(".")
+    node = response
+    for parent in parents:
+        node = node.get(parent) if isinstance(node, dict) else None
+    if isinstance(node, dict) and isinstance(node.get(key), list):
+        node[key] = project_items(node[key], kind, fields)
+    return response
@@ -1,80 +1,375 @@
-import threading
+import asyncio
+import random
+import sys
 import time
-from typing import Dict, Optional, Callable, Any
+from typing import Dict, Optional, Callable, Any, Awaitable, List, Tuple
 from datetime import datetime, timedelta
 
+from .limiter_backends import BucketSpec, LimiterBackend, LocalBackend
+from .metrics import Metrics, response_size
+
+# Requests per minute allowed by each Slack Web API rate limit tier.
+TIER_LIMITS = {1: 1, 2: 20, 3: 50, 4: 100}
+
+# Tier of each Slack Web API method the server calls, keyed by slack_sdk method name.
+METHOD_TIERS = {
+    "conversations_list": 2,
+    "conversations_create": 2,
+    "users_list": 2,
+    "search_messages": 2,
+    "files_upload": 2,
+    "conversations_history": 3,
+    "conversations_replies": 3,
+    "conversations_info": 3,
+    "conversations_invite": 3,
+    "chat_update": 3,
+    "chat_delete": 3,
+    "users_profile_get": 4,
+    "users_info": 4,
+    "files_getUploadURLExternal": 4,
+    "files_completeUploadExternal": 4,
+    "apps_connections_open": 1,
+}
+DEFAULT_TIER = 3
+
+# chat.postMessage is not tiered: Slack allows about one message per second per channel
+# with short bursts, under a workspace-wide limit of several hundred messages per minute.
+POST_MESSAGE_CHANNEL_LIMIT = (1.0, 3.0)  # (tokens per second, burst capacity)
+POST_MESSAGE_WORKSPACE_LIMIT = (5.0, 60.0)
+
+# Slack error codes for failures on Slack's side that are worth retrying
+TRANSIENT_ERRORS = {"internal_error", "fatal_error", "service_unavailable", "request_timeout"}
+
+# Writes Slack may already have applied when the client sees a timeout, connection error, 5xx or internal error.
+# The default policy retries them only when ratelimited, which Slack answers before doing anything.
+NON_IDEMPOTENT_METHODS = {
+    "chat_postMessage", "chat_update", "chat_delete", "conversations_create", "conversations_invite",
+    "files_upload", "files_completeUploadExternal",
+}
+
+
+class RetryPolicy:
+    """
+    How long SlackRateLimiter keeps retrying a call before surfacing its error.
+    Ratelimited calls are retried after their Retry-After (or queue) wait; transient failures (5xx, connection errors,
+    Slack internal errors) after a jittered exponential backoff, unless ``transient`` is off. Other errors are surfaced immediately.
+    """
+    def __init__(self, max_wait: float = 30.0, max_attempts: int = 5, base_delay: float = 0.5, max_delay: float = 10.0, jitter: float = 0.5, transient: bool = True):
+        """
+        Args:
+            max_wait (float): Total seconds a call may spend waiting between attempts.
+            max_attempts (int): Attempts including the first.
+            base_delay (float): Backoff before the first retry; doubled for each further retry.
+            max_delay (float): Cap on a single backoff.
+            jitter (float): Fraction of each delay that is randomized, so replicas do not retry in lockstep.
+            transient (bool): Retry transient failures as well as ratelimited responses.
+        """
+        self.max_wait = max_wait
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.jitter = jitter
+        self.transient = transient
+
+    def backoff(self, attempt: int) -> float:
+        """
+        Returns the delay before retry number ``attempt + 1``.
+        """
+        delay = min(self.max_delay, self.base_delay * (2 ** attempt))
+        return delay * (1.0 - self.jitter * random.random())
+
+
+def is_transient(e: Exception) -> bool:
+    """
+    Returns True for exceptions worth retrying: HTTP 5xx responses, connection errors and timeouts.
+    """
+    status = getattr(getattr(e, "response", None), "status_code", None)
+    if isinstance(status, int):
+        return status >= 500
+    if isinstance(e, (asyncio.TimeoutError, ConnectionError, TimeoutError)):
+        return True
+    aiohttp = sys.modules.get("aiohttp")  # not imported until a Slack client is built
+    return aiohttp is not None and isinstance(e, aiohttp.ClientError)
+
+
 class SlackRateLimiter:
     """
-    Tracks Slack API rate limits per method, queues requests, and provides ETA for next available call.
+    Paces Slack API calls per method with token buckets preloaded with Slack's tier budgets,
+    tracks Retry-After penalties from 429 responses, and provides ETA for next available call.
+    Callers over budget are queued and released in FIFO order.
+    With a RetryPolicy, ratelimited and transient failures are retried inside the server until the policy's budget runs out.
+    Bucket and Retry-After state lives in a pluggable backend, so replicas can share one budget.
     Thread-safe for use in production and testing.
     """
-    def __init__(self):
-        self.lock = threading.Lock()
-        self.next_allowed: Dict[str, float] = {}  # method -> unix timestamp
-        self.queue: Dict[str, list] = {}  # method -> list of (callable, args, kwargs, callback)
+    def __init__(self, max_queue_wait: Optional[float] = 60.0, limits: Optional[Dict[str, Tuple[float, float]]] = None, metrics: Optional[Metrics] = None, backend: Optional[LimiterBackend] = None, retry: Optional[RetryPolicy] = None, retry_policies: Optional[Dict[str, RetryPolicy]] = None):
+        """
+        Args:
+            max_queue_wait (float, optional): Longest a caller may be queued before getting a ratelimited response instead. None waits indefinitely.
+            limits (dict, optional): Overrides of (tokens per second, burst capacity) per method.
+            metrics (Metrics, optional): Receives call counts, latencies, queue waits and rate-limit events.
+            backend (LimiterBackend, optional): Where bucket and Retry-After state is kept; defaults to in-process state.
+            retry (RetryPolicy, optional): Default retry policy. None surfaces every error immediately.
+                For NON_IDEMPOTENT_METHODS it only retries ratelimited responses, so a write is never sent twice.
+            retry_policies (dict, optional): Retry policies per method, overriding ``retry``.
+        """
+        self.backend = backend or LocalBackend()
+        self.retry = retry
+        self.retry_policies = dict(retry_policies or {})
+        self.max_queue_wait = max_queue_wait
+        self.limits = dict(limits or {})
+        self.metrics = metrics
+
+    def limit_for(self, method: str) -> Tuple[float, float]:
+        """
+        Returns (tokens per second, burst capacity) for a method.
+        """
+        if method in self.limits:
+            return self.limits[method]
+        if method == "chat_postMessage":
+            return POST_MESSAGE_WORKSPACE_LIMIT
+        per_minute = TIER_LIMITS[METHOD_TIERS.get(method, DEFAULT_TIER)]
+        return per_minute / 60.0, float(per_minute)
+
+    def _bucket_specs(self, method: str, key: Optional[str]) -> List[BucketSpec]:
+        rate, capacity = self.limit_for(method)
+        specs = [(method, rate, capacity)]
+        if key is not None:
+            keyed = f"{method}:{key}"
+            if keyed in self.limits:
+                specs.append((keyed, *self.limits[keyed]))
+            elif method == "chat_postMessage":
+                specs.append((keyed, *POST_MESSAGE_CHANNEL_LIMIT))
+        return specs
+
+    def reserve(self, method: str, key: Optional[str] = None) -> Tuple[bool, float]:
+        """
+        Reserves the next call slot for a method, optionally scoped to a key such as a channel ID.
+        Returns (True, seconds to wait before calling), or (False, seconds until a slot frees up)
+        when the wait would exceed max_queue_wait; nothing is reserved in that case.
+        """
+        return self.backend.reserve(self._bucket_specs(method, key), self.max_queue_wait)
 
     def is_rate_limited(self, method: str) -> Optional[float]:
         """
         Returns seconds to wait if rate limited, else None.
         """
-        with self.lock:
-            now = time.time()
-            if method in self.next_allowed and now < self.next_allowed[method]:
-                return self.next_allowed[method] - now
-            return None
+        until = self.backend.get_deadline(method)
+        now = time.time()
+        if until and now < until:
+            return until - now
+        return None
 
     def set_rate_limit(self, method: str, retry_after: float):
         """
         Sets the next allowed time for a method.
         """
-        with self.lock:
-            self.next_allowed[method] = time.time() + retry_after
+        self.backend.set_deadline(method, time.time() + retry_after)
 
     def get_eta(self, method: str) -> Optional[str]:
-        with self.lock:
-            ts = self.next_allowed.get(method)
-            if ts and ts > time.time():
-                return datetime.fromtimestamp(ts).isoformat()
-            return None
+        ts = self.backend.get_deadline(method)
+        if ts and ts > time.time():
+            return datetime.fromtimestamp(ts).isoformat()
+        return None
 
-    def wrap(self, method: str, func: Callable, *args, **kwargs) -> Any:
+    def _ratelimited(self, method: str, retry_after: float, eta: Optional[str] = None) -> Dict[str, Any]:
+        retry_after = round(float(retry_after))
+        eta = eta or (datetime.now() + timedelta(seconds=retry_after)).isoformat()
+        return {
+            "error": "ratelimited",
+            "retry_after": retry_after,
+            "eta": eta,
+            "message": f"Rate limit hit for {method}. Waiting {retry_after} seconds. ETA: {eta}."
+        }
+
+    def _admit(self, method: str, granted: bool, wait: float) -> Tuple[Optional[Dict[str, Any]], float]:
         """
-        Call the Slack API method with rate limit handling.
-        If rate limited, returns a dict with ETA and message.
+        Turns a backend reservation into (None, seconds to wait before calling), or (ratelimited dict, 0) if it was refused.
+        """
+        if granted:
+            if self.metrics:
+                self.metrics.record_queue_wait(method, wait)
+            return None, wait
+        limited = self._ratelimited(method, wait)
+        if self.metrics:
+            self.metrics.record_ratelimited(method, limited["retry_after"], "local")
+        return limited, 0.0
+
+    def _before_call(self, method: str, key: Optional[str]) -> Tuple[Optional[Dict[str, Any]], float]:
+        """
+        Reserves a slot in one backend round trip, queueing behind any Retry-After penalty for the method.
+        Returns (ratelimited dict, 0) if the call must not be made, else (None, seconds to wait before calling).
+        """
+        return self._admit(method, *self.backend.reserve(self._bucket_specs(method, key), self.max_queue_wait, method))
+
+    async def _before_call_async(self, method: str, key: Optional[str]) -> Tuple[Optional[Dict[str, Any]], float]:
+        specs = self._bucket_specs(method, key)
+        if self.backend.blocking:
+            # A shared backend may wait on another process's lock or the network; the event loop must not
+            reservation = await asyncio.to_thread(self.backend.reserve, specs, self.max_queue_wait, method)
+        else:
+            reservation = self.backend.reserve(specs, self.max_queue_wait, method)
+        return self._admit(method, *reservation)
+
+    @staticmethod
+    def _unwrap(response: Any) -> Tuple[Any, int]:
+        # slack_sdk responses are unwrapped to their data here, where the body size is still known
+        if isinstance(response, dict) or not hasattr(response, "data"):
+            return response, 0
+        return response.data, response_size(response)
+
+    def _record(self, method: str, started: float, result: Any, size: int = 0):
+        # ``result`` is what the caller gets back, or None if the call raised
+        if not self.metrics:
+            return
+        latency = time.time() - started
+        if not isinstance(result, dict):
+            self.metrics.record_call(method, "exception", latency)
+        elif result.get("error") == "ratelimited":
+            self.metrics.record_ratelimited(method, result["retry_after"], "slack")
+            self.metrics.record_call(method, "ratelimited", latency)
+        else:
+            self.metrics.record_call(method, "ok" if result.get("ok") else "error", latency, size)
+
+    def _slack_retry_after(self, method: str, result: Any = None, exc: Optional[Exception] = None) -> Optional[float]:
+        """
+        Returns the Retry-After of a ratelimited response from Slack, or of a SlackApiError with status 429, else None.
+        """
+        if exc is not None:
+            response = getattr(exc, "response", None)
+            if getattr(response, "status_code", None) != 429:
+                return None
+            retry_after = response.headers.get("Retry-After")
+            return float(retry_after) if retry_after else 1.0 / self.limit_for(method)[0]
+        if isinstance(result, dict) and result.get("error") == "ratelimited":
+            return float(result.get("retry_after") or 1.0 / self.limit_for(method)[0])
+        return None
+
+    def policy_for(self, method: str) -> Optional[RetryPolicy]:
+        if method in self.retry_policies:
+            return self.retry_policies[method]
+        if self.retry is not None and self.retry.transient and method in NON_IDEMPOTENT_METHODS:
+            return RetryPolicy(self.retry.max_wait, self.retry.max_attempts, self.retry.base_delay, self.retry.max_delay, self.retry.jitter, transient=False)
+        return self.retry
+
+    def _retry_delay(self, method: str, attempt: int, started: float, result: Any = None, exc: Optional[Exception] = None) -> Optional[float]:
+        """
+        Returns seconds to wait before retrying a failed attempt, or None if its outcome should be surfaced.
         """
-        wait = self.is_rate_limited(method)
+        policy = self.policy_for(method)
+        if policy is None or attempt + 1 >= policy.max_attempts:
+            return None
+        if exc is not None:
+            if not policy.transient or not is_transient(exc):
+                return None
+            delay = policy.backoff(attempt)
+        elif isinstance(result, dict) and result.get("error") == "ratelimited":
+            # The next attempt queues through whatever is left of the penalty; a little jitter spreads out waiting callers
+            delay = float(result["retry_after"]) + random.uniform(0, policy.jitter * policy.base_delay)
+        elif policy.transient and isinstance(result, dict) and result.get("error") in TRANSIENT_ERRORS:
+            delay = policy.backoff(attempt)
+        else:
+            return None
+        if time.time() - started + delay > policy.max_wait:
+            return None
+        if self.metrics:
+            self.metrics.record_retry(method, delay)
+        return delay
+
+    def _call_once(self, method: str, func: Callable, args: tuple, key: Optional[str], kwargs: dict) -> Any:
+        limited, wait = self._before_call(method, key)
+        if limited:
+            return limited
+        if wait:
+            time.sleep(wait)
+        started = time.time()
+        try:
+            result, size = self._unwrap(func(*args, **kwargs))
+        except Exception as e:
+            retry_after = self._slack_retry_after(method, exc=e)
+            if retry_after is None:
+                self._record(method, started, None)
+                raise
+        else:
+            retry_after = self._slack_retry_after(method, result)
+            if retry_after is None:
+                self._record(method, started, result, size)
+                return result
+        # Slack refused the call: later callers queue (or are refused) until Retry-After has passed
+        self.set_rate_limit(method, retry_after)
+        result = self._ratelimited(method, retry_after)
+        self._record(method, started, result)
+        return result
+
+    async def _call_once_async(self, method: str, func: Callable[..., Awaitable[Any]], args: tuple, key: Optional[str], kwargs: dict) -> Any:
+        limited, wait = await self._before_call_async(method, key)
+        if limited:
+            return limited
         if wait:
-            eta = self.get_eta(method)
-            return {
-                "error": "ratelimited",
-                "retry_after": round(wait),
-                "eta": eta,
-                "message": f"Rate limit hit for {method}. Waiting {round(wait)} seconds. ETA: {eta}."
-            }
+            await asyncio.sleep(wait)
+        started = time.time()
         try:
-            result = func(*args, **kwargs)
-            # If Slack returns a 429 error, handle it below
-            if isinstance(result, dict) and result.get("error") == "ratelimited":
-                retry_after = result.get("retry_after") or 30  # fallback to 30s if not provided
-                self.set_rate_limit(method, float(retry_after))
-                eta = self.get_eta(method)
-                return {
-                    "error": "ratelimited",
-                    "retry_after": round(float(retry_after)),
-                    "eta": eta,
-                    "message": f"Rate limit hit for {method}. Waiting {round(float(retry_after))} seconds. ETA: {eta}."
-                }
-            return result
+            result, size = self._unwrap(await func(*args, **kwargs))
         except Exception as e:
-            # If it's a SlackApiError with 429, extract Retry-After
-            if hasattr(e, "response") and hasattr(e.response, "status_code") and e.response.status_code == 429:
-                retry_after = int(e.response.headers.get("Retry-After", 30))
-                self.set_rate_limit(method, retry_after)
-                eta = self.get_eta(method)
-                return {
-                    "error": "ratelimited",
-                    "retry_after": retry_after,
-                    "eta": eta,
-                    "message": f"Rate limit hit for {method}. Waiting {retry_after} seconds. ETA: {eta}."
-                }
-            raise
+            retry_after = self._slack_retry_after(method, exc=e)
+            if retry_after is None:
+                self._record(method, started, None)
+                raise
+        else:
+            retry_after = self._slack_retry_after(method, result)
+            if retry_after is None:
+                self._record(method, started, result, size)
+                return result
+        if self.backend.blocking:
+            await asyncio.to_thread(self.set_rate_limit, method, retry_after)
+        else:
+            self.set_rate_limit(method, retry_after)
+        result = self._ratelimited(method, retry_after)
+        self._record(method, started, result)
+        return result
+
+    def wrap(self, method: str, func: Callable, *args, key: Optional[str] = None, **kwargs) -> Any:
+        """
+        Call the Slack API method with rate limit handling.
+        Calls are paced by the method's token bucket (and the ``key`` bucket, e.g. per channel), blocking until a slot is free.
+        Callers arriving while a Slack Retry-After penalty is in force are queued until it ends, then reserve a slot as usual.
+        If the penalty plus the queue wait would exceed max_queue_wait, returns a dict with ETA and message instead.
+        With a retry policy for the method, such responses and transient failures are retried until its budget is exhausted.
+        ``func`` may return a slack_sdk response, which is unwrapped to its data after its body size is recorded.
+        """
+        started = time.time()
+        attempt = 0
+        while True:
+            try:
+                result = self._call_once(method, func, args, key, kwargs)
+            except Exception as e:
+                delay = self._retry_delay(method, attempt, started, exc=e)
+                if delay is None:
+                    raise
+            else:
+                delay = self._retry_delay(method, attempt, started, result=result)
+                if delay is None:
+                    return result
+            time.sleep(delay)
+            attempt += 1
+
+    async def wrap_async(self, method: str, func: Callable[..., Awaitable[Any]], *args, key: Optional[str] = None, **kwargs) -> Any:
+        """
+        Asyncio version of wrap for coroutine functions.
+        Queued callers await their slot instead of blocking the event loop, so calls to different methods overlap.
+        Each call makes one backend round trip (two after a 429), run in a worker thread for blocking backends.
+        """
+        started = time.time()
+        attempt = 0
+        while True:
+            try:
+                result = await self._call_once_async(method, func, args, key, kwargs)
+            except Exception as e:
+                delay = self._retry_delay(method, attempt, started, exc=e)
+                if delay is None:
+                    raise
+            else:
+                delay = self._retry_delay(method, attempt, started, result=result)
+                if delay is None:
+                    return result
+            await asyncio.sleep(delay)
+            attempt += 1
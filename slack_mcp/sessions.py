@@ -0,0 +1,107 @@
+import asyncio
+import time
+from typing import Any, Dict, Optional
+
+from fastmcp.exceptions import ToolError
+from fastmcp.server.middleware import Middleware
+
+from .metrics import Metrics
+
+
+class SessionLimiter:
+    """
+    Caps the number of tool calls each client session may run at once, so one busy client cannot take over the
+    shared Slack budget and connection pool. Calls over the cap queue in FIFO order.
+    State is only kept for sessions with calls running or queued, so it stays bounded however many clients connect.
+    """
+    def __init__(self, max_concurrency: int = 4, max_queue_wait: Optional[float] = 60.0, metrics: Optional[Metrics] = None):
+        """
+        Args:
+            max_concurrency (int): Tool calls a session may run at once. 0 disables the limit.
+            max_queue_wait (float, optional): Longest a call may be queued before it is refused. None waits indefinitely.
+            metrics (Metrics, optional): Records queue waits under the "session" method.
+        """
+        self.max_concurrency = max_concurrency
+        self.max_queue_wait = max_queue_wait
+        self.metrics = metrics
+        self.sessions: Dict[str, list] = {}  # session ID -> [semaphore, calls running or queued]
+
+    async def acquire(self, session_id: str) -> bool:
+        """
+        Waits for a call slot in the session. Returns False if the call was refused after waiting max_queue_wait.
+        """
+        if not self.max_concurrency:
+            return True
+        entry = self.sessions.setdefault(session_id, [asyncio.Semaphore(self.max_concurrency), 0])
+        entry[1] += 1
+        started = time.time()
+        try:
+            await asyncio.wait_for(entry[0].acquire(), self.max_queue_wait)
+        except asyncio.TimeoutError:
+            self._done(session_id, entry)
+            return False
+        except BaseException:
+            self._done(session_id, entry)
+            raise
+        if self.metrics:
+            self.metrics.record_queue_wait("session", time.time() - started)
+        return True
+
+    def release(self, session_id: str):
+        if not self.max_concurrency:
+            return
+        entry = self.sessions[session_id]
+        entry[0].release()
+        self._done(session_id, entry)
+
+    def _done(self, session_id: str, entry: list):
+        entry[1] -= 1
+        if not entry[1] and self.sessions.get(session_id) is entry:
+            del self.sessions[session_id]
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "active_sessions": len(self.sessions),
+            "calls_in_flight": sum(count for _, count in self.sessions.values()),
+            "max_concurrency_per_session": self.max_concurrency,
+        }
+
+
+class SessionConcurrencyMiddleware(Middleware):
+    """
+    FastMCP middleware applying a SessionLimiter to every tool call, keyed by the calling client (see _session_id).
+    """
+    def __init__(self, limiter: SessionLimiter):
+        self.limiter = limiter
+
+    async def on_call_tool(self, context, call_next):
+        session_id = _session_id(context.fastmcp_context)
+        if not await self.limiter.acquire(session_id):
+            raise ToolError(f"Too many concurrent tool calls for this session (limit {self.limiter.max_concurrency}); retry later.")
+        try:
+            return await call_next(context)
+        finally:
+            self.limiter.release(session_id)
+
+
+def _session_id(fastmcp_context: Any) -> str:
+    """
+    Identifies the client making a tool call: the MCP session ID of a stateful HTTP session, else the client_id
+    sent in the request metadata, else the client's address. Stateless HTTP gives every request a fresh session,
+    so the FastMCP session ID alone would not group a client's calls. stdio serves a single client.
+    """
+    try:
+        request_context = getattr(fastmcp_context, "request_context", None)
+    except RuntimeError:
+        request_context = None
+    request = getattr(request_context, "request", None)
+    headers = getattr(request, "headers", None) or {}
+    if headers.get("mcp-session-id"):
+        return f"session:{headers['mcp-session-id']}"
+    client_id = getattr(fastmcp_context, "client_id", None)
+    if client_id:
+        return f"client:{client_id}"
+    client = getattr(request, "client", None)
+    if client is not None:
+        return f"address:{client.host}"
+    return "default"
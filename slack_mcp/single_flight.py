@@ -0,0 +1,50 @@
+import asyncio
+import copy
+import json
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple
+
+from .metrics import Metrics
+
+
+def request_key(method: str, params: Dict[str, Any]) -> Tuple[str, str]:
+    """
+    Normalizes a Slack request into a hashable key: unset parameters are dropped and the rest sorted.
+    """
+    normalized = {name: value for name, value in params.items() if value is not None}
+    return method, json.dumps(normalized, sort_keys=True, default=str)
+
+
+class SingleFlight:
+    """
+    Coalesces identical concurrent requests: the first caller starts the upstream call and later callers with the same key
+    await its result instead of making their own. Each caller gets its own copy when a result is shared, since tools
+    project responses in place. Only calls in flight are shared; nothing is cached after they complete.
+    """
+    def __init__(self, metrics: Optional[Metrics] = None):
+        """
+        Args:
+            metrics (Metrics, optional): Records each call as a "single_flight" cache hit (shared) or miss (upstream call).
+        """
+        self.metrics = metrics
+        self.calls: Dict[Hashable, list] = {}  # key -> [task, number of callers]
+
+    async def do(self, key: Hashable, func: Callable[[], Awaitable[Any]]) -> Any:
+        loop = asyncio.get_running_loop()
+        entry = self.calls.get(key)
+        shared = entry is not None and entry[0].get_loop() is loop
+        if shared:
+            entry[1] += 1
+        else:
+            task = loop.create_task(func())
+            entry = [task, 1]
+            self.calls[key] = entry
+            task.add_done_callback(lambda done: self._finished(key, entry))
+        if self.metrics:
+            self.metrics.record_cache("single_flight", shared)
+        # shield: a cancelled caller must not cancel the call for the others
+        result = await asyncio.shield(entry[0])
+        return copy.deepcopy(result) if entry[1] > 1 else result
+
+    def _finished(self, key: Hashable, entry: list):
+        if self.calls.get(key) is entry:
+            del self.calls[key]
@@ -0,0 +1,65 @@
+import gzip
+import json
+import os
+import time
+from typing import Any, Dict, List, Optional
+
+# Version 2 stores each directory as columns (field names once, then one row of values per object);
+# version 1 snapshots (a list of objects per directory) are still read
+SNAPSHOT_VERSION = 2
+
+
+def pack_rows(items: List[dict]) -> Dict[str, Any]:
+    """
+    Packs objects into {"fields": [...], "rows": [[...], ...]}, so top-level keys are written once instead of per object.
+    A missing key is stored as null.
+    """
+    fields: Dict[str, None] = {}
+    for item in items:
+        fields.update(dict.fromkeys(item))
+    names = list(fields)
+    return {"fields": names, "rows": [[item.get(name) for name in names] for item in items]}
+
+
+def unpack_rows(packed: Dict[str, Any]) -> List[dict]:
+    """
+    Inverse of pack_rows. Null values are dropped, as for keys the object never had.
+    """
+    names = packed["fields"]
+    return [{name: value for name, value in zip(names, row) if value is not None} for row in packed["rows"]]
+
+
+def load_snapshot(path: str) -> Optional[Dict[str, Any]]:
+    """
+    Reads a warm-start snapshot of the user and channel directories.
+    Returns None if the file is missing, unreadable or from an unknown snapshot version.
+    """
+    try:
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            data = json.load(f)
+        if not isinstance(data, dict) or data.get("version") not in (1, SNAPSHOT_VERSION):
+            return None
+        if data["version"] == SNAPSHOT_VERSION:
+            data["users"] = unpack_rows(data["users"])
+            data["channels"] = unpack_rows(data["channels"])
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+    return data
+
+
+def save_snapshot(path: str, users: List[dict], users_loaded_at: Optional[float], channels: List[dict], channels_loaded_at: Optional[float]):
+    """
+    Writes a gzipped JSON snapshot atomically, so a crash mid-write never leaves a truncated file behind.
+    """
+    data = {
+        "version": SNAPSHOT_VERSION,
+        "saved_at": time.time(),
+        "users": pack_rows(users),
+        "users_loaded_at": users_loaded_at,
+        "channels": pack_rows(channels),
+        "channels_loaded_at": channels_loaded_at,
+    }
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with gzip.open(tmp, "wt", encoding="utf-8") as f:
+        json.dump(data, f, separators=(",", ":"))
+    os.replace(tmp, path)
@@ -0,0 +1,78 @@
+import asyncio
+import base64
+import binascii
+import os
+from typing import Any, AsyncIterator, Optional
+
+# Bytes read from disk (or decoded from base64) per chunk of an upload body
+UPLOAD_CHUNK_SIZE = 256 * 1024
+
+
+def base64_length(data: str) -> int:
+    """
+    Returns the decoded size of a base64 string without decoding it.
+    """
+    return len(data) * 3 // 4 - len(data[-2:]) + len(data[-2:].rstrip("="))
+
+
+async def file_chunks(path: str, chunk_size: int = UPLOAD_CHUNK_SIZE) -> AsyncIterator[bytes]:
+    """
+    Reads a file in chunks off the event loop, so only one chunk is held in memory at a time.
+    """
+    with open(path, "rb") as f:
+        while True:
+            chunk = await asyncio.to_thread(f.read, chunk_size)
+            if not chunk:
+                return
+            yield chunk
+
+
+async def base64_chunks(data: str, chunk_size: int = UPLOAD_CHUNK_SIZE) -> AsyncIterator[bytes]:
+    """
+    Decodes a base64 string chunk by chunk instead of materializing the whole file.
+    """
+    step = chunk_size // 3 * 4  # whole base64 quanta, so every slice decodes on its own
+    for start in range(0, len(data), step):
+        yield base64.b64decode(data[start:start + step], validate=True)
+
+
+def normalize_base64(data: str) -> str:
+    """
+    Strips whitespace and checks the padding, raising ValueError for malformed input.
+    """
+    data = "".join(data.split())
+    if len(data) % 4:
+        raise ValueError("content_base64 is not valid base64 (length is not a multiple of 4).")
+    try:
+        base64.b64decode(data[-4:], validate=True)
+    except binascii.Error as e:
+        raise ValueError(f"content_base64 is not valid base64: {e}") from e
+    return data
+
+
+def source_length(path: Optional[str], data: Optional[str]) -> int:
+    return os.path.getsize(path) if path else base64_length(data or "")
+
+
+async def post_upload(url: str, chunks: AsyncIterator[bytes], length: int, session: Optional[Any] = None) -> Optional[str]:
+    """
+    Streams an upload body to a URL from files.getUploadURLExternal.
+    Returns None on success, or an error message.
+
+    Args:
+        session (aiohttp.ClientSession, optional): Session to reuse; a temporary one is opened otherwise.
+    """
+    import aiohttp  # deferred with the rest of the HTTP stack to keep server startup fast
+    owned = session is None
+    session = session or aiohttp.ClientSession()
+    try:
+        headers = {"Content-Type": "application/octet-stream", "Content-Length": str(length)}
+        async with session.post(url, data=chunks, headers=headers) as resp:
+            if resp.status != 200:
+                return f"Upload failed with HTTP {resp.status}: {(await resp.text())[:200]}"
+        return None
+    except aiohttp.ClientError as e:
+        return f"Upload failed: {e}"
+    finally:
+        if owned:
+            await session.close()
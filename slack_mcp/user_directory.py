@@ -0,0 +1,218 @@
+import asyncio
+import bisect
+import threading
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set
+
+NAME_FIELDS = ("real_name", "display_name", "name")
+
+
+def _search_text(user: dict) -> str:
+    """
+    Returns the lowercased, NUL-separated name fields of a user, so a query can never match across two fields.
+    """
+    profile = user.get("profile") or {}
+    values = [user.get(field) for field in NAME_FIELDS]
+    values += [profile.get("real_name"), profile.get("display_name")]
+    return "\x00".join((v or "").lower() for v in values)
+
+
+def _trigrams(text: str) -> Set[str]:
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+def _changed(old: Optional[dict], new: dict) -> bool:
+    """
+    Whether a freshly listed user differs from the loaded one. Slack bumps ``updated`` on every profile change,
+    so only users without it (or with a different set of fields) are compared in full. Null fields count as absent,
+    as they are not kept in snapshots.
+    """
+    if old is None:
+        return True
+    if {key for key, value in old.items() if value is not None} != {key for key, value in new.items() if value is not None}:
+        return True
+    if "updated" in new:
+        return old["updated"] != new["updated"]
+    return old != new
+
+
+class UserDirectory:
+    """
+    In-process directory of workspace users with a trigram index over lowercased real_name, display_name and name.
+    Loaded once through ``loader`` and refreshed in a background task once ``ttl`` seconds have passed, so lookups never wait on Slack after the first load.
+    The index is swapped under a lock, so searches may run from any thread; loading and refreshing are asyncio-only.
+    """
+    def __init__(self, loader: Callable[[], Awaitable[Dict[str, Any]]], ttl: float = 900.0, on_loaded: Optional[Callable[[], None]] = None):
+        """
+        Args:
+            loader (Callable): Coroutine function returning {"ok": True, "members": [user, ...]} or a Slack-style error dict.
+            ttl (float): Seconds before the directory is refreshed in the background.
+            on_loaded (Callable, optional): Called after each successful load, e.g. to save a warm-start snapshot.
+        """
+        self.loader = loader
+        self.ttl = ttl
+        self.on_loaded = on_loaded
+        self.lock = threading.Lock()
+        self.users: List[dict] = []
+        self.by_id: Dict[str, dict] = {}
+        self.positions: Dict[str, int] = {}  # user ID -> position in users
+        self.texts: List[str] = []
+        self.index: Dict[str, List[int]] = {}  # trigram -> ascending user positions
+        self.loaded_at: Optional[float] = None
+        self.last_error: Optional[Dict[str, Any]] = None
+        self.refreshing = False
+        self.refresh_task: Optional[asyncio.Task] = None
+        self.load_task: Optional[asyncio.Task] = None  # the first load, shared by every caller waiting for it
+        self.last_delta: Optional[Dict[str, int]] = None  # users changed by the last refresh, if it was applied as a delta
+
+    def clear(self):
+        """
+        Drops all loaded users so the next lookup reloads from Slack.
+        """
+        with self.lock:
+            self.users, self.texts, self.index, self.by_id, self.positions = [], [], {}, {}, {}
+            self.loaded_at = None
+            self.last_error = None
+        self.load_task = None
+
+    async def load(self) -> Optional[Dict[str, Any]]:
+        """
+        Loads users through the loader. Once loaded, a refresh compares the ``updated`` field of every listed user and
+        re-indexes only the users that changed; a full rebuild is done only when users have disappeared from the listing.
+        Returns None on success, or the loader's error dict on failure (the previous index is kept).
+        """
+        res = await self.loader()
+        if not res.get("ok"):
+            with self.lock:
+                self.last_error = res
+            return res
+        members = res.get("members", [])
+        with self.lock:
+            by_id, loaded = self.by_id, self.loaded_at is not None
+        listed = {user["id"] for user in members if user.get("id")}
+        if loaded and listed.issuperset(by_id):
+            changed = [user for user in members if user.get("id") and _changed(by_id.get(user["id"]), user)]
+            self.upsert(changed)
+            with self.lock:
+                self.loaded_at = time.time()
+                self.last_error = None
+                self.last_delta = {"listed": len(listed), "changed": len(changed)}
+        else:
+            self.restore(members, time.time())
+            with self.lock:
+                self.last_delta = None
+        if self.on_loaded:
+            self.on_loaded()
+        return None
+
+    def restore(self, users: List[dict], loaded_at: float):
+        """
+        Swaps in a freshly built index over ``users``, as loaded at ``loaded_at`` (e.g. from a warm-start snapshot).
+        """
+        users = list(users)
+        texts = [_search_text(user) for user in users]
+        index: Dict[str, List[int]] = {}
+        for pos, text in enumerate(texts):
+            for gram in _trigrams(text):
+                index.setdefault(gram, []).append(pos)
+        by_id = {user["id"]: user for user in users if user.get("id")}
+        positions = {user["id"]: pos for pos, user in enumerate(users) if user.get("id")}
+        with self.lock:
+            self.users, self.texts, self.index, self.by_id, self.positions = users, texts, index, by_id, positions
+            self.loaded_at = loaded_at
+            self.last_error = None
+
+    def upsert(self, users: List[dict]):
+        """
+        Adds or updates users without a full reload, e.g. from user_change events. Ignored until the directory is loaded.
+        Structures are copied on write, so searches in progress keep a consistent view.
+        """
+        with self.lock:
+            if self.loaded_at is None:
+                return
+            all_users, texts, index = list(self.users), list(self.texts), dict(self.index)
+            by_id, positions = dict(self.by_id), dict(self.positions)
+            for user in users:
+                if not user.get("id"):
+                    continue
+                text = _search_text(user)
+                pos = positions.get(user["id"])
+                if pos is None:
+                    pos = positions[user["id"]] = len(all_users)
+                    all_users.append(user)
+                    texts.append(text)
+                    old_grams: Set[str] = set()
+                else:
+                    old_grams = _trigrams(texts[pos])
+                    all_users[pos], texts[pos] = user, text
+                new_grams = _trigrams(text)
+                for gram in old_grams - new_grams:
+                    index[gram] = [p for p in index[gram] if p != pos]
+                for gram in new_grams - old_grams:
+                    posting = list(index.get(gram, []))
+                    bisect.insort(posting, pos)
+                    index[gram] = posting
+                by_id[user["id"]] = user
+            self.users, self.texts, self.index, self.by_id, self.positions = all_users, texts, index, by_id, positions
+
+    async def ensure_loaded(self) -> Optional[Dict[str, Any]]:
+        """
+        Loads on first use (the caller awaits it) and schedules a background refresh when the TTL has expired.
+        Concurrent first callers share one load. Returns an error dict only when no data has ever been loaded.
+        """
+        with self.lock:
+            loaded_at = self.loaded_at
+            stale = loaded_at is not None and time.time() - loaded_at >= self.ttl
+            if stale and not self.refreshing:
+                self.refreshing = True
+            else:
+                stale = False
+        if loaded_at is None:
+            loop = asyncio.get_running_loop()
+            if self.load_task is None or self.load_task.done() or self.load_task.get_loop() is not loop:
+                self.load_task = loop.create_task(self.load())
+            # Shielded so one caller being cancelled does not cancel the load the others are waiting for
+            return await asyncio.shield(self.load_task)
+        if stale:
+            self.refresh_task = asyncio.get_running_loop().create_task(self._refresh())
+        return None
+
+    async def _refresh(self):
+        try:
+            await self.load()
+        finally:
+            with self.lock:
+                self.refreshing = False
+
+    def get(self, user_id: str) -> Optional[dict]:
+        """
+        Returns a loaded user by ID, or None. No Slack API calls are made.
+        """
+        with self.lock:
+            return self.by_id.get(user_id)
+
+    def search(self, substring: str) -> List[dict]:
+        """
+        Returns users whose real_name, display_name or name contains ``substring`` (case-insensitive).
+        Only the loaded index is consulted; no Slack API calls are made.
+        """
+        query = substring.lower()
+        with self.lock:
+            users, texts, index = self.users, self.texts, self.index
+        if len(query) < 3:
+            candidates = range(len(texts))
+        else:
+            postings = []
+            for gram in _trigrams(query):
+                posting = index.get(gram)
+                if not posting:
+                    return []
+                postings.append(posting)
+            postings.sort(key=len)
+            positions = set(postings[0])
+            for posting in postings[1:]:
+                positions.intersection_update(posting)
+                if not positions:
+                    return []
+            candidates = sorted(positions)
+        return [users[pos] for pos in candidates if query in texts[pos]]
@@ -0,0 +1,33 @@
+from slack_mcp.aggregation import ChannelStats
+
+# 2024-01-01 was a Monday; 1704067200 is 00:00 UTC that day
+DAY = 1704067200
+
+def test_channel_stats_single_pass():
+    stats = ChannelStats()
+    messages = [
+        {"ts": f"{DAY + 9 * 3600}.000100", "user": "U1", "reactions": [{"name": "+1", "count": 3}, {"name": "eyes", "count": 1}]},
+        {"ts": f"{DAY + 9 * 3600 + 60}.000100", "user": "U1", "reply_count": 4},
+        {"ts": f"{DAY + 86400 + 23 * 3600}.000100", "user": "U2", "reply_count": 2, "reactions": [{"name": "+1", "count": 1}]},
+        {"ts": f"{DAY + 86400}.000200", "bot_id": "B1", "subtype": "bot_message"},
+        {"text": "no ts is skipped"},
+    ]
+    for message in messages:
+        stats.add(message)
+    result = stats.result(top=1)
+    assert result["messages"] == 4 and result["bot_messages"] == 1
+    assert result["first_ts"] == f"{DAY + 9 * 3600}.000100" and result["last_ts"] == f"{DAY + 86400 + 23 * 3600}.000100"
+    assert result["posters"] == 2 and result["top_posters"] == [{"user": "U1", "messages": 2}]
+    assert result["by_hour"][9] == 2 and result["by_hour"][23] == 1 and result["by_hour"][0] == 1
+    assert result["by_weekday"] == {"Mon": 2, "Tue": 2, "Wed": 0, "Thu": 0, "Fri": 0, "Sat": 0, "Sun": 0}
+    assert result["by_day"] == {"2024-01-01": 2, "2024-01-02": 2}
+    assert result["reactions"] == {"total": 5, "top": [{"name": "+1", "count": 4}]}
+    assert result["threads"] == {"threads": 2, "replies": 6, "avg_replies": 3.0, "max_replies": 4, "max_replies_ts": f"{DAY + 9 * 3600 + 60}.000100"}
+
+def test_channel_stats_tz_offset():
+    stats = ChannelStats(tz_offset=-5)
+    stats.add({"ts": f"{DAY + 3600}.0", "user": "U1"})  # 01:00 UTC Monday is 20:00 Sunday at UTC-5
+    result = stats.result()
+    assert result["by_hour"][20] == 1
+    assert result["by_weekday"]["Sun"] == 1
+    assert result["by_day"] == {"2023-12-31": 1}
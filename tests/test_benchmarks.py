@@ -0,0 +1,55 @@
+from benchmarks.fake_slack import FakeSlack, Workspace
+from benchmarks.run import compare, parse_args, run_benchmarks
+from slack_mcp import main
+import aiohttp
+import asyncio
+
+async def call(base_url, method, **params):
+    async with aiohttp.ClientSession() as session:
+        async with session.post(base_url + method, data=params) as resp:
+            return resp.status, resp.headers.get("Retry-After"), await resp.json()
+
+def test_fake_slack_pages_history_and_injects_429():
+    async def scenario():
+        fake = FakeSlack(Workspace(users=10, channels=2, messages=10), latency=0, tier_scale=0.04)  # history: 2 per minute, users.info: 4
+        runner, base_url = await fake.start()
+        try:
+            _, _, first = await call(base_url, "conversations.history", channel="C00000001", limit="3")
+            _, _, second = await call(base_url, "conversations.history", channel="C00000001", limit="3", cursor=first["response_metadata"]["next_cursor"])
+            replies = await call(base_url, "conversations.replies", channel="C00000001", ts=second["messages"][-1]["ts"])
+            users = [await call(base_url, "users.info", user="U00000003") for _ in range(5)]
+        finally:
+            await runner.cleanup()
+        return fake, first, second, replies, users
+    fake, first, second, replies, users = asyncio.run(scenario())
+    assert [m["ts"].split(".")[0][-1] for m in first["messages"] + second["messages"]] == ["4", "3", "2", "1", "0"]
+    assert first["has_more"] and not second["has_more"]
+    assert len(replies[2]["messages"]) == 4  # parent + 3 replies
+    assert [u[0] for u in users] == [200, 200, 200, 200, 429]
+    assert int(users[4][1]) >= 1
+    assert fake.calls["users_info"] == 5 and fake.ratelimited["users_info"] == 1
+
+def test_benchmark_smoke_run(monkeypatch):
+    monkeypatch.setattr(main, "slack_client", None)
+    monkeypatch.setattr(main, "rate_limiter", main.rate_limiter)
+    monkeypatch.setattr(main, "DIRECTORY_SNAPSHOT_PATH", main.DIRECTORY_SNAPSHOT_PATH)
+    args = parse_args(["--users", "300", "--channels", "10", "--messages", "500", "--latency", "0", "--requests", "20", "--concurrency", "4",
+                       "get_user_info", "find_users_by_name", "read_channel_messages_threads"])
+    try:
+        results = asyncio.run(run_benchmarks(args))
+    finally:
+        main.user_directory.clear()
+        main.channel_directory.clear()
+        main.user_info_cache.clear()
+        main.channel_info_cache.clear()
+    scenarios = results["scenarios"]
+    assert set(scenarios) == {"get_user_info", "find_users_by_name", "read_channel_messages_threads"}
+    for result in scenarios.values():
+        assert result["errors"] == {}
+        assert result["p99_ms"] >= result["p50_ms"] > 0
+        assert result["peak_rss_mb"] > 0
+    assert scenarios["find_users_by_name"]["upstream_calls_by_method"] == {"users_list": 2}  # directory loaded once, then served locally
+    assert scenarios["read_channel_messages_threads"]["upstream_calls_by_method"]["conversations_replies"] > 0
+    assert compare(results, results, 0.0) == []
+    slower = {"scenarios": {"get_user_info": dict(scenarios["get_user_info"], p99_ms=scenarios["get_user_info"]["p99_ms"] / 2)}}
+    assert compare(results, slower, 0.1) == [f"get_user_info: p99_ms {slower['scenarios']['get_user_info']['p99_ms']} -> {scenarios['get_user_info']['p99_ms']}"]
@@ -0,0 +1,36 @@
+from slack_mcp.cache import TTLCache
+from slack_mcp.metrics import Metrics
+import time
+
+def test_ttl_cache_hits_and_expiry():
+    metrics = Metrics()
+    cache = TTLCache("user_info", ttl=0.05, metrics=metrics)
+    assert cache.get("U1") is None
+    cache.set("U1", {"ok": True})
+    assert cache.get("U1") == {"ok": True}
+    time.sleep(0.06)
+    assert cache.get("U1") is None
+    assert (cache.hits, cache.misses) == (1, 2)
+    assert metrics.snapshot()["caches"]["user_info"]["hits"] == 1
+
+def test_ttl_cache_evicts_least_recently_used():
+    cache = TTLCache("channel_info", max_entries=2)
+    cache.set("C1", 1)
+    cache.set("C2", 2)
+    cache.get("C1")
+    cache.set("C3", 3)
+    assert cache.get("C2") is None
+    assert cache.get("C1") == 1 and cache.get("C3") == 3
+
+def test_ttl_cache_invalidates_every_variant():
+    cache = TTLCache("channel_info")
+    cache.set("C1", "with members", variant=True)
+    cache.set("C1", "plain", variant=None)
+    cache.set("C2", "other")
+    cache.invalidate("C1")
+    assert cache.get("C1", True) is None and cache.get("C1") is None
+    assert cache.get("C2") == "other"
+    # ttl=0 disables caching
+    disabled = TTLCache("user_info", ttl=0)
+    disabled.set("U1", 1)
+    assert disabled.get("U1") is None
@@ -0,0 +1,82 @@
+from slack_mcp.channel_directory import ChannelDirectory
+import asyncio
+import time
+
+def make_pages(pages, calls):
+    async def fetch_page(cursor):
+        index = int(cursor or 0)
+        calls.append(index)
+        next_cursor = str(index + 1) if index + 1 < len(pages) else ""
+        return {"ok": True, "channels": pages[index], "response_metadata": {"next_cursor": next_cursor}}
+    return fetch_page
+
+PAGES = [
+    [{"id": "C1", "name": "general"}, {"id": "C2", "name": "random"}],
+    [{"id": "C3", "name": "dev"}],
+    [{"id": "C4", "name": "ops"}],
+]
+
+def test_channel_directory_stops_paging_once_found():
+    calls = []
+    directory = ChannelDirectory(make_pages(PAGES, calls))
+    assert asyncio.run(directory.resolve("#Random")) == ("C2", None)
+    assert calls == [0]
+    # The scan resumes where it stopped
+    assert asyncio.run(directory.resolve("dev")) == ("C3", None)
+    assert calls == [0, 1]
+    assert asyncio.run(directory.resolve("#general")) == ("C1", None)
+    assert calls == [0, 1]
+
+def test_channel_directory_unknown_name_after_complete_scan():
+    calls = []
+    directory = ChannelDirectory(make_pages(PAGES, calls))
+    assert asyncio.run(directory.resolve("#missing")) == (None, None)
+    assert calls == [0, 1, 2]
+    # A fresh, complete directory answers misses from memory for miss_interval seconds after a scan
+    assert asyncio.run(directory.resolve("#missing")) == (None, None)
+    assert calls == [0, 1, 2]
+    directory.miss_interval = 0
+    assert asyncio.run(directory.resolve("#missing")) == (None, None)
+    assert calls == [0, 1, 2, 0, 1, 2]
+
+def test_channel_directory_miss_finds_channel_created_after_scan():
+    calls = []
+    pages = [list(page) for page in PAGES]
+    directory = ChannelDirectory(make_pages(pages, calls), miss_interval=0.05)
+    asyncio.run(directory.resolve("#ops"))
+    assert not directory.stale
+    pages[0].append({"id": "C6", "name": "launch"})
+    time.sleep(0.1)
+    # Found on the first page of the rescan, without waiting for the TTL
+    assert asyncio.run(directory.resolve("#launch")) == ("C6", None)
+    assert calls == [0, 1, 2, 0]
+
+def test_channel_directory_merge_handles_renames():
+    directory = ChannelDirectory(make_pages(PAGES, []))
+    directory.merge([{"id": "C1", "name": "general"}])
+    directory.merge([{"id": "C1", "name": "announcements"}])
+    assert directory.lookup("general") is None
+    assert directory.lookup("#announcements") == "C1"
+    directory.remove("C1")
+    assert directory.lookup("announcements") is None
+
+def test_channel_directory_background_refresh_prunes_deleted():
+    calls = []
+    pages = [list(page) for page in PAGES]
+    directory = ChannelDirectory(make_pages(pages, calls), ttl=0.05)
+    async def scenario():
+        await directory.resolve("#missing")
+        pages[2] = [{"id": "C5", "name": "infra"}]
+        time.sleep(0.1)
+        # Stale hits are answered immediately while the rescan runs
+        assert await directory.resolve("#general") == ("C1", None)
+        await directory.refresh_task
+    asyncio.run(scenario())
+    assert directory.lookup("ops") is None
+    assert directory.lookup("infra") == "C5"
+
+def test_channel_directory_returns_errors():
+    async def fetch_page(cursor):
+        return {"ok": False, "error": "ratelimited"}
+    directory = ChannelDirectory(fetch_page)
+    assert asyncio.run(directory.resolve("#general")) == (None, {"ok": False, "error": "ratelimited"})
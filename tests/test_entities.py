@@ -0,0 +1,12 @@
+from slack_mcp.entities import collect_entities
+
+def test_collect_entities_from_messages():
+    messages = [
+        {"user": "U1", "text": "hi <@U2> see <#C9|general> and <#C8>"},
+        {"user": "U3", "reply_users": ["U1", "U4"], "reactions": [{"name": "+1", "users": ["U5"]}]},
+        {"bot_id": "B1", "attachments": [{"text": "ping <@U6|bob>"}]},
+    ]
+    users, channels = collect_entities(messages)
+    assert users == {"U1", "U2", "U3", "U4", "U5", "U6"}
+    assert channels == {"C9", "C8"}
+    assert collect_entities([]) == (set(), set())
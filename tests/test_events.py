@@ -0,0 +1,142 @@
+from slack_mcp.cache import TTLCache
+from slack_mcp.channel_directory import ChannelDirectory
+from slack_mcp.events import EventIngestor, SocketModeConsumer
+from slack_mcp.message_store import HistorySync, MessageStore
+from slack_mcp.rate_limiter import RetryPolicy
+from slack_mcp.user_directory import UserDirectory
+from aiohttp import web
+import asyncio
+import json
+
+USERS = [{"id": "U1", "name": "alice", "real_name": "Alice Smith"}]
+CHANNELS = [{"id": "C1", "name": "general", "num_members": 3}]
+
+def make_ingestor(history_sync=None):
+    async def load_users():
+        return {"ok": True, "members": USERS}
+    async def fetch_channels(cursor):
+        return {"ok": True, "channels": CHANNELS}
+    users, channels = UserDirectory(load_users), ChannelDirectory(fetch_channels)
+    asyncio.run(users.ensure_loaded())
+    channels.merge(CHANNELS)
+    return EventIngestor(users, channels, TTLCache("user_info"), TTLCache("channel_info"), history_sync)
+
+def test_user_and_channel_events_update_directories_and_caches():
+    ingestor = make_ingestor()
+    ingestor.user_info_cache.set("U1", {"ok": True})
+    ingestor.channel_info_cache.set("C1", {"ok": True})
+    assert ingestor.apply({"type": "user_change", "user": {"id": "U1", "name": "alice", "real_name": "Alice Jones", "profile": {"image_512": "x"}}})
+    assert ingestor.apply({"type": "team_join", "user": {"id": "U2", "name": "bob", "real_name": "Bob Brown"}})
+    assert [u["id"] for u in ingestor.user_directory.search("jones")] == ["U1"]
+    assert ingestor.user_directory.get("U1")["profile"] == {}  # projected to the directory fields
+    assert ingestor.user_directory.get("U2")["real_name"] == "Bob Brown"
+    assert ingestor.user_info_cache.get("U1") is None
+
+    assert ingestor.apply({"type": "channel_rename", "channel": {"id": "C1", "name": "town-square", "created": 1}})
+    assert ingestor.channel_directory.lookup("#general") is None
+    assert ingestor.channel_directory.lookup("#town-square") == "C1"
+    assert ingestor.channel_directory.get("C1")["num_members"] == 3  # kept from the earlier listing
+    assert ingestor.channel_info_cache.get("C1") is None
+    assert ingestor.apply({"type": "member_joined_channel", "channel": "C1", "user": "U2"})
+    assert ingestor.apply({"type": "channel_archive", "channel": "C1", "user": "U1"})
+    assert ingestor.channel_directory.get("C1")["num_members"] == 4
+    assert ingestor.channel_directory.get("C1")["is_archived"] is True
+    assert ingestor.apply({"type": "group_created", "channel": {"id": "G1", "name": "secret", "is_private": True}})
+    assert ingestor.channel_directory.lookup("secret") == "G1"
+    assert ingestor.apply({"type": "channel_deleted", "channel": "C1"})
+    assert ingestor.channel_directory.get("C1") is None
+    assert not ingestor.apply({"type": "reaction_added"})
+    assert ingestor.snapshot()["applied"]["user_change"] == 1
+
+def test_message_events_keep_store_current_while_connected():
+    history = [{"ts": "1700000001.000100", "text": "one"}, {"ts": "1700000002.000100", "text": "two"}]
+    calls = []
+    async def fetch_history(params):
+        calls.append(params)
+        return {"ok": True, "messages": list(reversed(history)), "has_more": False}
+    sync = HistorySync(MessageStore(), fetch_history, min_interval=0)
+    ingestor = make_ingestor(sync)
+    new = {"type": "message", "channel": "C1", "ts": "1700000003.000100", "text": "three", "user": "U1", "event_ts": "1700000003.000100"}
+    assert not ingestor.apply(new)  # channel not stored yet
+    ingestor.connected()
+    asyncio.run(sync.read("C1"))
+    assert len(calls) == 1
+    assert ingestor.apply(new)
+    assert ingestor.apply({"type": "message", "channel": "C1", "ts": "1700000003.000200", "thread_ts": "1700000001.000100", "text": "reply"}) is False
+    assert ingestor.apply({"type": "message", "subtype": "message_changed", "channel": "C1", "message": {"ts": "1700000002.000100", "text": "two (edited)"}})
+    assert ingestor.apply({"type": "message", "subtype": "message_deleted", "channel": "C1", "deleted_ts": "1700000001.000100"})
+    res = asyncio.run(sync.read("C1"))
+    assert [m["text"] for m in res["messages"]] == ["three", "two (edited)"]
+    assert "channel" not in res["messages"][0] and "event_ts" not in res["messages"][0]
+    assert len(calls) == 1  # served from the store without polling Slack
+    ingestor.disconnected()
+    asyncio.run(sync.read("C1"))
+    assert len(calls) == 2
+    # Messages arriving after a disconnect are left to the next sync, since earlier ones may have been missed
+    assert not ingestor.apply({**new, "ts": "1700000009.000100"})
+
+def test_socket_mode_consumer_acks_applies_and_reconnects():
+    acks, opened = [], []
+    async def socket(request):
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        await ws.send_str(json.dumps({"type": "hello"}))
+        await ws.send_str(json.dumps({"type": "events_api", "envelope_id": f"e{len(opened)}", "payload": {"event": {"type": "team_join", "user": {"id": f"U{10 + len(opened)}", "name": "new"}}}}))
+        acks.append(json.loads((await ws.receive()).data))
+        await ws.send_str(json.dumps({"type": "disconnect", "reason": "refresh_requested"}))
+        await ws.close()
+        return ws
+    async def scenario():
+        app = web.Application()
+        app.router.add_get("/socket", socket)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        url = f"ws://127.0.0.1:{site._server.sockets[0].getsockname()[1]}/socket"
+        async def open_connection():
+            opened.append(1)
+            return {"ok": True, "url": url}
+        consumer = SocketModeConsumer(open_connection, ingestor, retry=RetryPolicy(base_delay=0.01, max_delay=0.01))
+        consumer.start()
+        while len(acks) < 2:
+            await asyncio.sleep(0.01)
+        await consumer.stop()
+        await runner.cleanup()
+    ingestor = make_ingestor()
+    asyncio.run(scenario())
+    assert acks[:2] == [{"envelope_id": "e1"}, {"envelope_id": "e2"}]
+    assert ingestor.user_directory.get("U11") and ingestor.user_directory.get("U12")
+    assert ingestor.snapshot()["connected"] is False
+
+def test_socket_mode_consumer_survives_unexpected_errors():
+    attempts = []
+    async def socket(request):
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+        await ws.send_str("not json")  # drops this connection, not the consumer
+        await ws.close()
+        return ws
+    async def scenario():
+        app = web.Application()
+        app.router.add_get("/socket", socket)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        url = f"ws://127.0.0.1:{site._server.sockets[0].getsockname()[1]}/socket"
+        async def open_connection():
+            attempts.append(1)
+            if len(attempts) % 2:
+                raise RuntimeError("boom")
+            return {"ok": True, "url": url}
+        consumer = SocketModeConsumer(open_connection, ingestor, retry=RetryPolicy(base_delay=0.0001, max_delay=0.001))
+        task = consumer.start()
+        while len(attempts) < 30:
+            await asyncio.sleep(0.01)
+        alive = not task.done()
+        await consumer.stop()
+        await runner.cleanup()
+        return alive
+    ingestor = make_ingestor()
+    assert asyncio.run(scenario())
@@ -0,0 +1,64 @@
+from slack_mcp.export import ChannelExport
+import asyncio
+import gzip
+import json
+import os
+
+PAGES = {
+    None: {"ok": True, "messages": [{"ts": "4.0", "text": "d"}, {"ts": "3.0", "text": "c", "reply_count": 1}], "response_metadata": {"next_cursor": "p2"}},
+    "p2": {"ok": True, "messages": [{"ts": "2.0", "text": "b"}], "response_metadata": {"next_cursor": "p3"}},
+    "p3": {"ok": True, "messages": [{"ts": "1.0", "text": "a"}]},
+}
+
+def read_lines(path):
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        return [json.loads(line) for line in f]
+
+def test_export_writes_messages_and_replies(tmp_path):
+    async def fetch_page(cursor):
+        return PAGES[cursor]
+    async def fetch_threads(messages):
+        return {m["ts"]: [{"ts": "3.5", "text": "reply"}] for m in messages if m.get("reply_count")}
+    path = str(tmp_path / "out" / "C1.jsonl.gz")
+    res = asyncio.run(ChannelExport("C1", path, fetch_page, fetch_threads).run())
+    assert res["ok"] and not res["resumed"]
+    assert (res["messages"], res["replies"], res["threads"], res["first_ts"], res["last_ts"]) == (4, 1, 1, "1.0", "4.0")
+    assert res["bytes"] == os.path.getsize(path)
+    assert [m["ts"] for m in read_lines(path)] == ["4.0", "3.0", "3.5", "2.0", "1.0"]
+    assert read_lines(path)[2]["parent_ts"] == "3.0"
+    assert not os.path.exists(path + ".checkpoint.json")
+
+def test_export_resumes_from_checkpoint_after_ratelimit(tmp_path):
+    calls = []
+    limited = {"p3"}
+    async def fetch_page(cursor):
+        calls.append(cursor)
+        if cursor in limited:
+            return {"ok": False, "error": "ratelimited", "retry_after": 30}
+        return PAGES[cursor]
+    path = str(tmp_path / "C1.jsonl.gz")
+    first = asyncio.run(ChannelExport("C1", path, fetch_page).run())
+    assert first["error"] == "ratelimited" and first["partial"]["messages"] == 3
+    assert os.path.exists(first["checkpoint"])
+    with open(path, "ab") as f:
+        f.write(b"half-written page")  # lost when the process died before checkpointing
+    limited.clear()
+    calls.clear()
+    second = asyncio.run(ChannelExport("C1", path, fetch_page).run())
+    assert second["ok"] and second["resumed"] and second["messages"] == 4
+    assert calls == ["p3"]
+    assert [m["ts"] for m in read_lines(path)] == ["4.0", "3.0", "2.0", "1.0"]
+    # A different time window does not reuse the checkpoint
+    limited.add("p2")
+    asyncio.run(ChannelExport("C1", path, fetch_page).run())
+    limited.clear()
+    res = asyncio.run(ChannelExport("C1", path, fetch_page, params={"oldest": "2.0"}).run())
+    assert not res["resumed"] and res["messages"] == 4
+
+def test_export_leaves_no_file_when_first_request_fails(tmp_path):
+    async def fetch_page(cursor):
+        return {"ok": False, "error": "channel_not_found"}
+    path = str(tmp_path / "C404.jsonl.gz")
+    res = asyncio.run(ChannelExport("C404", path, fetch_page).run())
+    assert res["error"] == "channel_not_found" and res["path"] is None
+    assert os.listdir(tmp_path) == []
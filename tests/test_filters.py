@@ -0,0 +1,34 @@
+from slack_mcp.filters import compile_filter, filter_cursor, parse_filter_cursor
+import pytest
+
+CHANNELS = [
+    {"id": "C1", "name": "eng-backend", "num_members": 80, "is_private": False, "topic": {"value": "APIs"}},
+    {"id": "C2", "name": "eng-frontend", "num_members": "12", "is_private": True},
+    {"id": "C3", "name": "random", "num_members": 300, "is_private": False, "topic": {"value": ""}},
+]
+
+def matching(filters):
+    predicate = compile_filter(filters)
+    return [c["id"] for c in CHANNELS if predicate(c)]
+
+def test_compile_filter_operators():
+    assert matching({"is_private": False}) == ["C1", "C3"]
+    assert matching({"name": {"startswith": "eng-"}, "num_members": {"gte": 12, "lt": 100}}) == ["C1", "C2"]
+    assert matching({"topic.value": {"exists": True}}) == ["C1", "C3"]
+    assert matching({"topic.value": {"exists": False}}) == ["C2"]
+    assert matching({"topic.value": {"ne": ""}}) == ["C1", "C2"]  # missing fields pass ne
+    assert matching({"id": {"nin": ["C1"]}, "name": {"regex": "^r"}}) == ["C3"]
+    assert matching({}) == ["C1", "C2", "C3"]
+    for bad in ({"name": {"like": "eng"}}, {"id": {"in": "C1"}}, {"name": {"regex": "("}}, ["name"]):
+        with pytest.raises(ValueError):
+            compile_filter(bad)
+
+def test_filter_cursor_round_trip():
+    assert parse_filter_cursor(filter_cursor("dXNlcjpVMDY=", 7)) == ("dXNlcjpVMDY=", 7)
+    assert parse_filter_cursor(filter_cursor("store:1700000000.000100", 3)) == ("store:1700000000.000100", 3)
+    assert parse_filter_cursor(filter_cursor(None, 2)) == (None, 2)
+    assert parse_filter_cursor("dXNlcjpVMDY=") == ("dXNlcjpVMDY=", 0)
+    assert parse_filter_cursor(None) == (None, 0)
+    for bad in ("filter:abc:x", "filter:", "filter:-1:x"):
+        with pytest.raises(ValueError):
+            parse_filter_cursor(bad)
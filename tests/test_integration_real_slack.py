@@ -4,6 +4,7 @@ Requires a valid SLACK_BOT_TOKEN in a .env file in the project root.
 
 This test will check if a user named 'John Smith' exists in the Slack workspace.
 """
+import asyncio
 import os
 from dotenv import load_dotenv
 load_dotenv()  # Ensure .env is loaded before importing main
@@ -26,7 +27,7 @@ def test_find_john_smith():
     cursor = None
     # Paginate through all users
     while True:
-        res = main.get_users(cursor=cursor)
+        res = asyncio.run(main.get_users(cursor=cursor))
         if res.get("error") and "ratelimited" in res["error"]:
             pytest.skip("Slack API rate limit reached; try again later.")
         assert res.get("ok"), f"Slack API error: {res.get('error', res)}"
@@ -44,7 +45,7 @@ def test_find_joe():
     """
     Test that at least one user with 'Joe' in their name exists in the Slack workspace.
     """
-    res = main.find_users_by_name("Joe")
+    res = asyncio.run(main.find_users_by_name("Joe"))
     if res.get("error") and "ratelimited" in res["error"]:
         pytest.skip("Slack API rate limit reached; try again later.")
     assert res.get("ok"), f"Slack API error: {res.get('error', res)}"
@@ -59,7 +60,7 @@ def test_send_message_to_john_smith():
     Find John Smith and send a test message to him. Skip if not found or on rate limit.
     """
     # Find John Smith's user ID
-    res = main.find_users_by_name("John Smith")
+    res = asyncio.run(main.find_users_by_name("John Smith"))
     if res.get("error") and "ratelimited" in res["error"]:
         pytest.skip("Slack API rate limit reached; try again later.")
     assert res.get("ok"), f"Slack API error: {res.get('error', res)}"
@@ -68,7 +69,7 @@ def test_send_message_to_john_smith():
         pytest.skip("User 'John Smith' not found in Slack workspace.")
     user_id = johns[0]["id"]
     # Send a test message via direct message
-    send_res = main.send_message(channel=user_id, text="Hello from automated test!")
+    send_res = asyncio.run(main.send_message(channel=user_id, text="Hello from automated test!"))
     if send_res.get("error") and "ratelimited" in send_res["error"]:
         pytest.skip("Slack API rate limit reached; try again later.")
     print(f"send_message result: {send_res}")
@@ -86,7 +87,7 @@ def test_get_channels():
     cursor = None
     all_channels = []
     while True:
-        res = main.get_channels(cursor=cursor)
+        res = asyncio.run(main.get_channels(cursor=cursor))
         if res.get("error") and "ratelimited" in res["error"]:
             pytest.skip("Slack API rate limit reached; try again later.")
         assert res.get("ok"), f"Slack API error: {res.get('error', res)}"
@@ -121,7 +122,7 @@ def test_last_message_from_general_channel():
     target_users = ["John Smith", "Joe", "Admin"]
     
     # Step 1: Find the general channel
-    channels_res = main.get_channels()
+    channels_res = asyncio.run(main.get_channels())
     if channels_res.get("error") and "ratelimited" in channels_res["error"]:
         pytest.skip("Slack API rate limit reached; try again later.")
     assert channels_res.get("ok"), f"Slack API error: {channels_res.get('error', channels_res)}"
@@ -139,7 +140,7 @@ def test_last_message_from_general_channel():
     # Step 2: First try to join the channel to ensure we have access
     try:
         print(f"Attempting to join the general channel...")
-        join_res = main.slack_client.conversations_join(channel=general_channel_id)
+        join_res = asyncio.run(main.slack_client.conversations_join(channel=general_channel_id))
         if join_res["ok"]:
             print(f"Successfully joined the general channel or already a member")
         else:
@@ -152,7 +153,7 @@ def test_last_message_from_general_channel():
             print("Bot is already in the channel")
     
     # Now try to get messages
-    messages_res = main.read_channel_messages(channel=general_channel_id, limit=1)
+    messages_res = asyncio.run(main.read_channel_messages(channel=general_channel_id, limit=1))
     
     if messages_res.get("error") and "ratelimited" in messages_res["error"]:
         pytest.skip("Slack API rate limit reached; try again later.")
@@ -175,7 +176,7 @@ def test_last_message_from_general_channel():
     users = []
     cursor = None
     while True:
-        users_res = main.get_users(cursor=cursor)
+        users_res = asyncio.run(main.get_users(cursor=cursor))
         if users_res.get("error") and "ratelimited" in users_res["error"]:
             pytest.skip("Slack API rate limit reached; try again later.")
         assert users_res.get("ok"), f"Slack API error: {users_res.get('error', users_res)}"
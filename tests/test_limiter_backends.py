@@ -0,0 +1,87 @@
+from slack_mcp.limiter_backends import LimiterBackend, LocalBackend, SQLiteBackend, make_backend
+from slack_mcp.rate_limiter import SlackRateLimiter
+import asyncio
+import os
+import pytest
+import time
+
+def test_sqlite_backend_shares_budget_between_limiters(tmp_path):
+    path = str(tmp_path / "limits.db")
+    # Two limiters on one file stand in for two server processes
+    a = SlackRateLimiter(max_queue_wait=0, limits={"users_list": (1.0, 2.0)}, backend=SQLiteBackend(path))
+    b = SlackRateLimiter(max_queue_wait=0, limits={"users_list": (1.0, 2.0)}, backend=SQLiteBackend(path))
+    assert a.reserve("users_list") == (True, 0.0)
+    assert b.reserve("users_list") == (True, 0.0)
+    granted, wait = a.reserve("users_list")
+    assert not granted and 0 < wait <= 1.0
+    granted, _ = b.reserve("users_list")
+    assert not granted
+
+def test_sqlite_backend_shares_retry_after(tmp_path):
+    path = str(tmp_path / "limits.db")
+    a = SlackRateLimiter(backend=SQLiteBackend(path))
+    b = SlackRateLimiter(backend=SQLiteBackend(path), max_queue_wait=1)  # refused rather than queued through the shared penalty
+    res = a.wrap("chat_postMessage", lambda: {"error": "ratelimited", "retry_after": 5})
+    assert res["error"] == "ratelimited"
+    called = []
+    res = b.wrap("chat_postMessage", lambda: called.append(1) or {"ok": True})
+    assert res["error"] == "ratelimited" and not called
+    assert 4 <= b.is_rate_limited("chat_postMessage") <= 5
+
+def test_sqlite_backend_namespaces_are_separate(tmp_path):
+    path = str(tmp_path / "limits.db")
+    a = SQLiteBackend(path, namespace="tokenA:")
+    b = SQLiteBackend(path, namespace="tokenB:")
+    a.set_deadline("users_list", time.time() + 60)
+    assert b.get_deadline("users_list") is None
+    assert a.reserve([("users_list", 1.0, 1.0)], 0) == (True, 0.0)
+    assert b.reserve([("users_list", 1.0, 1.0)], 0) == (True, 0.0)
+
+def test_make_backend(tmp_path):
+    assert isinstance(make_backend(None), LocalBackend)
+    assert isinstance(make_backend("local"), LocalBackend)
+    assert isinstance(make_backend(f"sqlite://{tmp_path}/limits.db"), SQLiteBackend)
+    with pytest.raises(ValueError):
+        make_backend("memcached://localhost")
+
+@pytest.mark.skipif(not os.getenv("SLACK_TEST_REDIS_URL"), reason="SLACK_TEST_REDIS_URL not set.")
+def test_redis_backend_shares_budget():
+    import uuid
+    namespace = uuid.uuid4().hex + ":"
+    a = SlackRateLimiter(max_queue_wait=0, limits={"users_list": (1.0, 1.0)}, backend=make_backend(os.environ["SLACK_TEST_REDIS_URL"], namespace))
+    b = SlackRateLimiter(max_queue_wait=0, limits={"users_list": (1.0, 1.0)}, backend=make_backend(os.environ["SLACK_TEST_REDIS_URL"], namespace))
+    assert a.reserve("users_list") == (True, 0.0)
+    assert not b.reserve("users_list")[0]
+    a.set_rate_limit("chat_postMessage", 5)
+    assert b.is_rate_limited("chat_postMessage")
+
+def test_reserve_waits_out_retry_after_deadline(tmp_path):
+    for backend in (LocalBackend(), SQLiteBackend(str(tmp_path / "limits.db"))):
+        backend.set_deadline("users_list", time.time() + 2)
+        granted, wait = backend.reserve([("users_list", 1.0, 5.0)], 1.0, "users_list")
+        assert not granted and 1.5 < wait <= 2
+        granted, wait = backend.reserve([("users_list", 1.0, 5.0)], 5.0, "users_list")
+        assert granted and 1.5 < wait <= 2
+        assert backend.reserve([("users_info", 1.0, 5.0)], 0, "users_info") == (True, 0.0)
+
+def test_limiter_backend_is_abstract():
+    with pytest.raises(TypeError):
+        LimiterBackend()
+
+def test_blocking_backend_runs_off_the_event_loop():
+    class SlowBackend(LocalBackend):
+        blocking = True
+        def reserve(self, specs, max_wait, deadline=None):
+            time.sleep(0.3)  # e.g. waiting on another process's SQLite lock
+            return super().reserve(specs, max_wait, deadline)
+    rl = SlackRateLimiter(backend=SlowBackend())
+    async def scenario():
+        ticks = []
+        async def tick():
+            for _ in range(5):
+                ticks.append(time.time())
+                await asyncio.sleep(0.02)
+        await asyncio.gather(rl.wrap_async("users_list", asyncio.sleep, 0, {"ok": True}), tick())
+        return ticks
+    ticks = asyncio.run(scenario())
+    assert ticks[-1] - ticks[0] < 0.25  # the loop kept running while the backend blocked
@@ -0,0 +1,65 @@
+from slack_mcp.local_search import parse_query, search_local
+from slack_mcp.message_store import MessageStore
+
+def make_store():
+    store = MessageStore()
+    store.add_messages("C1", [
+        {"ts": "1704067200.000100", "user": "U1", "text": "deploy failed on staging"},
+        {"ts": "1704153600.000100", "user": "U2", "text": "deploy succeeded after the rollback"},
+        {"ts": "1704240000.000100", "user": "U1", "text": "lunch?"},
+    ])
+    store.add_messages("C2", [{"ts": "1704067300.000100", "user": "U2", "text": "staging deploy deploy deploy"}])
+    store.set_sync_state("C1", "1704067200.000100", "1704240000.000100", True)
+    store.set_sync_state("C2", "1704067300.000100", "1704067300.000100", True)
+    return store
+
+def test_parse_query_modifiers():
+    parsed = parse_query('in:<#C1|general> from:@alice "error rate" after:2024-01-01 before:2024-02-01 spike')
+    assert parsed["terms"] == ["error rate", "spike"]
+    assert parsed["channels"] == ["C1"] and parsed["users"] == ["alice"]
+    assert parsed["after"] == "1704153599.999999" and parsed["before"] == "1706745600"
+
+def test_search_local_ranking_filters_and_highlights():
+    store = make_store()
+    res = search_local(store, "deploy in:C1 in:C2")
+    assert res["ok"] and res["messages"]["total"] == 3
+    assert res["scope"] == {"channels": ["C1", "C2"], "thread_replies": False}
+    matches = res["messages"]["matches"]
+    assert matches[0]["channel"]["id"] == "C2"  # most occurrences ranks first
+    assert "deploy" in matches[0]["highlights"][0]
+    res = search_local(store, "deploy in:C1 from:U1")
+    assert [m["text"] for m in res["messages"]["matches"]] == ["deploy failed on staging"]
+    res = search_local(store, "deploy in:C1 in:C2 on:2024-01-02", sort="timestamp")
+    assert [m["ts"] for m in res["messages"]["matches"]] == ["1704153600.000100"]
+    res = search_local(store, "in:C1", sort="timestamp", sort_dir="asc", count=2, page=2)
+    assert [m["text"] for m in res["messages"]["matches"]] == ["lunch?"]
+    assert res["messages"]["paging"] == {"count": 2, "total": 3, "page": 2, "pages": 2}
+
+def test_search_local_updates_index_on_refetch():
+    store = make_store()
+    store.add_messages("C1", [{"ts": "1704240000.000100", "user": "U1", "text": "dinner?"}])
+    assert search_local(store, "lunch in:C1")["messages"]["total"] == 0
+    assert search_local(store, "dinner in:C1")["messages"]["total"] == 1
+
+def test_search_local_falls_back_for_unindexed_channels():
+    store = make_store()
+    assert search_local(store, "deploy in:C9") is None
+    assert search_local(store, "deploy in:#general") is None
+    assert search_local(store, "deploy in:#general", resolve_channel=lambda name: "C1")["messages"]["total"] == 2
+    assert search_local(store, "deploy in:C1 from:@bob") is None
+
+def test_search_local_falls_back_unless_every_channel_is_fully_synced():
+    store = make_store()
+    assert search_local(store, "deploy") is None  # could match channels that were never synced
+    store.set_sync_state("C3", "1704067200.000100", "1704240000.000100", False)  # only a recent window was read
+    store.add_messages("C3", [{"ts": "1704067200.000200", "user": "U1", "text": "deploy"}])
+    assert search_local(store, "deploy in:C3") is None
+    assert search_local(store, "deploy in:C1 in:C3") is None
+    assert search_local(store, "deploy in:C1")["messages"]["total"] == 2
+
+def test_search_local_falls_back_for_unsupported_modifiers():
+    store = make_store()
+    assert parse_query("deploy after:yesterday during:march")["unsupported"] == ["after:yesterday", "during:march"]
+    for query in ("deploy after:yesterday", "deploy during:march", "deploy has:link", "is:thread deploy"):
+        assert search_local(store, query + " in:C1") is None
+    assert search_local(store, "error:timeout in:C1")["messages"]["total"] == 0  # not a Slack modifier, searched as text
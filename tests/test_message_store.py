@@ -0,0 +1,85 @@
+from slack_mcp.message_store import HistorySync, MessageStore, ts_key
+import asyncio
+
+class FakeHistory:
+    """
+    Mimics conversations.history paging over an in-memory channel.
+    """
+    def __init__(self, count):
+        self.messages = [{"ts": f"{1700000000 + i}.000100", "text": f"m{i}", "user": "U1"} for i in range(count)]
+        self.calls = []
+
+    def post(self, text):
+        self.messages.append({"ts": f"{1700000000 + len(self.messages)}.000100", "text": text, "user": "U2"})
+
+    async def __call__(self, params):
+        self.calls.append(dict(params))
+        inclusive = params.get("inclusive", False)
+        def in_window(m):
+            key = ts_key(m["ts"])
+            if "oldest" in params and (key < ts_key(params["oldest"]) or (key == ts_key(params["oldest"]) and not inclusive)):
+                return False
+            if "latest" in params and (key > ts_key(params["latest"]) or (key == ts_key(params["latest"]) and not inclusive)):
+                return False
+            return True
+        window = sorted(filter(in_window, self.messages), key=lambda m: ts_key(m["ts"]), reverse=True)
+        start = int(params.get("cursor") or 0)
+        page = window[start:start + params["limit"]]
+        more = start + params["limit"] < len(window)
+        return {"ok": True, "messages": page, "has_more": more, "response_metadata": {"next_cursor": str(start + params["limit"]) if more else ""}}
+
+def make_sync(count, min_interval=0.0):
+    fake = FakeHistory(count)
+    return fake, HistorySync(MessageStore(), fake, min_interval=min_interval)
+
+def test_history_sync_first_read_fetches_only_what_is_needed():
+    fake, sync = make_sync(1000)
+    res = asyncio.run(sync.read("C1", limit=50))
+    assert [m["text"] for m in res["messages"]] == [f"m{i}" for i in range(999, 949, -1)]
+    assert res["has_more"] and res["response_metadata"]["next_cursor"] == "store:1700000950.000100"
+    assert len(fake.calls) == 1
+    state = sync.store.sync_state("C1")
+    assert state["latest_ts"] == "1700000999.000100" and not state["complete"]
+
+def test_history_sync_incremental_and_local_reads():
+    fake, sync = make_sync(300)
+    asyncio.run(sync.read("C1", limit=100))
+    fake.calls.clear()
+    fake.post("new")
+    res = asyncio.run(sync.read("C1", limit=2))
+    assert [m["text"] for m in res["messages"]] == ["new", "m299"]
+    assert len(fake.calls) == 1 and fake.calls[0]["oldest"] == "1700000299.000100"
+    # A time window already covered by the store is served without Slack
+    fake.calls.clear()
+    res = asyncio.run(sync.read("C1", oldest="1700000250", latest="1700000260"))
+    assert [m["text"] for m in res["messages"]] == [f"m{i}" for i in range(259, 249, -1)]
+    assert fake.calls == []
+
+def test_history_sync_backfills_older_windows_and_pages_with_store_cursor():
+    fake, sync = make_sync(500)
+    first = asyncio.run(sync.read("C1", limit=10))
+    res = asyncio.run(sync.read("C1", limit=10, oldest="1700000005", latest="1700000010"))
+    assert [m["text"] for m in res["messages"]] == ["m9", "m8", "m7", "m6", "m5"]
+    seen = [m["text"] for m in first["messages"]]
+    cursor = first["response_metadata"]["next_cursor"]
+    while cursor:
+        page = asyncio.run(sync.read("C1", limit=100, cursor=cursor))
+        seen += [m["text"] for m in page["messages"]]
+        cursor = page["response_metadata"]["next_cursor"]
+    assert seen == [f"m{i}" for i in range(499, -1, -1)]
+    assert sync.store.sync_state("C1")["complete"]
+
+def test_history_sync_serves_fresh_reads_without_slack():
+    fake, sync = make_sync(20, min_interval=60)
+    asyncio.run(sync.read("C1"))
+    fake.calls.clear()
+    res = asyncio.run(sync.read("C1", limit=5))
+    assert len(res["messages"]) == 5 and res["source"] == "store"
+    assert fake.calls == []
+
+def test_history_sync_errors():
+    async def fail(params):
+        return {"ok": False, "error": "channel_not_found"}
+    sync = HistorySync(MessageStore(), fail)
+    assert asyncio.run(sync.read("C404"))["error"] == "channel_not_found"
+    assert sync.store.sync_state("C404") is None
@@ -0,0 +1,63 @@
+from slack_mcp.message_stream import MessageStream, StreamRegistry
+import asyncio
+
+def test_message_stream_buffer_is_bounded():
+    fetched = []
+    async def fetch_page(cursor):
+        page = int(cursor or 0)
+        fetched.append(page)
+        return {"ok": True, "messages": [{"ts": f"{100 - page}.{i}"} for i in range(10)], "response_metadata": {"next_cursor": str(page + 1) if page < 9 else ""}}
+    async def scenario():
+        stream = MessageStream(fetch_page, buffer_size=20)
+        stream.start()
+        first = await stream.next_chunk(5)
+        await asyncio.sleep(0.01)
+        # Producer pauses once the buffer holds buffer_size messages
+        assert len(fetched) == 3 and len(stream.buffer) == 25
+        await asyncio.sleep(0.01)
+        assert len(fetched) == 3
+        rest = []
+        while not stream.exhausted:
+            rest += await stream.next_chunk(7)
+        return first, rest, stream
+    first, rest, stream = asyncio.run(scenario())
+    assert len(first) + len(rest) == 100
+    assert stream.progress()["pages_fetched"] == 10 and stream.progress()["oldest_ts"] == "91.0"
+
+def test_message_stream_chunk_larger_than_buffer():
+    async def fetch_page(cursor):
+        page = int(cursor or 0)
+        return {"ok": True, "messages": [{"ts": f"{100 - page}.{i}"} for i in range(10)], "response_metadata": {"next_cursor": str(page + 1) if page < 9 else ""}}
+    async def scenario():
+        stream = MessageStream(fetch_page, buffer_size=20)
+        stream.start()
+        return await asyncio.wait_for(stream.next_chunk(50), timeout=5)
+    assert len(asyncio.run(scenario())) == 20
+
+def test_message_stream_waits_out_rate_limits():
+    responses = [{"error": "ratelimited", "retry_after": 0}, {"ok": True, "messages": [{"ts": "1.0"}]}]
+    async def fetch_page(cursor):
+        return responses.pop(0)
+    async def scenario():
+        stream = MessageStream(fetch_page)
+        stream.start()
+        return await stream.next_chunk(10), stream
+    chunk, stream = asyncio.run(scenario())
+    assert chunk == [{"ts": "1.0"}] and stream.exhausted and stream.error is None
+
+def test_stream_registry_evicts_idle_and_excess_streams():
+    registry = StreamRegistry(ttl=60, max_streams=2)
+    class Stub:
+        cancelled = False
+        def cancel(self):
+            self.cancelled = True
+    a, b, c = Stub(), Stub(), Stub()
+    token_a = registry.add(a)
+    token_b = registry.add(b)
+    registry.get(token_a)
+    registry.last_used[token_b] -= 1
+    token_c = registry.add(c)
+    assert b.cancelled and registry.get(token_b) is None
+    assert registry.get(token_a) is a and registry.get(token_c) is c
+    registry.last_used[token_a] -= 120
+    assert registry.get(token_a) is None and a.cancelled
@@ -0,0 +1,48 @@
+from slack_mcp.metrics import Histogram, Metrics, serve_metrics
+import urllib.request
+
+def test_histogram_buckets_and_quantiles():
+    hist = Histogram(buckets=(0.1, 1.0, 10.0))
+    for value in [0.05, 0.05, 0.5, 5.0]:
+        hist.observe(value)
+    assert hist.cumulative() == [2, 3, 4]
+    assert hist.quantile(0.5) == 0.1
+    assert hist.quantile(0.75) == 1.0
+    assert hist.quantile(0.99) == 10.0
+    assert Histogram().quantile(0.5) is None
+
+def test_metrics_snapshot_and_cache_hit_rate():
+    metrics = Metrics()
+    metrics.record_call("users_list", "ok", 0.2, payload_bytes=100)
+    metrics.record_call("users_list", "ratelimited", 0.1)
+    metrics.record_ratelimited("users_list", 30, "slack")
+    metrics.record_queue_wait("users_list", 1.5)
+    metrics.record_cache("user_directory", False)
+    for _ in range(3):
+        metrics.record_cache("user_directory", True)
+    snap = metrics.snapshot()
+    users = snap["methods"]["users_list"]
+    assert users["calls"] == {"ok": 1, "ratelimited": 1}
+    assert users["latency_seconds"]["count"] == 2
+    assert users["ratelimited"] == {"slack": 1}
+    assert users["retry_after_seconds_total"] == 30
+    assert users["queue_wait_seconds_total"] == 1.5
+    assert users["payload_bytes_total"] == 100
+    assert snap["caches"]["user_directory"] == {"hits": 3, "misses": 1, "hit_rate": 0.75}
+
+def test_metrics_prometheus_endpoint():
+    metrics = Metrics()
+    metrics.record_call("chat_postMessage", "ok", 0.03, payload_bytes=42)
+    httpd = serve_metrics(metrics, 0)
+    try:
+        port = httpd.server_address[1]
+        with urllib.request.urlopen(f"http://127.0.0.1:{port}/metrics") as resp:
+            body = resp.read().decode()
+    finally:
+        httpd.shutdown()
+        httpd.server_close()
+    assert '# TYPE slack_api_latency_seconds histogram' in body
+    assert 'slack_api_calls_total{method="chat_postMessage",outcome="ok"} 1' in body
+    assert 'slack_api_latency_seconds_bucket{method="chat_postMessage",le="0.05"} 1' in body
+    assert 'slack_api_latency_seconds_count{method="chat_postMessage"} 1' in body
+    assert 'slack_api_payload_bytes_total{method="chat_postMessage"} 42' in body
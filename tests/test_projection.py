@@ -0,0 +1,26 @@
+from slack_mcp.projection import project_items, project_response
+
+USER = {
+    "id": "U1", "name": "alice", "real_name": "Alice", "color": "9f69e7", "is_bot": False,
+    "profile": {"display_name": "ally", "email": "a@example.com", "image_512": "https://...", "fields": {"Xf": {"value": "x"}}},
+}
+MESSAGE = {
+    "ts": "1.0", "user": "U1", "text": "hi", "blocks": [{"type": "rich_text"}],
+    "reactions": [{"name": "tada", "count": 2, "users": ["U2", "U3"]}],
+}
+
+def test_project_items_compact_default():
+    [user] = project_items([USER], "user")
+    assert user == {"id": "U1", "name": "alice", "real_name": "Alice", "is_bot": False, "profile": {"display_name": "ally", "email": "a@example.com"}}
+    [message] = project_items([MESSAGE], "message")
+    assert message == {"ts": "1.0", "user": "U1", "text": "hi", "reactions": [{"name": "tada", "count": 2}]}
+
+def test_project_items_explicit_fields_and_raw():
+    assert project_items([USER], "user", ["id", "profile.fields", "profile", "missing.path"]) == [{"id": "U1", "profile": USER["profile"]}]
+    assert project_items([USER], "user", ["*"])[0] is USER
+
+def test_project_response_nested_path_and_errors():
+    res = project_response({"ok": True, "messages": {"matches": [dict(MESSAGE, permalink="p")]}}, "messages.matches", "search_match", ["text"])
+    assert res["messages"]["matches"] == [{"text": "hi"}]
+    error = {"error": "ratelimited", "retry_after": 3}
+    assert project_response(dict(error), "members", "user") == error
@@ -1,8 +1,11 @@
-from slack_mcp.rate_limiter import SlackRateLimiter
+from slack_mcp.metrics import Metrics
+from slack_mcp.rate_limiter import RetryPolicy, SlackRateLimiter
+import asyncio
+import pytest
 import time
 
 def test_rate_limiter_blocks_and_eta():
-    rl = SlackRateLimiter()
+    rl = SlackRateLimiter(max_queue_wait=1)  # shorter than the penalty below, so callers are refused rather than queued
     method = "chat_postMessage"
 
     # First call should go through
@@ -49,3 +52,168 @@ def test_rate_limiter_blocks_and_eta():
     assert result5["error"] == "ratelimited"
     assert result5["retry_after"] == 1
     assert "eta" in result5 and result5["eta"]
+
+def test_rate_limiter_paces_and_queues_fifo():
+    import threading
+    rl = SlackRateLimiter(limits={"users_list": (20.0, 2.0)})
+    order = []
+    lock = threading.Lock()
+    def worker(i):
+        def f():
+            with lock:
+                order.append(i)
+            return {"ok": True}
+        assert rl.wrap("users_list", f)["ok"]
+    start = time.time()
+    threads = []
+    for i in range(6):
+        t = threading.Thread(target=worker, args=(i,))
+        t.start()
+        threads.append(t)
+        time.sleep(0.005)
+    for t in threads:
+        t.join()
+    # Burst of 2, then 4 more calls at 20/s
+    assert time.time() - start >= 0.18
+    assert order == list(range(6))
+
+def test_rate_limiter_queue_wait_budget():
+    rl = SlackRateLimiter(max_queue_wait=0.5, limits={"users_list": (1.0, 1.0)})
+    assert rl.wrap("users_list", lambda: {"ok": True})["ok"]
+    called = []
+    res = rl.wrap("users_list", lambda: called.append(1))
+    assert res["error"] == "ratelimited" and res["retry_after"] == 1 and res["eta"]
+    assert called == []
+
+def test_rate_limiter_tier_budgets_and_channel_buckets():
+    rl = SlackRateLimiter()
+    assert rl.limit_for("users_list") == (20 / 60.0, 20.0)
+    assert rl.limit_for("users_profile_get") == (100 / 60.0, 100.0)
+    for _ in range(3):
+        assert rl.reserve("chat_postMessage", key="C1") == (True, 0.0)
+    granted, wait = rl.reserve("chat_postMessage", key="C1")
+    assert granted and 0.9 < wait <= 1.0
+    # Other channels have their own budget
+    assert rl.reserve("chat_postMessage", key="C2") == (True, 0.0)
+
+def test_rate_limiter_ratelimited_without_retry_after_uses_refill_interval():
+    rl = SlackRateLimiter(limits={"users_list": (0.5, 5.0)})
+    res = rl.wrap("users_list", lambda: {"error": "ratelimited"})
+    assert res["retry_after"] == 2
+
+def test_rate_limiter_wrap_async_overlaps_methods():
+    import asyncio
+    rl = SlackRateLimiter(limits={"users_list": (5.0, 1.0), "conversations_list": (5.0, 1.0)})
+    async def call():
+        await asyncio.sleep(0.1)
+        return {"ok": True}
+    async def scenario():
+        start = time.time()
+        results = await asyncio.gather(rl.wrap_async("users_list", call), rl.wrap_async("conversations_list", call))
+        return results, time.time() - start
+    results, elapsed = asyncio.run(scenario())
+    assert all(r["ok"] for r in results)
+    assert elapsed < 0.19
+    # A queued caller awaits its slot instead of failing
+    async def queued():
+        await rl.wrap_async("users_list", call)
+        start = time.time()
+        res = await rl.wrap_async("users_list", call)
+        return res, time.time() - start
+    res, elapsed = asyncio.run(queued())
+    assert res["ok"] and elapsed >= 0.15
+
+def test_wrap_records_metrics():
+    metrics = Metrics()
+    limiter = SlackRateLimiter(metrics=metrics, max_queue_wait=1)
+    class Response:  # a slack_sdk response: data plus HTTP headers
+        data = {"ok": True}
+        headers = {"Content-Length": "1234"}
+    assert limiter.wrap("users_list", Response) == {"ok": True}
+    limiter.wrap("users_list", lambda: {"ok": False, "error": "invalid_auth"})
+    limiter.wrap("users_list", lambda: {"error": "ratelimited", "retry_after": 5})
+    # Refused locally while the Retry-After penalty is in force
+    limiter.wrap("users_list", lambda: {"ok": True})
+    users = metrics.snapshot()["methods"]["users_list"]
+    assert users["calls"] == {"error": 1, "ok": 1, "ratelimited": 1}
+    assert users["ratelimited"] == {"local": 1, "slack": 1}
+    assert users["payload_bytes_total"] == 1234  # plain dicts carry no size
+
+def test_wrap_retries_ratelimited_until_success():
+    rl = SlackRateLimiter(retry=RetryPolicy(max_wait=5.0, jitter=0.0))
+    responses = [{"error": "ratelimited", "retry_after": 0.2}, {"ok": True}]
+    start = time.time()
+    result = rl.wrap("users_list", lambda: responses.pop(0))
+    assert result == {"ok": True}
+    assert 0.2 <= time.time() - start < 1.0
+
+def test_wrap_retries_transient_errors_with_backoff():
+    metrics = Metrics()
+    rl = SlackRateLimiter(metrics=metrics, retry=RetryPolicy(max_wait=5.0, base_delay=0.05, jitter=0.0))
+    calls = []
+    def flaky():
+        calls.append(time.time())
+        if len(calls) == 1:
+            raise ConnectionError("reset")
+        if len(calls) == 2:
+            return {"ok": False, "error": "internal_error"}
+        return {"ok": True}
+    assert rl.wrap("users_list", flaky) == {"ok": True}
+    assert calls[1] - calls[0] >= 0.05 and calls[2] - calls[1] >= 0.1  # exponential backoff
+    assert metrics.snapshot()["methods"]["users_list"]["retries"] == 2
+
+def test_wrap_surfaces_error_when_retry_budget_exhausted():
+    rl = SlackRateLimiter(retry=RetryPolicy(max_wait=1.0))
+    # Retry-After beyond the budget is surfaced immediately
+    result = rl.wrap("users_list", lambda: {"error": "ratelimited", "retry_after": 10})
+    assert result["error"] == "ratelimited" and result["retry_after"] == 10
+    # Non-transient errors are never retried
+    calls = []
+    def bad():
+        calls.append(1)
+        raise ValueError("bad request")
+    with pytest.raises(ValueError):
+        rl.wrap("conversations_info", bad)
+    assert calls == [1]
+    # Transient failures stop after max_attempts
+    rl = SlackRateLimiter(retry=RetryPolicy(max_wait=5.0, max_attempts=3, base_delay=0.01))
+    calls.clear()
+    assert rl.wrap("conversations_info", lambda: calls.append(1) or {"ok": False, "error": "service_unavailable"})["error"] == "service_unavailable"
+    assert len(calls) == 3
+
+def test_wrap_does_not_resend_writes_after_transient_failures():
+    rl = SlackRateLimiter(retry=RetryPolicy(max_wait=5.0, base_delay=0.01))
+    calls = []
+    async def post():
+        calls.append(1)
+        raise asyncio.TimeoutError()  # Slack may have posted the message anyway
+    with pytest.raises(asyncio.TimeoutError):
+        asyncio.run(rl.wrap_async("chat_postMessage", post))
+    assert calls == [1]
+    assert rl.wrap("chat_update", lambda: calls.append(1) or {"ok": False, "error": "internal_error"})["error"] == "internal_error"
+    assert calls == [1, 1]
+    # A ratelimited write was never applied, so it is still retried
+    responses = [{"error": "ratelimited", "retry_after": 0.05}, {"ok": True}]
+    assert rl.wrap("conversations_create", lambda: responses.pop(0)) == {"ok": True}
+
+def test_wrap_async_retries_per_method_policy():
+    rl = SlackRateLimiter(retry_policies={"chat_postMessage": RetryPolicy(max_wait=2.0, base_delay=0.01)})
+    responses = [{"ok": False, "error": "fatal_error"}, {"ok": True}]
+    async def call():
+        return responses.pop(0)
+    assert asyncio.run(rl.wrap_async("chat_postMessage", call)) == {"ok": True}
+    # Methods without a policy surface errors immediately
+    assert rl.wrap("users_list", lambda: {"ok": False, "error": "fatal_error"})["error"] == "fatal_error"
+
+def test_callers_queue_through_retry_after_penalty():
+    metrics = Metrics()
+    rl = SlackRateLimiter(max_queue_wait=5, metrics=metrics)
+    rl.wrap("users_list", lambda: {"error": "ratelimited", "retry_after": 0.3})
+    async def scenario():
+        start = time.time()
+        results = await asyncio.gather(*(rl.wrap_async("users_list", asyncio.sleep, 0, {"ok": True}) for _ in range(2)))
+        return results, time.time() - start
+    results, elapsed = asyncio.run(scenario())
+    assert all(res["ok"] for res in results)
+    assert elapsed >= 0.25
+    assert metrics.snapshot()["methods"]["users_list"]["ratelimited"] == {"slack": 1}
@@ -0,0 +1,49 @@
+from slack_mcp.metrics import Metrics
+from slack_mcp.single_flight import SingleFlight, request_key
+import asyncio
+import pytest
+
+def test_request_key_normalizes_params():
+    assert request_key("users_list", {"limit": 10, "cursor": None}) == request_key("users_list", {"limit": 10})
+    assert request_key("users_list", {"a": 1, "b": 2}) == request_key("users_list", {"b": 2, "a": 1})
+    assert request_key("users_list", {"limit": 10}) != request_key("conversations_list", {"limit": 10})
+
+def test_single_flight_shares_concurrent_calls():
+    metrics = Metrics()
+    flight = SingleFlight(metrics=metrics)
+    calls = []
+    async def fetch():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return {"ok": True, "members": [{"id": "U1"}]}
+    async def scenario():
+        return await asyncio.gather(*(flight.do("k", fetch) for _ in range(5)))
+    results = asyncio.run(scenario())
+    assert calls == [1]
+    assert all(r == {"ok": True, "members": [{"id": "U1"}]} for r in results)
+    # Shared results are independent copies
+    results[0]["members"].clear()
+    assert results[1]["members"] == [{"id": "U1"}]
+    assert metrics.snapshot()["caches"]["single_flight"] == {"hits": 4, "misses": 1, "hit_rate": 0.8}
+    # Completed calls are not cached
+    asyncio.run(flight.do("k", fetch))
+    assert calls == [1, 1]
+    assert flight.calls == {}
+
+def test_single_flight_shares_errors_and_survives_cancelled_caller():
+    flight = SingleFlight()
+    calls = []
+    async def fail():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        raise RuntimeError("boom")
+    async def scenario():
+        first = asyncio.ensure_future(flight.do("k", fail))
+        await asyncio.sleep(0)
+        second = asyncio.ensure_future(flight.do("k", fail))
+        await asyncio.sleep(0)
+        first.cancel()
+        with pytest.raises(RuntimeError):
+            await second
+    asyncio.run(scenario())
+    assert calls == [1]
@@ -0,0 +1,55 @@
+from slack_mcp.channel_directory import ChannelDirectory
+from slack_mcp.snapshot import load_snapshot, pack_rows, save_snapshot, unpack_rows
+from slack_mcp.user_directory import UserDirectory
+import asyncio
+import gzip
+import os
+import subprocess
+import sys
+
+def test_snapshot_round_trip(tmp_path):
+    path = str(tmp_path / "directory.json.gz")
+    assert load_snapshot(path) is None
+    save_snapshot(path, [{"id": "U1", "name": "alice"}], 100.0, [{"id": "C1", "name": "general"}], 200.0)
+    snapshot = load_snapshot(path)
+    assert snapshot["users"] == [{"id": "U1", "name": "alice"}] and snapshot["users_loaded_at"] == 100.0
+    assert snapshot["channels"] == [{"id": "C1", "name": "general"}] and snapshot["channels_loaded_at"] == 200.0
+    with gzip.open(path, "wt") as f:
+        f.write('{"version": 0}')
+    assert load_snapshot(path) is None
+    with gzip.open(path, "wt") as f:
+        f.write('{"version": 1, "users": [{"id": "U1"}], "users_loaded_at": 1.0, "channels": []}')
+    assert load_snapshot(path)["users"] == [{"id": "U1"}]
+
+def test_snapshot_stores_columns():
+    users = [{"id": "U1", "name": "alice", "profile": {"title": "Eng"}}, {"id": "U2", "deleted": True, "tz": None}]
+    packed = pack_rows(users)
+    assert packed["fields"] == ["id", "name", "profile", "deleted", "tz"]
+    assert packed["rows"][1] == ["U2", None, None, True, None]
+    assert unpack_rows(packed) == [users[0], {"id": "U2", "deleted": True}]
+
+def test_directories_warm_start_without_slack_calls():
+    async def fail():
+        raise AssertionError("should not call Slack")
+    users = UserDirectory(fail)
+    users.restore([{"id": "U1", "name": "alice", "real_name": "Alice Smith"}], loaded_at=1e12)
+    assert asyncio.run(users.ensure_loaded()) is None
+    assert [u["id"] for u in users.search("smith")] == ["U1"]
+    async def fail_page(cursor):
+        raise AssertionError("should not call Slack")
+    channels = ChannelDirectory(fail_page)
+    channels.restore([{"id": "C1", "name": "general"}], loaded_at=1e12)
+    assert asyncio.run(channels.resolve("#general")) == ("C1", None)
+    assert asyncio.run(channels.resolve("#missing")) == (None, None)
+
+def test_server_imports_and_lists_tools_without_token():
+    env = {k: v for k, v in os.environ.items() if k != "SLACK_BOT_TOKEN"}
+    code = (
+        "import asyncio, sys; import slack_mcp.main as m; "
+        "tools = asyncio.run(m.server.list_tools()); "
+        "assert 'slack_sdk' not in sys.modules and 'aiohttp' not in sys.modules; "
+        "print(len(tools))"
+    )
+    out = subprocess.run([sys.executable, "-c", code], env=env, capture_output=True, text=True, cwd=os.path.dirname(os.path.dirname(__file__)))
+    assert out.returncode == 0, out.stderr
+    assert int(out.stdout) > 10
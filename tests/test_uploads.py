@@ -0,0 +1,55 @@
+from slack_mcp.uploads import base64_chunks, base64_length, file_chunks, normalize_base64, post_upload
+from aiohttp import web
+import asyncio
+import base64
+import os
+import pytest
+
+async def collect(chunks):
+    return [chunk async for chunk in chunks]
+
+def test_file_chunks_bounded(tmp_path):
+    data = os.urandom(10_000)
+    path = tmp_path / "blob.bin"
+    path.write_bytes(data)
+    chunks = asyncio.run(collect(file_chunks(str(path), chunk_size=4096)))
+    assert [len(c) for c in chunks] == [4096, 4096, 1808]
+    assert b"".join(chunks) == data
+
+def test_base64_chunks_and_length():
+    for size in (0, 1, 2, 3, 1000, 1001):
+        data = os.urandom(size)
+        encoded = normalize_base64(base64.b64encode(data).decode())
+        assert base64_length(encoded) == size
+        assert b"".join(asyncio.run(collect(base64_chunks(encoded, chunk_size=300)))) == data
+    assert normalize_base64("aGVs\nbG8=") == "aGVsbG8="
+    with pytest.raises(ValueError):
+        normalize_base64("abc")
+
+def test_post_upload_streams_body():
+    received = {}
+    async def handler(request):
+        received["body"] = await request.read()
+        received["length"] = request.headers.get("Content-Length")
+        return web.Response(text="OK")
+    async def scenario():
+        app = web.Application()
+        app.router.add_post("/upload", handler)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, "127.0.0.1", 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        try:
+            async def chunks():
+                yield b"hello "
+                yield b"world"
+            ok = await post_upload(f"http://127.0.0.1:{port}/upload", chunks(), 11)
+            missing = await post_upload(f"http://127.0.0.1:{port}/nope", chunks(), 11)
+        finally:
+            await runner.cleanup()
+        return ok, missing
+    ok, missing = asyncio.run(scenario())
+    assert ok is None
+    assert received == {"body": b"hello world", "length": "11"}
+    assert "HTTP 404" in missing
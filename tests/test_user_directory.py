@@ -0,0 +1,109 @@
+from slack_mcp.user_directory import UserDirectory
+import asyncio
+import time
+
+USERS = [
+    {"id": "U1", "real_name": "Joe Bloggs", "name": "joebloggs", "profile": {"display_name": "joeb"}},
+    {"id": "U2", "real_name": "Alice Smith", "name": "alicesmith", "profile": {"display_name": "ally"}},
+    {"id": "U3", "real_name": "Joey Tribbiani", "name": "joeytrib", "profile": {"display_name": "joey"}},
+    {"id": "U4", "real_name": None, "name": "bob", "profile": {"display_name": "Bobby Tables"}},
+]
+
+def make_loader(users, calls):
+    async def loader():
+        calls.append(1)
+        return {"ok": True, "members": users}
+    return loader
+
+def test_user_directory_search_uses_index_without_reloading():
+    calls = []
+    directory = UserDirectory(make_loader(USERS, calls))
+    assert asyncio.run(directory.ensure_loaded()) is None
+    assert {u["id"] for u in directory.search("JOE")} == {"U1", "U3"}
+    assert [u["id"] for u in directory.search("tables")] == ["U4"]  # profile display_name
+    assert [u["id"] for u in directory.search("ly")] == ["U2"]  # short query scan
+    assert directory.search("xyz") == []
+    # Query must not match across field boundaries
+    assert directory.search("bloggsjoe") == []
+    asyncio.run(directory.ensure_loaded())
+    assert calls == [1]
+
+def test_user_directory_refreshes_in_background_after_ttl():
+    calls = []
+    users = list(USERS)
+    directory = UserDirectory(make_loader(users, calls), ttl=0.05)
+    async def scenario():
+        await directory.ensure_loaded()
+        users.append({"id": "U5", "real_name": "Joanna Joestar", "name": "jojo"})
+        time.sleep(0.1)
+        # Stale data is served immediately while the refresh runs
+        assert await directory.ensure_loaded() is None
+        assert "U5" not in {u["id"] for u in directory.search("joe")}
+        await directory.refresh_task
+    asyncio.run(scenario())
+    assert calls == [1, 1]
+    assert not directory.refreshing
+    assert "U5" in {u["id"] for u in directory.search("joe")}
+
+def test_user_directory_load_failure_keeps_previous_index():
+    responses = [{"ok": True, "members": USERS}, {"ok": False, "error": "fail"}]
+    async def loader():
+        return responses.pop(0)
+    directory = UserDirectory(loader)
+    assert asyncio.run(directory.ensure_loaded()) is None
+    assert asyncio.run(directory.load()) == {"ok": False, "error": "fail"}
+    assert directory.last_error["error"] == "fail"
+    assert len(directory.search("joe")) == 2
+
+def test_user_directory_initial_failure_is_returned():
+    async def loader():
+        return {"error": "ratelimited", "retry_after": 5}
+    directory = UserDirectory(loader)
+    assert asyncio.run(directory.ensure_loaded())["error"] == "ratelimited"
+    assert directory.loaded_at is None
+
+def test_user_directory_upsert_updates_index_in_place():
+    calls = []
+    directory = UserDirectory(make_loader(USERS, calls))
+    directory.upsert([{"id": "U9", "real_name": "Ignored"}])  # nothing loaded yet
+    asyncio.run(directory.ensure_loaded())
+    assert directory.get("U9") is None
+    directory.upsert([
+        {"id": "U1", "real_name": "Joseph Bloggs", "name": "jbloggs", "profile": {"display_name": "jb"}},
+        {"id": "U5", "real_name": "Joanna Joestar", "name": "jojo"},
+    ])
+    assert {u["id"] for u in directory.search("joe")} == {"U3", "U5"}  # U1 no longer matches
+    assert [u["id"] for u in directory.search("joseph")] == ["U1"]
+    assert directory.get("U5")["name"] == "jojo"
+    assert calls == [1]
+
+def test_user_directory_refresh_applies_delta_on_updated():
+    users = [{"id": "U1", "name": "alice", "real_name": "Alice Smith", "tz": None, "updated": 10},
+             {"id": "U2", "name": "bob", "real_name": "Bob Brown", "updated": 10}]
+    calls = []
+    directory = UserDirectory(make_loader(users, calls))
+    directory.restore([{"id": "U1", "name": "alice", "real_name": "Alice Smith", "updated": 10}, {"id": "U2", "name": "bob", "real_name": "Bob Brown", "updated": 9}], loaded_at=1.0)
+    assert asyncio.run(directory.load()) is None
+    assert directory.last_delta == {"listed": 2, "changed": 1}  # only U2 has a newer updated; null tz is ignored
+    users[0] = {**users[0], "real_name": "Alice Jones", "updated": 11}
+    users.append({"id": "U3", "name": "carol", "real_name": "Carol Jones", "updated": 11})
+    asyncio.run(directory.load())
+    assert directory.last_delta == {"listed": 3, "changed": 2}
+    assert [u["id"] for u in directory.search("jones")] == ["U1", "U3"]
+    assert directory.search("smith") == []
+    del users[1]  # a user missing from the listing forces a full rebuild
+    asyncio.run(directory.load())
+    assert directory.get("U2") is None and directory.last_delta is None
+    assert [u["id"] for u in directory.search("jones")] == ["U1", "U3"]
+
+def test_user_directory_first_load_is_shared():
+    calls = []
+    async def loader():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return {"ok": True, "members": USERS}
+    directory = UserDirectory(loader)
+    async def scenario():
+        return await asyncio.gather(*(directory.ensure_loaded() for _ in range(5)))
+    assert asyncio.run(scenario()) == [None] * 5
+    assert calls == [1]